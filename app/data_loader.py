@@ -0,0 +1,153 @@
+import io
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from rollups import ROLLUP_FILES
+from snapshot import read_snapshot
+
+# Dashboard data loading, kept free of Streamlit so it can be benchmarked.
+# Files are fetched concurrently with conditional requests
+# (If-None-Match / If-Modified-Since), so a file that hasn't changed costs a
+# 304 and no download. Every 200 is written to an on-disk cache; if the origin
+# is slow or down the last good copy is served from there instead. Parsed
+# frames are kept per content digest, so unchanged files aren't re-parsed.
+# The forecast, its aggregates and model_info come as one Arrow bundle
+# (src/snapshot.py); the CSV and JSON are only a fallback. History charts
+# read the precomputed rollups in data/rollups/ (see src/rollups.py) rather
+# than the full history CSV.
+
+RAW_BASE = "https://raw.githubusercontent.com/MuhammadHamzaZeeshan/pearls-aqi-predictor/main/data"
+CSV_URL = f"{RAW_BASE}/aqi_forecast_72h.csv"
+JSON_URL = f"{RAW_BASE}/model_info.json"
+HISTORY_URL = f"{RAW_BASE}/karachi_aqi_history.csv"
+SNAPSHOT_URL = f"{RAW_BASE}/dashboard_snapshot.arrow"
+ROLLUP_URLS = {name: f"{RAW_BASE}/rollups/{name}.csv" for name in ROLLUP_FILES}
+# What every page load needs: the last 7 days of hourly rows, not the whole history
+SOURCES = {'snapshot': SNAPSHOT_URL, 'hourly': ROLLUP_URLS['hourly']}
+
+CACHE_DIR = os.getenv('DASHBOARD_CACHE_DIR',
+                      os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache', 'dashboard'))
+CONNECT_TIMEOUT = 3   # Seconds; past this the disk copy is served
+READ_TIMEOUT = 5
+MAX_RETRIES = 1
+
+
+def parse_forecast(body):
+    df = pd.read_csv(io.BytesIO(body))
+    if 'forecast_time' in df.columns:
+        df['forecast_time'] = pd.to_datetime(df['forecast_time'])
+    return df
+
+
+def parse_model_info(body):
+    return json.loads(body)
+
+
+def parse_history(body):
+    history = pd.read_csv(io.BytesIO(body))
+    if 'datetime' in history.columns:
+        history['datetime'] = pd.to_datetime(history['datetime'])
+        history = history.sort_values('datetime')
+    return history
+
+
+PARSERS = {'forecast': parse_forecast, 'model_info': parse_model_info, 'history': parse_history, 'snapshot': read_snapshot,
+           **{name: parse_history for name in ROLLUP_FILES}}
+
+
+class DiskCache:
+    """Last good body of each URL plus its validators (ETag / Last-Modified)."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{key}.body'), os.path.join(self.cache_dir, f'{key}.json')
+
+    def load(self, url):
+        """(body, meta) of the cached copy, or (None, {}) if there is none (or it was half-written)."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, {}
+        if len(body) != meta.get('size'):
+            return None, {}
+        return body, meta
+
+    def save(self, url, body, meta):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        # Body first, then the meta that vouches for it; a crash in between fails the size check
+        for path, data in [(body_path, body), (meta_path, json.dumps(meta).encode())]:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+
+def fetch(client, url, cache, endpoint=None):
+    """Conditional GET of ``url``. Returns (body, digest, status), status being
+    'downloaded', 'not modified' or 'stale' (origin failed, disk copy served)."""
+    body, meta = cache.load(url)
+    headers = {}
+    if body is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    try:
+        response = client.get(url, endpoint=endpoint, headers=headers)
+    except Exception:
+        if body is None:
+            raise
+        return body, meta['digest'], 'stale'
+    if response.status_code == 304 and body is not None:
+        return body, meta['digest'], 'not modified'
+
+    body = response.content
+    meta = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+            'digest': hashlib.sha256(body).hexdigest(), 'size': len(body)}
+    cache.save(url, body, meta)
+    return body, meta['digest'], 'downloaded'
+
+
+_parsed = {}  # name -> (digest, parsed object)
+_parsed_lock = threading.Lock()
+
+
+def parsed(name, body, digest):
+    """Parses ``body`` with PARSERS[name] unless the same content was parsed last time."""
+    with _parsed_lock:
+        cached = _parsed.get(name)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    value = PARSERS[name](body)
+    with _parsed_lock:
+        _parsed[name] = (digest, value)
+    return value
+
+
+def load_sources(client, sources=SOURCES, cache_dir=CACHE_DIR):
+    """Fetches every source concurrently. Returns {name: (parsed value, status)};
+    a source that failed with no disk copy to fall back on maps to (exception, 'failed')."""
+    cache = DiskCache(cache_dir)
+
+    def load(name, url):
+        try:
+            body, digest, status = fetch(client, url, cache, endpoint=name)
+            return parsed(name, body, digest), status
+        except Exception as e:
+            return e, 'failed'
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = {name: executor.submit(load, name, url) for name, url in sources.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,426 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Figure builders for the dashboard, plus a process-wide cache of what they
+# built. Streamlit re-runs main.py for every widget interaction of every
+# session; cached_figure() keys each figure by its builder and a content hash
+# of the data it was built from, so a rerun over unchanged data reuses the
+# figure instead of rebuilding traces, bands and subplots. The module is
+# imported once per server process, so the cache is shared by all sessions
+# and bounded to FIGURE_CACHE_ENTRIES figures (least recently used evicted).
+
+FIGURE_CACHE_ENTRIES = 64
+
+CHART_LAYOUT = dict(
+    template="plotly_dark",
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    font=dict(family="Sora, sans-serif", color="#F0F6FC"),
+    margin=dict(l=20, r=20, t=40, b=20),
+)
+
+AQI_ZONES = [
+    (0, 1.5, "Good", "rgba(36, 161, 72, 0.12)"),
+    (1.5, 2.5, "Fair", "rgba(241, 194, 27, 0.12)"),
+    (2.5, 3.5, "Moderate", "rgba(255, 140, 0, 0.12)"),
+    (3.5, 4.5, "Poor", "rgba(218, 30, 40, 0.12)"),
+    (4.5, 6.0, "Very Poor", "rgba(139, 0, 255, 0.12)"),
+]
+
+POLLUTANT_COLS = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
+POLLUTANT_LABELS = {
+    'co': 'CO', 'no2': 'NO\u2082', 'o3': 'O\u2083', 'so2': 'SO\u2082',
+    'pm2_5': 'PM2.5', 'pm10': 'PM10', 'nh3': 'NH\u2083'
+}
+POLLUTANT_UNITS = {
+    'co': '\u00b5g/m\u00b3', 'no2': '\u00b5g/m\u00b3', 'o3': '\u00b5g/m\u00b3',
+    'so2': '\u00b5g/m\u00b3', 'pm2_5': '\u00b5g/m\u00b3', 'pm10': '\u00b5g/m\u00b3',
+    'nh3': '\u00b5g/m\u00b3'
+}
+# Reference maximums for radar normalization (based on WHO/observed ranges)
+POLLUTANT_REF_MAX = {
+    'co': 200, 'no2': 0.5, 'o3': 150, 'so2': 1.0,
+    'pm2_5': 75, 'pm10': 200, 'nh3': 0.5
+}
+
+
+def _update_hash(h, value):
+    """Feeds ``value`` into ``h``: arrays by their bytes, frames by pandas' row hashes, containers recursively."""
+    if isinstance(value, np.ndarray):
+        h.update(f'{value.dtype}{value.shape}'.encode())
+        h.update(value.tobytes() if value.dtype != object else repr(value.tolist()).encode())
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            h.update(repr(key).encode())
+            _update_hash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update_hash(h, item)
+    else:
+        h.update(repr(value).encode())
+
+
+def data_key(*args):
+    """Content hash of a builder's arguments."""
+    h = hashlib.blake2b(digest_size=16)
+    for arg in args:
+        _update_hash(h, arg)
+    return h.hexdigest()
+
+
+_figures = OrderedDict()  # (builder name, data key) -> figure
+_building = {}            # (builder name, data key) -> Event set once the figure is cached
+_figures_lock = threading.Lock()
+cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def cached_figure(builder, *args):
+    """builder(*args), reused while the arguments hash to the same content.
+
+    Concurrent sessions asking for the same missing figure wait for one build
+    instead of each building it. The cached figure is shared between sessions:
+    callers must not modify it.
+    """
+    key = (builder.__name__, data_key(*args))
+    while True:
+        with _figures_lock:
+            fig = _figures.get(key)
+            if fig is not None:
+                _figures.move_to_end(key)
+                cache_stats['hits'] += 1
+                return fig
+            building = _building.get(key)
+            if building is None:
+                building = _building[key] = threading.Event()
+                break
+        building.wait()  # Another session is building it; look again once it's done (or failed)
+
+    try:
+        fig = builder(*args)
+        with _figures_lock:
+            cache_stats['misses'] += 1
+            _figures[key] = fig
+            while len(_figures) > FIGURE_CACHE_ENTRIES:
+                _figures.popitem(last=False)
+                cache_stats['evictions'] += 1
+        return fig
+    finally:
+        with _figures_lock:
+            del _building[key]
+        building.set()
+
+
+def forecast_trend(forecast, daily):
+    """72-hour forecast with AQI zone bands, the p10-p90 band and daily average markers"""
+    fig = go.Figure()
+
+    # AQI zone bands
+    for y0, y1, label, fill_color in AQI_ZONES:
+        fig.add_hrect(
+            y0=y0, y1=y1,
+            fillcolor=fill_color,
+            line_width=0,
+            annotation_text=label,
+            annotation_position="top left",
+            annotation=dict(font_size=10, font_color="#8B949E"),
+        )
+
+    # Monte Carlo uncertainty band (p10-p90), when the inference run published it
+    if {'aqi_p10', 'aqi_p90'}.issubset(forecast):
+        fig.add_trace(go.Scatter(
+            x=forecast['forecast_time'], y=forecast['aqi_p90'],
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip',
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast['forecast_time'], y=forecast['aqi_p10'],
+            fill='tonexty',
+            fillcolor='rgba(0, 217, 255, 0.12)',
+            line=dict(width=0),
+            name='p10 – p90 Range',
+            hovertemplate='<b>%{x|%a %H:%M}</b><br>p10: %{y:.2f}<extra></extra>',
+        ))
+
+    # Main forecast line
+    fig.add_trace(go.Scatter(
+        x=forecast['forecast_time'], y=forecast['predicted_aqi'],
+        fill='tozeroy',
+        fillcolor='rgba(15, 98, 254, 0.15)',
+        line=dict(color='#0F62FE', width=2.5),
+        name='Predicted AQI',
+        hovertemplate='<b>%{x|%a %H:%M}</b><br>AQI: %{y:.2f}<extra></extra>',
+    ))
+
+    # Daily average markers
+    fig.add_trace(go.Scatter(
+        x=daily['mid_time'], y=daily['avg_aqi'],
+        mode='markers+text',
+        marker=dict(size=10, color='#00D9FF', symbol='diamond', line=dict(width=1, color='#fff')),
+        text=[f"Avg: {v:.1f}" for v in daily['avg_aqi']],
+        textposition='top center',
+        textfont=dict(size=11, color='#00D9FF'),
+        name='Daily Average',
+        hovertemplate='<b>Daily Avg</b><br>AQI: %{y:.2f}<extra></extra>',
+    ))
+
+    fig.update_layout(
+        **CHART_LAYOUT,
+        height=360,
+        yaxis=dict(range=[0, 6], gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=13)),
+        xaxis=dict(gridcolor='rgba(48,54,61,0.2)', tickfont=dict(size=13)),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=11)),
+        showlegend=True,
+    )
+    return fig
+
+
+def category_donut(categories, n_hours):
+    """Forecast hours per AQI category"""
+    # Filter out zero-count categories
+    present = categories['hours'] > 0
+    labels = categories['category'][present]
+    values = categories['hours'][present]
+    colors = categories['color'][present]
+
+    fig_donut = go.Figure(data=[go.Pie(
+        labels=labels, values=values,
+        hole=0.55,
+        marker=dict(colors=colors, line=dict(color='#0F1419', width=2)),
+        textinfo='label+percent',
+        textfont=dict(size=12, color='#F0F6FC'),
+        hovertemplate='<b>%{label}</b><br>%{value} hours (%{percent})<extra></extra>',
+    )])
+    fig_donut.update_layout(
+        **CHART_LAYOUT,
+        height=320,
+        showlegend=False,
+        annotations=[dict(text=f"{n_hours}h", x=0.5, y=0.5, font_size=22, font_color='#F0F6FC', showarrow=False)],
+    )
+    return fig_donut
+
+
+def hourly_pattern(hourly):
+    """Mean forecast AQI per hour of day"""
+    fig_hourly = go.Figure(data=[go.Bar(
+        x=hourly['hour'], y=hourly['avg_aqi'],
+        marker=dict(color=hourly['color'], line=dict(width=0)),
+        hovertemplate='<b>%{x}:00</b><br>Avg AQI: %{y:.2f}<extra></extra>',
+    )])
+    fig_hourly.update_layout(
+        **CHART_LAYOUT,
+        height=320,
+        xaxis=dict(
+            title="Hour of Day", tickmode='linear', dtick=3,
+            gridcolor='rgba(48,54,61,0.2)', tickfont=dict(size=12),
+        ),
+        yaxis=dict(
+            title="Avg AQI", range=[0, 6],
+            gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=12),
+        ),
+        bargap=0.15,
+    )
+    return fig_hourly
+
+
+def pollutant_radar(latest, prev):
+    """Latest readings (and the row 24 hours back, if any) as a share of each reference maximum"""
+    radar_labels = [POLLUTANT_LABELS[p] for p in POLLUTANT_COLS]
+    radar_values = []
+    for p in POLLUTANT_COLS:
+        val = latest.get(p, 0)
+        normalized = min((val / POLLUTANT_REF_MAX[p]) * 100, 100) if POLLUTANT_REF_MAX[p] > 0 else 0
+        radar_values.append(round(normalized, 1))
+
+    # Close the radar polygon
+    radar_labels_closed = radar_labels + [radar_labels[0]]
+    radar_values_closed = radar_values + [radar_values[0]]
+
+    fig_radar = go.Figure()
+    fig_radar.add_trace(go.Scatterpolar(
+        r=radar_values_closed,
+        theta=radar_labels_closed,
+        fill='toself',
+        fillcolor='rgba(15, 98, 254, 0.2)',
+        line=dict(color='#0F62FE', width=2),
+        name='Current',
+        hovertemplate='<b>%{theta}</b><br>%{r:.1f}% of reference<extra></extra>',
+    ))
+
+    # Add 24h-ago comparison if available
+    if prev is not None:
+        prev_values = []
+        for p in POLLUTANT_COLS:
+            val = prev.get(p, 0)
+            normalized = min((val / POLLUTANT_REF_MAX[p]) * 100, 100) if POLLUTANT_REF_MAX[p] > 0 else 0
+            prev_values.append(round(normalized, 1))
+        prev_values_closed = prev_values + [prev_values[0]]
+
+        fig_radar.add_trace(go.Scatterpolar(
+            r=prev_values_closed,
+            theta=radar_labels_closed,
+            fill='toself',
+            fillcolor='rgba(139, 148, 158, 0.08)',
+            line=dict(color='#484F58', width=1, dash='dot'),
+            name='24h ago',
+            hovertemplate='<b>%{theta}</b><br>%{r:.1f}% of reference<extra></extra>',
+        ))
+
+    fig_radar.update_layout(
+        **CHART_LAYOUT,
+        height=370,
+        polar=dict(
+            bgcolor='rgba(0,0,0,0)',
+            radialaxis=dict(
+                visible=True, range=[0, 100],
+                gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=10, color='#8B949E'),
+                ticksuffix='%',
+            ),
+            angularaxis=dict(
+                gridcolor='rgba(48,54,61,0.3)',
+                tickfont=dict(size=12, color='#F0F6FC'),
+            ),
+        ),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5, font=dict(size=11)),
+        showlegend=True,
+    )
+    return fig_radar
+
+
+def pollutant_trend(recent):
+    """Hourly pollutant readings, high- and low-range gases on two shared-x rows"""
+    # Group into two scales: high-value (CO, O3, PM10) and low-value (NO2, SO2, PM2.5, NH3)
+    fig_trend = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.08,
+        row_heights=[0.5, 0.5],
+        subplot_titles=("Particulate Matter & CO", "Trace Gases"),
+    )
+
+    high_group = {'co': '#0F62FE', 'pm10': '#FF8C00', 'pm2_5': '#DA1E28'}
+    low_group = {'no2': '#00D9FF', 'o3': '#24A148', 'so2': '#F1C21B', 'nh3': '#8B00FF'}
+
+    for col, color in high_group.items():
+        if col in recent.columns:
+            fig_trend.add_trace(go.Scatter(
+                x=recent['datetime'], y=recent[col],
+                mode='lines', name=POLLUTANT_LABELS[col],
+                line=dict(color=color, width=1.5),
+                hovertemplate=f'<b>{POLLUTANT_LABELS[col]}</b><br>' + '%{x|%d %b %H:%M}<br>%{y:.2f} ' + POLLUTANT_UNITS[col] + '<extra></extra>',
+            ), row=1, col=1)
+
+    for col, color in low_group.items():
+        if col in recent.columns:
+            fig_trend.add_trace(go.Scatter(
+                x=recent['datetime'], y=recent[col],
+                mode='lines', name=POLLUTANT_LABELS[col],
+                line=dict(color=color, width=1.5),
+                hovertemplate=f'<b>{POLLUTANT_LABELS[col]}</b><br>' + '%{x|%d %b %H:%M}<br>%{y:.2f} ' + POLLUTANT_UNITS[col] + '<extra></extra>',
+            ), row=2, col=1)
+
+    fig_trend.update_layout(
+        **CHART_LAYOUT,
+        height=370,
+        legend=dict(
+            orientation="h", yanchor="bottom", y=-0.22, xanchor="center", x=0.5,
+            font=dict(size=10),
+        ),
+        showlegend=True,
+    )
+    fig_trend.update_yaxes(gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=10), row=1, col=1)
+    fig_trend.update_yaxes(gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=10), row=2, col=1)
+    fig_trend.update_xaxes(gridcolor='rgba(48,54,61,0.2)', tickfont=dict(size=10), row=2, col=1)
+    fig_trend.update_annotations(font=dict(color='#8B949E', size=11))
+    return fig_trend
+
+
+def long_term_history(series):
+    """AQI and PM2.5 at one rollup resolution, PM2.5 on a secondary axis"""
+    fig_long = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_long.add_trace(go.Scatter(
+        x=series['aqi']['datetime'], y=series['aqi']['aqi'], mode='lines', name='AQI',
+        line=dict(color='#0F62FE', width=2),
+        hovertemplate='<b>AQI</b><br>%{x|%d %b %Y}<br>%{y:.2f}<extra></extra>',
+    ), secondary_y=False)
+    fig_long.add_trace(go.Scatter(
+        x=series['pm2_5']['datetime'], y=series['pm2_5']['pm2_5'], mode='lines', name='PM2.5',
+        line=dict(color='#DA1E28', width=1.5),
+        hovertemplate='<b>PM2.5</b><br>%{x|%d %b %Y}<br>%{y:.1f} µg/m³<extra></extra>',
+    ), secondary_y=True)
+    fig_long.update_layout(
+        **CHART_LAYOUT,
+        height=340,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=11)),
+    )
+    fig_long.update_yaxes(title_text="AQI", range=[0, 6], gridcolor='rgba(48,54,61,0.4)', secondary_y=False)
+    fig_long.update_yaxes(title_text="PM2.5 (µg/m³)", showgrid=False, secondary_y=True)
+    fig_long.update_xaxes(gridcolor='rgba(48,54,61,0.2)')
+    return fig_long
+
+
+def model_comparison(models):
+    """MAE and R² of every registry candidate, the selected one highlighted"""
+    names = [m["name"] for m in models]
+    maes = [m["mae"] for m in models]
+    r2s = [m["r2"] for m in models]
+    is_selected = [m.get("selected", False) for m in models]
+
+    # Grouped bar chart: MAE and R2 side by side
+    bar_colors_mae = ['#0F62FE' if sel else '#30363D' for sel in is_selected]
+    bar_colors_r2 = ['#00D9FF' if sel else '#484F58' for sel in is_selected]
+
+    fig_comp = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=("Mean Absolute Error (lower is better)", "R² Score (higher is better)"),
+        horizontal_spacing=0.15,
+    )
+
+    fig_comp.add_trace(go.Bar(
+        x=names, y=maes,
+        marker=dict(color=bar_colors_mae, line=dict(width=0)),
+        text=[f"{v:.4f}" for v in maes],
+        textposition='outside',
+        textfont=dict(size=12, color='#F0F6FC'),
+        hovertemplate='<b>%{x}</b><br>MAE: %{y:.4f}<extra></extra>',
+        showlegend=False,
+    ), row=1, col=1)
+
+    fig_comp.add_trace(go.Bar(
+        x=names, y=r2s,
+        marker=dict(color=bar_colors_r2, line=dict(width=0)),
+        text=[f"{v:.4f}" for v in r2s],
+        textposition='outside',
+        textfont=dict(size=12, color='#F0F6FC'),
+        hovertemplate='<b>%{x}</b><br>R²: %{y:.4f}<extra></extra>',
+        showlegend=False,
+    ), row=1, col=2)
+
+    # Add realistic zone band on R2 chart
+    fig_comp.add_hrect(
+        y0=0.60, y1=0.90,
+        fillcolor="rgba(36, 161, 72, 0.08)",
+        line=dict(width=1, color="rgba(36, 161, 72, 0.3)", dash="dot"),
+        row=1, col=2,
+        annotation_text="Realistic Zone",
+        annotation_position="top right",
+        annotation=dict(font_size=9, font_color="#24A148"),
+    )
+
+    fig_comp.update_layout(
+        **CHART_LAYOUT,
+        height=340,
+    )
+    fig_comp.update_yaxes(gridcolor='rgba(48,54,61,0.4)', range=[0, max(maes) * 1.4], row=1, col=1)
+    fig_comp.update_yaxes(gridcolor='rgba(48,54,61,0.4)', range=[0, 1.0], row=1, col=2)
+    fig_comp.update_annotations(font=dict(color='#8B949E', size=12))
+    return fig_comp
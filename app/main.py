@@ -1,16 +1,21 @@
+import os
 import re
+import sys
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import json
-import requests
 from datetime import datetime
 
-# --- CONFIGURATION & URLS ---
-CSV_URL = "https://raw.githubusercontent.com/MuhammadHamzaZeeshan/pearls-aqi-predictor/main/data/aqi_forecast_72h.csv"
-JSON_URL = "https://raw.githubusercontent.com/MuhammadHamzaZeeshan/pearls-aqi-predictor/main/data/model_info.json"
-HISTORY_URL = "https://raw.githubusercontent.com/MuhammadHamzaZeeshan/pearls-aqi-predictor/main/data/karachi_aqi_history.csv"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from openweather_client import HTTPClient
+from data_loader import (
+    load_sources, ROLLUP_URLS, HISTORY_URL, CSV_URL, JSON_URL, CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES,
+)
+from snapshot import build_snapshot, snapshot_bytes, read_snapshot
+from figures import (
+    cached_figure, forecast_trend, category_donut, hourly_pattern, pollutant_radar, pollutant_trend,
+    long_term_history, model_comparison, POLLUTANT_COLS, POLLUTANT_LABELS, POLLUTANT_UNITS, POLLUTANT_REF_MAX,
+)
 
 # Page Configuration
 st.set_page_config(
@@ -118,62 +123,43 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_http_client():
+    """One keep-alive connection pool shared by every session of the app"""
+    return HTTPClient(connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES)
+
 @st.cache_data(ttl=1800)
 def load_live_data():
-    """Fetches CSV and JSON directly from GitHub Raw URLs"""
-    try:
-        df = pd.read_csv(CSV_URL)
-        if 'forecast_time' in df.columns:
-            df['forecast_time'] = pd.to_datetime(df['forecast_time'])
-
-        response = requests.get(JSON_URL)
-        model_info = response.json() if response.status_code == 200 else {}
-
-        # Fetch historical pollutant data
-        history = None
-        try:
-            history = pd.read_csv(HISTORY_URL)
-            if 'datetime' in history.columns:
-                history['datetime'] = pd.to_datetime(history['datetime'])
-                history = history.sort_values('datetime')
-        except Exception:
-            pass
-
-        return df, model_info, history
-    except Exception as e:
-        st.error(f"Failed to fetch live data: {e}")
-        return None, None, None
-
-def get_aqi_status(aqi_value):
-    if aqi_value <= 1.5:
-        return "Good", "#24A148"
-    elif aqi_value <= 2.5:
-        return "Fair", "#F1C21B"
-    elif aqi_value <= 3.5:
-        return "Moderate", "#FF8C00"
-    elif aqi_value <= 4.5:
-        return "Poor", "#DA1E28"
-    else:
-        return "Very Poor", "#8B00FF"
-
-AQI_ZONES = [
-    (0, 1.5, "Good", "rgba(36, 161, 72, 0.12)"),
-    (1.5, 2.5, "Fair", "rgba(241, 194, 27, 0.12)"),
-    (2.5, 3.5, "Moderate", "rgba(255, 140, 0, 0.12)"),
-    (3.5, 4.5, "Poor", "rgba(218, 30, 40, 0.12)"),
-    (4.5, 6.0, "Very Poor", "rgba(139, 0, 255, 0.12)"),
-]
-
-CHART_LAYOUT = dict(
-    template="plotly_dark",
-    paper_bgcolor='rgba(0,0,0,0)',
-    plot_bgcolor='rgba(0,0,0,0)',
-    font=dict(family="Sora, sans-serif", color="#F0F6FC"),
-    margin=dict(l=20, r=20, t=40, b=20),
-)
+    """Revalidates the forecast snapshot and last 7 days of history on GitHub concurrently (disk copy if it's unreachable)"""
+    sources = load_sources(get_http_client())
+    snapshot, status = sources['snapshot']
+    if status == 'failed':
+        # No bundle published yet: build the same sections from the forecast CSV and model JSON
+        fallback = load_sources(get_http_client(), {'forecast': CSV_URL, 'model_info': JSON_URL})
+        df, status = fallback['forecast']
+        if status == 'failed':
+            st.error(f"Failed to fetch live data: {df}")
+            return None, None
+        model_info, status = fallback['model_info']
+        snapshot = read_snapshot(snapshot_bytes(build_snapshot(df, {} if status == 'failed' else model_info)))
+    if 'stale' in [status for _, status in sources.values()]:
+        st.warning("GitHub is unreachable; showing the last downloaded data.")
+
+    history, status = sources['hourly']
+    if status == 'failed':
+        # Rollups not published yet: fall back to the full history
+        history, status = load_sources(get_http_client(), {'history': HISTORY_URL})['history']
+        history = None if status == 'failed' else history.tail(168)
+    return snapshot, history
+
+@st.cache_data(ttl=1800)
+def load_rollups(names):
+    """Only the precomputed resolutions a chart draws (daily, weekly or LTTB series)"""
+    sources = load_sources(get_http_client(), {name: ROLLUP_URLS[name] for name in names})
+    return {name: value for name, (value, status) in sources.items() if status != 'failed'}
 
 def main():
-    df, model_info, history = load_live_data()
+    snapshot, history = load_live_data()
 
     st.markdown("<h1>Pearls: Karachi Air Quality Analytics</h1>", unsafe_allow_html=True)
 
@@ -181,10 +167,13 @@ def main():
     update_time = datetime.now().strftime('%d %b, %H:%M PKT')
     st.markdown(f"**Location:** Karachi, Pakistan | **Sync Status:** 🟢 Live via GitHub Actions | **Last Sync:** {update_time}")
 
-    if df is not None:
+    if snapshot is not None:
+        # Everything below is precomputed in the snapshot: no parsing or groupbys per rerun
+        forecast, model_info = snapshot['forecast'], snapshot['model_info']
+
         # ── METRICS ROW ─────────────────────────────────────
-        cur_aqi = df['predicted_aqi'].iloc[0]
-        status, color = get_aqi_status(cur_aqi)
+        cur_aqi = forecast['predicted_aqi'][0]
+        status, color = forecast['category'][0], forecast['color'][0]
 
         c1, c2, c3 = st.columns(3)
         with c1:
@@ -234,26 +223,19 @@ def main():
         # ── 3-DAY OUTLOOK ───────────────────────────────────
         st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
         st.subheader("3-Day Outlook")
-        df['date'] = df['forecast_time'].dt.date
-
-        daily = df.groupby('date')['predicted_aqi'].mean().reset_index()
-        daily = daily.sort_values('date').reset_index(drop=True)
+        daily = snapshot['daily']
 
-        unique_dates_count = len(daily)
-        if unique_dates_count >= 4:
-            daily = daily.iloc[1:4]
-        else:
-            daily = daily.head(3)
+        unique_dates_count = len(daily['date'])
+        outlook = range(1, 4) if unique_dates_count >= 4 else range(min(3, unique_dates_count))
 
         cols = st.columns(3)
-        for idx, (_, row) in enumerate(daily.iterrows()):
+        for idx, i in enumerate(outlook):
             with cols[idx]:
-                s, sc = get_aqi_status(row['predicted_aqi'])
                 st.markdown(f"""
                     <div class="day-container">
-                        <div style="color:#0F62FE; font-weight:700">{row['date'].strftime('%A')}</div>
-                        <div style="font-size:2rem; font-weight:800; color:{sc}">{row['predicted_aqi']:.2f}</div>
-                        <div style="font-size:0.8rem">{s}</div>
+                        <div style="color:#0F62FE; font-weight:700">{pd.Timestamp(daily['date'][i]).strftime('%A')}</div>
+                        <div style="font-size:2rem; font-weight:800; color:{daily['color'][i]}">{daily['avg_aqi'][i]:.2f}</div>
+                        <div style="font-size:0.8rem">{daily['category'][i]}</div>
                     </div>
                 """, unsafe_allow_html=True)
 
@@ -261,54 +243,7 @@ def main():
         st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
         st.subheader("72-Hour Detailed Trend")
 
-        fig = go.Figure()
-
-        # AQI zone bands
-        for y0, y1, label, fill_color in AQI_ZONES:
-            fig.add_hrect(
-                y0=y0, y1=y1,
-                fillcolor=fill_color,
-                line_width=0,
-                annotation_text=label,
-                annotation_position="top left",
-                annotation=dict(font_size=10, font_color="#8B949E"),
-            )
-
-        # Main forecast line
-        fig.add_trace(go.Scatter(
-            x=df['forecast_time'], y=df['predicted_aqi'],
-            fill='tozeroy',
-            fillcolor='rgba(15, 98, 254, 0.15)',
-            line=dict(color='#0F62FE', width=2.5),
-            name='Predicted AQI',
-            hovertemplate='<b>%{x|%a %H:%M}</b><br>AQI: %{y:.2f}<extra></extra>',
-        ))
-
-        # Daily average markers
-        daily_avg = df.groupby('date').agg(
-            avg_aqi=('predicted_aqi', 'mean'),
-            mid_time=('forecast_time', lambda x: x.iloc[len(x)//2])
-        ).reset_index()
-
-        fig.add_trace(go.Scatter(
-            x=daily_avg['mid_time'], y=daily_avg['avg_aqi'],
-            mode='markers+text',
-            marker=dict(size=10, color='#00D9FF', symbol='diamond', line=dict(width=1, color='#fff')),
-            text=[f"Avg: {v:.1f}" for v in daily_avg['avg_aqi']],
-            textposition='top center',
-            textfont=dict(size=11, color='#00D9FF'),
-            name='Daily Average',
-            hovertemplate='<b>Daily Avg</b><br>AQI: %{y:.2f}<extra></extra>',
-        ))
-
-        fig.update_layout(
-            **CHART_LAYOUT,
-            height=360,
-            yaxis=dict(range=[0, 6], gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=13)),
-            xaxis=dict(gridcolor='rgba(48,54,61,0.2)', tickfont=dict(size=13)),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=11)),
-            showlegend=True,
-        )
+        fig = cached_figure(forecast_trend, forecast, daily)
         st.plotly_chart(fig, use_container_width=True)
 
         # ── AQI DISTRIBUTION & HOURLY PATTERN (side by side) ─
@@ -319,60 +254,13 @@ def main():
         # -- Donut: AQI Category Distribution --
         with col_left:
             st.subheader("Forecast Breakdown")
-            categories = {"Good": 0, "Fair": 0, "Moderate": 0, "Poor": 0, "Very Poor": 0}
-            cat_colors = {"Good": "#24A148", "Fair": "#F1C21B", "Moderate": "#FF8C00", "Poor": "#DA1E28", "Very Poor": "#8B00FF"}
-
-            for val in df['predicted_aqi']:
-                s, _ = get_aqi_status(val)
-                categories[s] += 1
-
-            # Filter out zero-count categories
-            labels = [k for k, v in categories.items() if v > 0]
-            values = [v for v in categories.values() if v > 0]
-            colors = [cat_colors[l] for l in labels]
-
-            fig_donut = go.Figure(data=[go.Pie(
-                labels=labels, values=values,
-                hole=0.55,
-                marker=dict(colors=colors, line=dict(color='#0F1419', width=2)),
-                textinfo='label+percent',
-                textfont=dict(size=12, color='#F0F6FC'),
-                hovertemplate='<b>%{label}</b><br>%{value} hours (%{percent})<extra></extra>',
-            )])
-            fig_donut.update_layout(
-                **CHART_LAYOUT,
-                height=320,
-                showlegend=False,
-                annotations=[dict(text=f"{len(df)}h", x=0.5, y=0.5, font_size=22, font_color='#F0F6FC', showarrow=False)],
-            )
+            fig_donut = cached_figure(category_donut, snapshot['categories'], len(forecast['predicted_aqi']))
             st.plotly_chart(fig_donut, use_container_width=True)
 
         # -- Bar: Hourly AQI Pattern --
         with col_right:
             st.subheader("Hourly Pattern")
-            df['hour'] = df['forecast_time'].dt.hour
-            hourly = df.groupby('hour')['predicted_aqi'].mean().reset_index()
-
-            bar_colors = [get_aqi_status(v)[1] for v in hourly['predicted_aqi']]
-
-            fig_hourly = go.Figure(data=[go.Bar(
-                x=hourly['hour'], y=hourly['predicted_aqi'],
-                marker=dict(color=bar_colors, line=dict(width=0)),
-                hovertemplate='<b>%{x}:00</b><br>Avg AQI: %{y:.2f}<extra></extra>',
-            )])
-            fig_hourly.update_layout(
-                **CHART_LAYOUT,
-                height=320,
-                xaxis=dict(
-                    title="Hour of Day", tickmode='linear', dtick=3,
-                    gridcolor='rgba(48,54,61,0.2)', tickfont=dict(size=12),
-                ),
-                yaxis=dict(
-                    title="Avg AQI", range=[0, 6],
-                    gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=12),
-                ),
-                bargap=0.15,
-            )
+            fig_hourly = cached_figure(hourly_pattern, snapshot['hourly'])
             st.plotly_chart(fig_hourly, use_container_width=True)
 
         # ── POLLUTANT INPUT FEATURES ────────────────────────
@@ -381,22 +269,6 @@ def main():
             st.subheader("Pollutant Input Features")
             st.caption("Real-time pollutant readings from openweather that feed into the prediction model")
 
-            pollutant_cols = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
-            pollutant_labels = {
-                'co': 'CO', 'no2': 'NO\u2082', 'o3': 'O\u2083', 'so2': 'SO\u2082',
-                'pm2_5': 'PM2.5', 'pm10': 'PM10', 'nh3': 'NH\u2083'
-            }
-            pollutant_units = {
-                'co': '\u00b5g/m\u00b3', 'no2': '\u00b5g/m\u00b3', 'o3': '\u00b5g/m\u00b3',
-                'so2': '\u00b5g/m\u00b3', 'pm2_5': '\u00b5g/m\u00b3', 'pm10': '\u00b5g/m\u00b3',
-                'nh3': '\u00b5g/m\u00b3'
-            }
-            # Reference maximums for radar normalization (based on WHO/observed ranges)
-            pollutant_ref_max = {
-                'co': 200, 'no2': 0.5, 'o3': 150, 'so2': 1.0,
-                'pm2_5': 75, 'pm10': 200, 'nh3': 0.5
-            }
-
             latest = history.iloc[-1]
             last_timestamp = latest['datetime'].strftime('%d %b %Y, %H:%M') if pd.notna(latest.get('datetime')) else 'N/A'
 
@@ -406,66 +278,7 @@ def main():
             with col_radar:
                 st.markdown(f"**Latest Readings** &mdash; {last_timestamp}")
 
-                radar_labels = [pollutant_labels[p] for p in pollutant_cols]
-                radar_values = []
-                for p in pollutant_cols:
-                    val = latest.get(p, 0)
-                    normalized = min((val / pollutant_ref_max[p]) * 100, 100) if pollutant_ref_max[p] > 0 else 0
-                    radar_values.append(round(normalized, 1))
-
-                # Close the radar polygon
-                radar_labels_closed = radar_labels + [radar_labels[0]]
-                radar_values_closed = radar_values + [radar_values[0]]
-
-                fig_radar = go.Figure()
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=radar_values_closed,
-                    theta=radar_labels_closed,
-                    fill='toself',
-                    fillcolor='rgba(15, 98, 254, 0.2)',
-                    line=dict(color='#0F62FE', width=2),
-                    name='Current',
-                    hovertemplate='<b>%{theta}</b><br>%{r:.1f}% of reference<extra></extra>',
-                ))
-
-                # Add 24h-ago comparison if available
-                if len(history) >= 24:
-                    prev = history.iloc[-24]
-                    prev_values = []
-                    for p in pollutant_cols:
-                        val = prev.get(p, 0)
-                        normalized = min((val / pollutant_ref_max[p]) * 100, 100) if pollutant_ref_max[p] > 0 else 0
-                        prev_values.append(round(normalized, 1))
-                    prev_values_closed = prev_values + [prev_values[0]]
-
-                    fig_radar.add_trace(go.Scatterpolar(
-                        r=prev_values_closed,
-                        theta=radar_labels_closed,
-                        fill='toself',
-                        fillcolor='rgba(139, 148, 158, 0.08)',
-                        line=dict(color='#484F58', width=1, dash='dot'),
-                        name='24h ago',
-                        hovertemplate='<b>%{theta}</b><br>%{r:.1f}% of reference<extra></extra>',
-                    ))
-
-                fig_radar.update_layout(
-                    **CHART_LAYOUT,
-                    height=370,
-                    polar=dict(
-                        bgcolor='rgba(0,0,0,0)',
-                        radialaxis=dict(
-                            visible=True, range=[0, 100],
-                            gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=10, color='#8B949E'),
-                            ticksuffix='%',
-                        ),
-                        angularaxis=dict(
-                            gridcolor='rgba(48,54,61,0.3)',
-                            tickfont=dict(size=12, color='#F0F6FC'),
-                        ),
-                    ),
-                    legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5, font=dict(size=11)),
-                    showlegend=True,
-                )
+                fig_radar = cached_figure(pollutant_radar, latest, history.iloc[-24] if len(history) >= 24 else None)
                 st.plotly_chart(fig_radar, use_container_width=True)
 
             # -- Trend: Pollutant history over last 7 days --
@@ -474,58 +287,15 @@ def main():
 
                 recent = history.tail(168)  # 7 days * 24 hours
 
-                # Group into two scales: high-value (CO, O3, PM10) and low-value (NO2, SO2, PM2.5, NH3)
-                fig_trend = make_subplots(
-                    rows=2, cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.08,
-                    row_heights=[0.5, 0.5],
-                    subplot_titles=("Particulate Matter & CO", "Trace Gases"),
-                )
-
-                high_group = {'co': '#0F62FE', 'pm10': '#FF8C00', 'pm2_5': '#DA1E28'}
-                low_group = {'no2': '#00D9FF', 'o3': '#24A148', 'so2': '#F1C21B', 'nh3': '#8B00FF'}
-
-                for col, color in high_group.items():
-                    if col in recent.columns:
-                        fig_trend.add_trace(go.Scatter(
-                            x=recent['datetime'], y=recent[col],
-                            mode='lines', name=pollutant_labels[col],
-                            line=dict(color=color, width=1.5),
-                            hovertemplate=f'<b>{pollutant_labels[col]}</b><br>' + '%{x|%d %b %H:%M}<br>%{y:.2f} ' + pollutant_units[col] + '<extra></extra>',
-                        ), row=1, col=1)
-
-                for col, color in low_group.items():
-                    if col in recent.columns:
-                        fig_trend.add_trace(go.Scatter(
-                            x=recent['datetime'], y=recent[col],
-                            mode='lines', name=pollutant_labels[col],
-                            line=dict(color=color, width=1.5),
-                            hovertemplate=f'<b>{pollutant_labels[col]}</b><br>' + '%{x|%d %b %H:%M}<br>%{y:.2f} ' + pollutant_units[col] + '<extra></extra>',
-                        ), row=2, col=1)
-
-                fig_trend.update_layout(
-                    **CHART_LAYOUT,
-                    height=370,
-                    legend=dict(
-                        orientation="h", yanchor="bottom", y=-0.22, xanchor="center", x=0.5,
-                        font=dict(size=10),
-                    ),
-                    showlegend=True,
-                )
-                fig_trend.update_yaxes(gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=10), row=1, col=1)
-                fig_trend.update_yaxes(gridcolor='rgba(48,54,61,0.4)', tickfont=dict(size=10), row=2, col=1)
-                fig_trend.update_xaxes(gridcolor='rgba(48,54,61,0.2)', tickfont=dict(size=10), row=2, col=1)
-                fig_trend.update_annotations(font=dict(color='#8B949E', size=11))
-
+                fig_trend = cached_figure(pollutant_trend, recent)
                 st.plotly_chart(fig_trend, use_container_width=True)
 
             # -- Pollutant level cards --
             st.markdown("")
-            p_cols = st.columns(len(pollutant_cols))
-            for idx, p in enumerate(pollutant_cols):
+            p_cols = st.columns(len(POLLUTANT_COLS))
+            for idx, p in enumerate(POLLUTANT_COLS):
                 val = latest.get(p, 0)
-                pct = min((val / pollutant_ref_max[p]) * 100, 100) if pollutant_ref_max[p] > 0 else 0
+                pct = min((val / POLLUTANT_REF_MAX[p]) * 100, 100) if POLLUTANT_REF_MAX[p] > 0 else 0
                 if pct >= 75:
                     pct_color = "#DA1E28"
                 elif pct >= 50:
@@ -537,12 +307,34 @@ def main():
                 with p_cols[idx]:
                     st.markdown(f"""
                     <div style="background:rgba(22,27,34,0.8); border:1px solid #30363D; border-radius:10px; padding:12px; text-align:center;">
-                        <div style="color:#8B949E; font-size:0.7rem; font-weight:600; text-transform:uppercase;">{pollutant_labels[p]}</div>
+                        <div style="color:#8B949E; font-size:0.7rem; font-weight:600; text-transform:uppercase;">{POLLUTANT_LABELS[p]}</div>
                         <div style="font-size:1.3rem; font-weight:800; font-family:'Poppins',sans-serif; color:{pct_color};">{val:.2f}</div>
-                        <div style="font-size:0.65rem; color:#6E7681;">{pollutant_units[p]}</div>
+                        <div style="font-size:0.65rem; color:#6E7681;">{POLLUTANT_UNITS[p]}</div>
                     </div>
                     """, unsafe_allow_html=True)
 
+        # ── LONG-TERM HISTORY (precomputed rollups) ─────────
+        st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+        st.subheader("Long-Term AQI & PM2.5 History")
+        resolution = st.radio(
+            "Resolution", ["Daily (last year)", "Weekly", "Full history (downsampled)"],
+            horizontal=True, label_visibility="collapsed",
+        )
+        # Each resolution is its own small file; only the one shown is downloaded
+        if resolution == "Full history (downsampled)":
+            rollups = load_rollups(('lttb_aqi', 'lttb_pm2_5'))
+            series = {col: rollups.get(f'lttb_{col}') for col in ['aqi', 'pm2_5']}
+        else:
+            name = 'daily' if resolution.startswith("Daily") else 'weekly'
+            frame = load_rollups((name,)).get(name)
+            series = {col: frame[['datetime', col]] if frame is not None else None for col in ['aqi', 'pm2_5']}
+
+        if all(s is not None for s in series.values()):
+            fig_long = cached_figure(long_term_history, series)
+            st.plotly_chart(fig_long, use_container_width=True)
+        else:
+            st.info("Long-term rollups are not published yet.")
+
         # ── MODEL COMPARISON (from Hopsworks Registry) ──────
         if model_info.get("models"):
             st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
@@ -550,63 +342,10 @@ def main():
             st.caption(f"Selection criteria: {model_info.get('selection_criteria', 'Lowest MAE')}")
 
             models = model_info["models"]
-            names = [m["name"] for m in models]
-            maes = [m["mae"] for m in models]
-            r2s = [m["r2"] for m in models]
-            is_selected = [m.get("selected", False) for m in models]
-
             col_chart, col_detail = st.columns([3, 2])
 
             with col_chart:
-                # Grouped bar chart: MAE and R2 side by side
-                bar_colors_mae = ['#0F62FE' if sel else '#30363D' for sel in is_selected]
-                bar_colors_r2 = ['#00D9FF' if sel else '#484F58' for sel in is_selected]
-
-                fig_comp = make_subplots(
-                    rows=1, cols=2,
-                    subplot_titles=("Mean Absolute Error (lower is better)", "R² Score (higher is better)"),
-                    horizontal_spacing=0.15,
-                )
-
-                fig_comp.add_trace(go.Bar(
-                    x=names, y=maes,
-                    marker=dict(color=bar_colors_mae, line=dict(width=0)),
-                    text=[f"{v:.4f}" for v in maes],
-                    textposition='outside',
-                    textfont=dict(size=12, color='#F0F6FC'),
-                    hovertemplate='<b>%{x}</b><br>MAE: %{y:.4f}<extra></extra>',
-                    showlegend=False,
-                ), row=1, col=1)
-
-                fig_comp.add_trace(go.Bar(
-                    x=names, y=r2s,
-                    marker=dict(color=bar_colors_r2, line=dict(width=0)),
-                    text=[f"{v:.4f}" for v in r2s],
-                    textposition='outside',
-                    textfont=dict(size=12, color='#F0F6FC'),
-                    hovertemplate='<b>%{x}</b><br>R²: %{y:.4f}<extra></extra>',
-                    showlegend=False,
-                ), row=1, col=2)
-
-                # Add realistic zone band on R2 chart
-                fig_comp.add_hrect(
-                    y0=0.60, y1=0.90,
-                    fillcolor="rgba(36, 161, 72, 0.08)",
-                    line=dict(width=1, color="rgba(36, 161, 72, 0.3)", dash="dot"),
-                    row=1, col=2,
-                    annotation_text="Realistic Zone",
-                    annotation_position="top right",
-                    annotation=dict(font_size=9, font_color="#24A148"),
-                )
-
-                fig_comp.update_layout(
-                    **CHART_LAYOUT,
-                    height=340,
-                )
-                fig_comp.update_yaxes(gridcolor='rgba(48,54,61,0.4)', range=[0, max(maes) * 1.4], row=1, col=1)
-                fig_comp.update_yaxes(gridcolor='rgba(48,54,61,0.4)', range=[0, 1.0], row=1, col=2)
-                fig_comp.update_annotations(font=dict(color='#8B949E', size=12))
-
+                fig_comp = cached_figure(model_comparison, models)
                 st.plotly_chart(fig_comp, use_container_width=True)
 
             with col_detail:
@@ -640,6 +379,23 @@ def main():
                     </div>
                     """, unsafe_allow_html=True)
 
+        # ── HYPERPARAMETER SEARCH (successive halving trace) ─
+        search = model_info.get("search") or {}
+        if search.get("trace"):
+            with st.expander("Hyperparameter search (successive halving)"):
+                stopped = " — stopped at the time budget" if search.get("deadline_hit") else ""
+                st.caption(f"Last full retrain: {len(search['trace'])} evaluations in {search.get('seconds', 0):.1f}s, "
+                           f"validated on the {search['validation_rows']} hours before row {search['anchor_rows']}{stopped}")
+                best = pd.DataFrame([
+                    {"Model": name, "Rung": s["rung"], "Validation MAE": s["mae"],
+                     "Hyperparameters": json.dumps(s["params"]), "Fitted": s["evaluated"], "Cached": s["cached"]}
+                    for name, s in search["summary"].items()
+                ])
+                st.dataframe(best, hide_index=True, use_container_width=True)
+                trace = pd.DataFrame(search["trace"])
+                trace["params"] = trace["params"].map(json.dumps)
+                st.dataframe(trace.sort_values(["candidate", "rung", "mae"]), hide_index=True, use_container_width=True)
+
         # ── FOOTER ──────────────────────────────────────────
         st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
         st.markdown("<center style='color:#6E7681; font-size:0.8rem'>Developed by Muhammad Hamza Zeeshan | 10Pearls Internship 2026</center>", unsafe_allow_html=True)
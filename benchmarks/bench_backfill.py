@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+import socket
+import filecmp
+import tempfile
+import threading
+import tracemalloc
+import json
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+import requests
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import backfill_data
+from backfill_data import run_backfill, DEFAULT_START, DEFAULT_END
+
+# History backfill against a local stub of the OpenWeather history endpoint,
+# which serves data/karachi_aqi_history.csv with a fixed per-request latency
+# plus a per-row cost. Compares the old single-request backfill with the
+# chunked concurrent one, then interrupts a run midway and checks that the
+# resumed run only fetches the missing chunks and writes an identical CSV.
+
+REQUEST_LATENCY = 0.2    # Seconds per request
+ROW_LATENCY = 0.0005     # Seconds per row served (server-side query + transfer)
+
+
+class StubHistory:
+    def __init__(self, csv_path):
+        df = pd.read_csv(csv_path, parse_dates=['datetime'])
+        self.entries = [
+            {'dt': int(row.datetime.timestamp()), 'main': {'aqi': int(row.aqi)},
+             'components': {c: float(getattr(row, c)) for c in backfill_data.COMPONENTS}}
+            for row in df.itertuples()
+        ]
+        self.requests = 0
+        self.fail_after = None
+        self.lock = threading.Lock()
+
+    def query(self, start, end):
+        with self.lock:
+            self.requests += 1
+            failing = self.fail_after is not None and self.requests > self.fail_after
+        if failing:
+            return 401, {'cod': 401, 'message': 'Invalid API key (simulated interruption)'}
+        entries = [e for e in self.entries if start <= e['dt'] <= end]
+        time.sleep(REQUEST_LATENCY + ROW_LATENCY * len(entries))
+        return 200, {'coord': {'lat': backfill_data.LAT, 'lon': backfill_data.LON}, 'list': entries}
+
+
+def serve(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            # Avoid ~40 ms Nagle + delayed-ACK stalls on keep-alive connections
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            status, body = stub.query(int(query['start'][0]), int(query['end'][0]))
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def legacy_backfill(base_url, output_path):
+    """The previous backfill_data.py: one request, a list of dicts, one DataFrame."""
+    url = (f"{base_url}/air_pollution/history?lat={backfill_data.LAT}&lon={backfill_data.LON}"
+           f"&start={int(DEFAULT_START.timestamp())}&end={int(DEFAULT_END.timestamp())}&appid=x")
+    raw_data = requests.get(url).json()['list']
+    data_rows = []
+    for entry in raw_data:
+        row = {"datetime": datetime.fromtimestamp(entry['dt']), "aqi": entry['main']['aqi']}
+        row.update({c: entry['components'][c] for c in backfill_data.COMPONENTS})
+        data_rows.append(row)
+    pd.DataFrame(data_rows).to_csv(output_path, index=False)
+
+
+def measured(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    stub = StubHistory(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'))
+    server, base_url = serve(stub)
+    print(f"stub: {len(stub.entries)} hourly rows, {REQUEST_LATENCY * 1e3:.0f} ms/request "
+          f"+ {ROW_LATENCY * 1e3:.1f} ms/row")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, name) for name in ['legacy.csv', 'chunked.csv', 'resumed.csv']}
+        kwargs = dict(base_url=base_url, token='x', requests_per_minute=0,
+                      checkpoint_path=os.path.join(tmp, 'checkpoint.json'), parts_dir=os.path.join(tmp, 'parts'))
+
+        _, t_legacy, mem_legacy = measured(lambda: legacy_backfill(base_url, paths['legacy.csv']))
+        stub.requests = 0
+        _, t_chunked, mem_chunked = measured(lambda: run_backfill(output_path=paths['chunked.csv'], **kwargs))
+        n_chunks = stub.requests
+
+        print(f"\n  single request:        {t_legacy:6.2f}s, peak Python memory {mem_legacy / 1e6:6.2f} MB")
+        print(f"  {n_chunks} chunks x 4 workers:  {t_chunked:6.2f}s, peak Python memory {mem_chunked / 1e6:6.2f} MB")
+        print(f"  identical output: {filecmp.cmp(paths['legacy.csv'], paths['chunked.csv'], shallow=False)}")
+
+        # Interrupt after 10 requests, then resume
+        stub.requests, stub.fail_after = 0, 10
+        completed = run_backfill(output_path=paths['resumed.csv'], **kwargs)
+        first = stub.requests
+        stub.requests, stub.fail_after = 0, None
+        resumed = run_backfill(output_path=paths['resumed.csv'], **kwargs)
+        print(f"\n  interrupted run completed: {completed}, resumed run completed: {resumed}")
+        print(f"  requests: {first} before the interruption, {stub.requests} to resume ({n_chunks} chunks total)")
+        print(f"  identical output: {filecmp.cmp(paths['chunked.csv'], paths['resumed.csv'], shallow=False)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import tempfile
+import importlib.util
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+from parallel_training import train_candidates, CANDIDATES
+from backtest import walk_forward_backtest, select_candidate
+from bench_parallel_training import FEATURES, history_features, split
+
+# Walk-forward backtest cost per fold against today's single 80/20 split, cold
+# (every fold fitted), warm (same data, all folds cached) and after one more day
+# of hourly rows (only folds whose rows changed are refitted).
+
+
+def main():
+    candidates = [c for c in CANDIDATES if c != 'NeuralNetwork' or importlib.util.find_spec('tensorflow')]
+    print(f"cores: {os.cpu_count()}, candidates: {', '.join(candidates)}")
+    df = history_features()
+
+    start = time.perf_counter()
+    train_candidates(*split(df), candidates=candidates, parallel=False)
+    t_split = time.perf_counter() - start
+    print(f"\nsingle 80/20 split: {t_split:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'backtest_cache.json')
+        # The tiled history's first copy is the original, so this is "today + one more day"
+        next_day = history_features(scale=2).iloc[:len(df) + 24]
+        runs = [
+            ('cold', df),
+            ('warm (same data)', df),
+            ('next day (+24 rows)', next_day),
+        ]
+
+        for label, data in runs:
+            start = time.perf_counter()
+            summary = walk_forward_backtest(data[FEATURES], data['aqi'], candidates=candidates,
+                                            cache_path=cache_path)
+            elapsed = time.perf_counter() - start
+            folds = next(iter(summary.values()))['folds']
+            fitted = sum(s['evaluated'] for s in summary.values())
+            print(f"\n{label}: {elapsed:.2f}s for {folds} folds x {len(candidates)} candidates "
+                  f"({fitted} fitted) -> {elapsed / folds:.3f}s per fold "
+                  f"({elapsed / folds / t_split:.2f}x the single split)")
+            for name, s in summary.items():
+                print(f"  {name:>14}: MAE {s['mean_mae']:.4f} ± {s['std_mae']:.4f} (var {s['var_mae']:.6f})")
+            print(f"  selected: {select_candidate(summary)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import subprocess
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+# Cold start of each cli.py command: a fresh interpreter that parses the
+# command and imports what it runs, then exits (--import-only), so no network
+# or feature store is touched. Median of REPEATS runs each, next to a bare
+# interpreter and to the hourly ingest with the module-level imports it had
+# before (scipy.signal in features.py, pyarrow.dataset/parquet in store_backend.py).
+# tests/test_cli.py checks which packages each command loads.
+
+COMMANDS = ['ingest', 'ingest --cities', 'backfill', 'upload', 'train', 'infer', 'predict', 'serve', 'prune']
+REPEATS = 5
+INGEST_BUDGET = 1.0
+
+EAGER_INGEST = ("import sys; sys.path.insert(0, {src!r}); "
+                "import scipy.signal, pyarrow.dataset, pyarrow.parquet; import feature_pipeline")
+
+
+def startup(cmd):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, capture_output=True, cwd=ROOT)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    cli = [sys.executable, os.path.join(ROOT, 'src', 'cli.py'), '--import-only']
+    bare = startup([sys.executable, '-c', 'pass'])
+    eager = startup([sys.executable, '-c', EAGER_INGEST.format(src=os.path.join(ROOT, 'src'))])
+    print(f"start-up, median of {REPEATS} fresh processes (bare interpreter {bare * 1e3:.0f} ms)\n")
+    print(f"  {'ingest, previous eager imports':32s} {eager * 1e3:7.0f} ms")
+    results = {}
+    for command in COMMANDS:
+        results[command] = startup(cli + command.split())
+        print(f"  {'cli.py ' + command:32s} {results[command] * 1e3:7.0f} ms")
+
+    print(f"\n  ingest: {results['ingest']:.2f}s (budget {INGEST_BUDGET:.2f}s), "
+          f"{eager / results['ingest']:.1f}x faster than the eager imports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import io
+import os
+import sys
+import time
+import socket
+import shutil
+import hashlib
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+from openweather_client import HTTPClient
+import data_loader
+from data_loader import load_sources
+
+# Dashboard data loading against a local static file server serving data/
+# with ETag and Last-Modified validators, a fixed per-request latency and a
+# bandwidth cap. The old load_live_data() downloaded and parsed the three
+# files one after another on every refresh; the new one fetches them
+# concurrently, revalidates (304 for unchanged files), skips re-parsing
+# unchanged content and falls back to its disk cache when the origin is down
+# or slower than the read timeout.
+
+REQUEST_LATENCY = 0.15    # Seconds per request (round trip to the origin)
+BANDWIDTH = 1_000_000     # Bytes per second for response bodies
+FILES = {'forecast': 'aqi_forecast_72h.csv', 'model_info': 'model_info.json', 'history': 'karachi_aqi_history.csv'}
+
+
+class StaticFiles:
+    def __init__(self, directory):
+        self.directory = directory
+        self.latency = REQUEST_LATENCY
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def serve(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                path = os.path.join(stub.directory, os.path.basename(self.path))
+                with open(path, 'rb') as f:
+                    body = f.read()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                unchanged = self.headers.get('If-None-Match') == etag
+                with stub.lock:
+                    stub.requests += 1
+                    stub.not_modified += unchanged
+                    stub.bytes_sent += 0 if unchanged else len(body)
+                time.sleep(stub.latency)
+                self.send_response(304 if unchanged else 200)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', formatdate(os.path.getmtime(path), usegmt=True))
+                if unchanged:
+                    self.end_headers()
+                    return
+                time.sleep(len(body) / BANDWIDTH)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+
+def legacy_load(client, sources):
+    """The previous load_live_data(): three sequential downloads, everything re-parsed."""
+    df = pd.read_csv(io.StringIO(client.get(sources['forecast']).text))
+    df['forecast_time'] = pd.to_datetime(df['forecast_time'])
+    model_info = client.get(sources['model_info']).json()
+    history = pd.read_csv(io.StringIO(client.get(sources['history']).text))
+    history['datetime'] = pd.to_datetime(history['datetime'])
+    return df, model_info, history.sort_values('datetime')
+
+
+def timed(label, stub, fn):
+    stub.requests = stub.not_modified = stub.bytes_sent = 0
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    statuses = ', '.join(status for _, status in result.values()) if isinstance(result, dict) else 'downloaded x3'
+    print(f"  {label:34s} {elapsed * 1e3:7.0f} ms  {stub.requests} requests, {stub.not_modified} x 304, "
+          f"{stub.bytes_sent / 1e3:6.1f} kB  [{statuses}]")
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        served = os.path.join(tmp, 'served')
+        cache_dir = os.path.join(tmp, 'cache')
+        os.makedirs(served)
+        for name in FILES.values():
+            shutil.copy(os.path.join(ROOT, 'data', name), served)
+        stub = StaticFiles(served)
+        base_url = stub.serve()
+        sources = {key: f"{base_url}/{name}" for key, name in FILES.items()}
+        size = sum(os.path.getsize(os.path.join(served, name)) for name in FILES.values())
+        print(f"static server: {REQUEST_LATENCY * 1e3:.0f} ms/request, {BANDWIDTH / 1e6:.0f} MB/s, "
+              f"{size / 1e3:.0f} kB across {len(FILES)} files\n")
+
+        client = HTTPClient(read_timeout=1.0, max_retries=1)
+        legacy = timed("old sequential load", stub, lambda: legacy_load(client, sources))
+        cold = timed("cold start (empty disk cache)", stub, lambda: load_sources(client, sources, cache_dir))
+        timed("warm refresh, nothing changed", stub, lambda: load_sources(client, sources, cache_dir))
+        data_loader._parsed.clear()
+        timed("app restart, nothing changed", stub, lambda: load_sources(client, sources, cache_dir))
+
+        history_path = os.path.join(served, FILES['history'])
+        lines = open(history_path).read().splitlines()
+        with open(history_path, 'w') as f:
+            f.write('\n'.join(lines + lines[-1:]) + '\n')
+        changed = timed("history grew by one row", stub, lambda: load_sources(client, sources, cache_dir))
+
+        stub.latency = 3.0
+        slow = timed("origin slower than read timeout", stub, lambda: load_sources(client, sources, cache_dir))
+        stub.latency = REQUEST_LATENCY
+        stub.server.shutdown()
+        stub.server.server_close()
+        down = timed("origin down", stub, lambda: load_sources(client, sources, cache_dir))
+
+        same = (cold['forecast'][0].equals(legacy[0]) and cold['model_info'][0] == legacy[1]
+                and cold['history'][0].equals(legacy[2]))
+        print(f"\n  cold start matches the old loader: {same}")
+        print(f"  history after the change: {len(changed['history'][0])} rows (was {len(cold['history'][0])}); "
+              f"served while slow/down: {len(slow['history'][0])}/{len(down['history'][0])} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import time
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+from snapshot import build_snapshot, snapshot_bytes, read_snapshot
+from rollups import build_rollups
+import figures
+from figures import (
+    cached_figure, forecast_trend, category_donut, hourly_pattern, pollutant_radar, pollutant_trend,
+    long_term_history, model_comparison,
+)
+
+# Multi-session load test of the dashboard's figure construction, without
+# Streamlit. Each session is a thread (as in the Streamlit server) that
+# re-runs the page RERUNS_PER_SESSION times: it gets the cached data back
+# (st.cache_data unpickles a copy per rerun), builds the seven figures and
+# serializes them the way st.plotly_chart does (plotly.io.to_json). Per-rerun
+# server CPU is measured with thread_time(), once with the builders called
+# directly (before) and once through cached_figure() (after). Halfway through
+# the data changes (a new forecast), which has to show up in the figures.
+
+SESSIONS = 8
+RERUNS_PER_SESSION = 10
+
+
+def page_data():
+    history = pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'))
+    forecast = pd.read_csv(os.path.join(ROOT, 'data', 'aqi_forecast_72h.csv'))
+    with open(os.path.join(ROOT, 'data', 'model_info.json')) as f:
+        model_info = json.load(f)
+    rollups = build_rollups(history)
+    snapshot = read_snapshot(snapshot_bytes(build_snapshot(forecast, model_info)))
+    return {'snapshot': snapshot, 'history': rollups['hourly'],
+            'series': {col: rollups['daily'][['datetime', col]] for col in ['aqi', 'pm2_5']}}
+
+
+def render(data, build):
+    """The figure part of one main() rerun; returns the seven figures."""
+    snapshot, history = data['snapshot'], data['history']
+    forecast = snapshot['forecast']
+    latest = history.iloc[-1]
+    prev = history.iloc[-24] if len(history) >= 24 else None
+    figs = [
+        build(forecast_trend, forecast, snapshot['daily']),
+        build(category_donut, snapshot['categories'], len(forecast['predicted_aqi'])),
+        build(hourly_pattern, snapshot['hourly']),
+        build(pollutant_radar, latest, prev),
+        build(pollutant_trend, history.tail(168)),
+        build(long_term_history, data['series']),
+        build(model_comparison, snapshot['model_info']['models']),
+    ]
+    return figs
+
+
+def direct(builder, *args):
+    return builder(*args)
+
+
+def load_test(cached_data, build, serialize):
+    """Runs all sessions; returns per-rerun CPU seconds and the first figure JSON seen after each data change."""
+    cpu = []
+    lock = threading.Lock()
+    seen = {}
+
+    def session(sid):
+        for i in range(RERUNS_PER_SESSION):
+            version = 0 if i < RERUNS_PER_SESSION // 2 else 1
+            start = time.thread_time()
+            data = pickle.loads(cached_data[version])
+            figs = render(data, build)
+            payload = [pio.to_json(fig, validate=False) for fig in figs] if serialize else None
+            elapsed = time.thread_time() - start
+            with lock:
+                cpu.append(elapsed)
+                if payload is not None:
+                    seen.setdefault(version, payload[0])
+
+    threads = [threading.Thread(target=session, args=(sid,)) for sid in range(SESSIONS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array(cpu), seen
+
+
+def main():
+    data = page_data()
+    changed = pickle.loads(pickle.dumps(data))
+    changed['snapshot']['forecast']['predicted_aqi'] = changed['snapshot']['forecast']['predicted_aqi'] + 0.5
+    cached_data = [pickle.dumps(data), pickle.dumps(changed)]
+    reruns = SESSIONS * RERUNS_PER_SESSION
+    print(f"{SESSIONS} sessions x {RERUNS_PER_SESSION} reruns, 7 figures per rerun, new forecast halfway\n")
+
+    for serialize in [False, True]:
+        label = "build + to_json" if serialize else "build only     "
+        results = {}
+        for name, build in [('before', direct), ('after', cached_figure)]:
+            figures._figures.clear()
+            for key in figures.cache_stats:
+                figures.cache_stats[key] = 0
+            start = time.process_time()
+            cpu, seen = load_test(cached_data, build, serialize)
+            total = time.process_time() - start
+            results[name] = seen
+            print(f"  {label} {name:6s}: per rerun mean {cpu.mean() * 1e3:6.2f} ms, p95 "
+                  f"{np.percentile(cpu, 95) * 1e3:6.2f} ms | process CPU {total:5.2f}s for {reruns} reruns")
+        if serialize:
+            print(f"\n  cache: {figures.cache_stats['misses']} builds, {figures.cache_stats['hits']} hits, "
+                  f"{len(figures._figures)} figures held (limit {figures.FIGURE_CACHE_ENTRIES})")
+            print(f"  same figures as uncached: {results['before'] == results['after']}, "
+                  f"new forecast picked up: {results['after'][0] != results['after'][1]}")
+
+
+if __name__ == "__main__":
+    main()
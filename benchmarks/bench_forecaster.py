@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from sklearn.linear_model import Ridge
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from forecaster import recursive_forecast
+
+# Compares the vectorized recursive forecaster against the original per-step
+# DataFrame loop from inference_pipeline, for a Ridge and a RandomForest model.
+# Both paths are seeded identically and must produce the same forecast.
+
+FEATURES = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3', 'hour', 'day_of_week', 'month',
+            'aqi_lag_1h', 'pm2_5_lag_1h', 'co_lag_1h', 'no2_lag_1h', 'aqi_change_rate']
+SEED = 42
+REPEATS = 20
+
+
+def legacy_forecast(model, df, current_time, training_feature_names):
+    """The original run_inference() loop, kept verbatim as the reference."""
+    current_aqi = df['aqi'].values[0]
+    last_pm25 = df['pm2_5'].values[0]
+    last_co = df['co'].values[0]
+    last_no2 = df['no2'].values[0]
+    forecast_data = []
+    previous_aqi = current_aqi
+    for i in range(0, 72):
+        next_time = current_time + timedelta(hours=i)
+        decay_factor = 1.0 - (i * 0.008)
+        decay_factor = max(decay_factor, 0.3)
+        rush_hour_multiplier = 1.2 if next_time.hour in [7, 8, 9, 17, 18, 19] else 0.95
+        adjusted_co = last_co * decay_factor * rush_hour_multiplier
+        adjusted_no2 = last_no2 * decay_factor * rush_hour_multiplier
+        adjusted_pm25 = last_pm25 * decay_factor * rush_hour_multiplier
+        adjusted_pm10 = df['pm10'].values[0] * decay_factor * rush_hour_multiplier
+        aqi_change_rate = current_aqi - previous_aqi if i > 0 else 0
+        input_data = {
+            'co': [adjusted_co], 'no2': [adjusted_no2], 'o3': [df['o3'].values[0] * decay_factor],
+            'so2': [df['so2'].values[0] * decay_factor], 'pm2_5': [adjusted_pm25], 'pm10': [adjusted_pm10],
+            'nh3': [df['nh3'].values[0] * decay_factor],
+            'hour': [next_time.hour],
+            'day_of_week': [next_time.weekday()],
+            'month': [next_time.month],
+            'aqi_lag_1h': [current_aqi],
+            'pm2_5_lag_1h': [adjusted_pm25],
+            'co_lag_1h': [adjusted_co],
+            'no2_lag_1h': [adjusted_no2],
+            'aqi_change_rate': [aqi_change_rate]
+        }
+        X = pd.DataFrame(input_data)[training_feature_names]
+        prediction = model.predict(X)[0]
+        noise = np.random.normal(0, 0.3)
+        prediction = prediction + noise
+        prediction = max(0, min(prediction, 5))
+        forecast_data.append({
+            'forecast_time': next_time,
+            'predicted_aqi': round(float(prediction), 2)
+        })
+        previous_aqi = current_aqi
+        current_aqi = prediction
+    return pd.DataFrame(forecast_data)
+
+
+def load_history():
+    df = pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'), parse_dates=['datetime'])
+    df['hour'] = df['datetime'].dt.hour
+    df['day_of_week'] = df['datetime'].dt.dayofweek
+    df['month'] = df['datetime'].dt.month
+    df['aqi_lag_1h'] = df['aqi'].shift(1)
+    df['pm2_5_lag_1h'] = df['pm2_5'].shift(1)
+    df['co_lag_1h'] = df['co'].shift(1)
+    df['no2_lag_1h'] = df['no2'].shift(1)
+    df['aqi_change_rate'] = df['aqi'].shift(1) - df['aqi'].shift(2)
+    return df.dropna()
+
+
+def timed(fn):
+    timings = []
+    for _ in range(REPEATS):
+        np.random.seed(SEED)
+        start = time.perf_counter()
+        out = fn()
+        timings.append(time.perf_counter() - start)
+    return out, float(np.median(timings))
+
+
+def main():
+    history = load_history()
+    last = history.tail(1)
+    start_time = datetime.combine(datetime(2026, 2, 24).date() + timedelta(days=1), datetime.min.time())
+
+    models = {'Ridge': Ridge(alpha=50.0).fit(history[FEATURES], history['aqi'])}
+    rf_path = os.path.join(ROOT, 'models', 'best_model.joblib')
+    if os.path.exists(rf_path):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            models['RandomForest'] = joblib.load(rf_path)
+
+    print(f"{'model':>14} | {'loop (ms)':>10} | {'engine (ms)':>11} | {'speedup':>8} | parity")
+    print("-" * 62)
+    for name, model in models.items():
+        expected, t_loop = timed(lambda: legacy_forecast(model, last, start_time, FEATURES))
+        actual, t_engine = timed(lambda: recursive_forecast(model, last.iloc[0], start_time, FEATURES))
+        parity = expected.equals(actual)
+        print(f"{name:>14} | {t_loop * 1e3:>10.2f} | {t_engine * 1e3:>11.2f} | {t_loop / t_engine:>7.1f}x | {'OK' if parity else 'MISMATCH'}")
+        if not parity:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
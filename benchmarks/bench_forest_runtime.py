@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import warnings
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+from forest_runtime import export_forest, NUMBA_AVAILABLE
+from bench_forecaster import FEATURES, load_history
+
+# Latency/throughput of the flat-array forest runtime against sklearn's
+# RandomForestRegressor.predict, for batch sizes 1 to 100k. Parity with
+# sklearn is checked by tests/test_forest_runtime.py.
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+
+
+def timed(fn, min_time=0.2):
+    fn()  # warm-up (includes numba compilation / cache load)
+    runs, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        fn()
+        runs += 1
+    return (time.perf_counter() - start) / runs
+
+
+def sample_rows(history, n):
+    rng = np.random.default_rng(0)
+    return history[FEATURES].iloc[rng.integers(0, len(history), n)].reset_index(drop=True)
+
+
+def main():
+    print(f"numba available: {NUMBA_AVAILABLE}")
+    history = load_history()
+
+    forests = {
+        'fitted (50 trees, depth 5)': RandomForestRegressor(
+            n_estimators=50, max_depth=5, min_samples_leaf=20, max_features='sqrt', random_state=42
+        ).fit(history[FEATURES], history['aqi']),
+        'fitted (100 trees, full depth)': RandomForestRegressor(
+            n_estimators=100, random_state=42
+        ).fit(history[FEATURES], history['aqi']),
+    }
+    for filename in ['best_model.joblib', 'karachi_aqi_model.joblib']:
+        path = os.path.join(ROOT, 'models', filename)
+        if os.path.exists(path):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                forests[filename] = joblib.load(path)
+
+    for name, model in forests.items():
+        flat = export_forest(model)
+        print(f"\n{name}: {flat.n_estimators} trees, {flat.n_nodes:,} nodes")
+
+        features = list(model.feature_names_in_)
+        print(f"  {'batch':>8} | {'sklearn (ms)':>12} | {'flat (ms)':>10} | {'speedup':>8} | {'flat rows/s':>12}")
+        print("  " + "-" * 62)
+        for n in BATCH_SIZES:
+            X = sample_rows(history, n)[features].to_numpy()
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                t_sk = timed(lambda: model.predict(X))
+            t_flat = timed(lambda: flat.predict(X))
+            print(f"  {n:>8,} | {t_sk * 1e3:>12.3f} | {t_flat * 1e3:>10.3f} | "
+                  f"{t_sk / t_flat:>7.1f}x | {n / t_flat:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from history_store import HistoryStore, write_store, append_rows, RECORD_DTYPE
+
+# History range queries: the CSV (parse it all, then filter) against the
+# memory-mapped binary store (binary search + slice), at today's row count
+# and 10x / 100x of it. Each measurement runs in a fresh process so open time
+# and RSS growth aren't flattered by an earlier run; the files are in the page
+# cache for both formats. A query asks for one week at a random position.
+# RSS growth is split into private memory and file pages mapped in from the
+# page cache (shared and reclaimable; the kernel maps neighbouring pages
+# around each fault, so random binary searches map more than they read).
+# Also checks that the store returns exactly the CSV's rows and that an hourly
+# append only ever grows the file.
+
+SCALES = [1, 10, 100]
+QUERIES = 200
+
+MEASURE = r"""
+import sys, time, json
+import numpy as np, pandas as pd
+sys.path.insert(0, {src!r})
+from history_store import HistoryStore
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        status = dict(line.split(':', 1) for line in f)
+    return np.array([int(status[k].split()[0]) for k in ('RssAnon', 'RssFile')])
+
+rng = np.random.default_rng(0)
+before = rss_kb()
+start = time.perf_counter()
+if {fmt!r} == 'csv':
+    df = pd.read_csv({path!r})
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    times = df['datetime'].to_numpy()
+    query = lambda t0, t1: df[(df['datetime'] >= t0) & (df['datetime'] < t1)]
+else:
+    store = HistoryStore({path!r})
+    times = store.records['datetime']
+    query = store.range
+t_open = time.perf_counter() - start
+t0s = times[rng.integers(0, len(times) - 200, {queries})]
+start = time.perf_counter()
+for t0 in t0s:
+    rows = query(t0, t0 + np.timedelta64(7, 'D'))
+    float(np.asarray(rows['pm2_5']).mean())
+t_query = (time.perf_counter() - start) / {queries}
+anon, mapped = (rss_kb() - before).tolist()
+print(json.dumps({{'open': t_open, 'query': t_query, 'anon_kb': anon, 'file_kb': mapped}}))
+"""
+
+
+def measure(fmt, path):
+    code = MEASURE.format(src=os.path.join(ROOT, 'src'), fmt=fmt, path=path, queries=QUERIES)
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def scaled(history, scale):
+    """``scale`` back-to-back copies of the history, shifted so the hours stay unique and increasing."""
+    span = history['datetime'].iloc[-1] - history['datetime'].iloc[0] + pd.Timedelta(hours=1)
+    copies = [history.assign(datetime=history['datetime'] + span * (i - scale + 1)) for i in range(scale)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def main():
+    history = pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'), parse_dates=['datetime'])
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"one-week range query, {QUERIES} random positions; record size {RECORD_DTYPE.itemsize} bytes")
+        for scale in SCALES:
+            df = scaled(history, scale)
+            csv_path, store_path = os.path.join(workdir, 'history.csv'), os.path.join(workdir, 'history.bin')
+            df.to_csv(csv_path, index=False)
+            write_store(df, store_path)
+            csv, store = measure('csv', csv_path), measure('store', store_path)
+            print(f"\n  {scale:3d}x ({len(df):,} rows): CSV {os.path.getsize(csv_path) / 1e6:6.1f} MB, "
+                  f"store {os.path.getsize(store_path) / 1e6:6.1f} MB")
+            for name, r in [('CSV  ', csv), ('store', store)]:
+                print(f"    {name}  open {r['open'] * 1e3:8.2f} ms   query {r['query'] * 1e6:8.1f} us   "
+                      f"RSS +{r['anon_kb'] / 1024:6.1f} MB private, +{r['file_kb'] / 1024:5.1f} MB mapped page cache")
+
+        # Same rows as the CSV, and an append adds bytes without rewriting the head of the file
+        store_path = os.path.join(workdir, 'today.bin')
+        write_store(history.iloc[:-24], store_path)
+        with open(store_path, 'rb') as f:
+            head = f.read()
+        sizes = []
+        for i in range(len(history) - 24, len(history)):
+            append_rows(history.iloc[i:i + 1], store_path)
+            sizes.append(os.path.getsize(store_path))
+        with open(store_path, 'rb') as f:
+            unchanged = f.read(len(head)) == head
+        frame = HistoryStore(store_path).frame()
+        same = (frame['datetime'].equals(history['datetime'].astype('datetime64[ns]'))
+                and all(np.array_equal(frame[c].to_numpy(), history[c].to_numpy()) for c in history.columns[1:]))
+        grew = all(b - a == RECORD_DTYPE.itemsize for a, b in zip(sizes, sizes[1:]))
+        print(f"\n  24 hourly appends: +{RECORD_DTYPE.itemsize} bytes each: {grew}, earlier bytes untouched: "
+              f"{unchanged}; store == CSV: {same}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
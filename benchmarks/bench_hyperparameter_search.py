@@ -0,0 +1,156 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import contextlib
+import importlib.util
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from features import compute_features
+from store_backend import connect
+from parallel_training import CANDIDATES, DEFAULT_PARAMS, FIT_FUNCTIONS
+from hyperparameter_search import (
+    search_hyperparameters, sample_configs, BUDGETS, SEARCH_STEP, VALIDATION_ROWS,
+)
+
+# Successive-halving search on the training split of the real history.
+# 1. Cold search, the same search again and the following daily runs (+24
+#    rows each; every evaluation is cached until the weekly anchor moves),
+#    against scoring every sampled config at full budget. The chosen params and DEFAULT_PARAMS are then refitted on
+#    the whole training split and scored on the 20% test split.
+# 2. The wall-clock budget cut at fractions of the cold search time: the rung
+#    each candidate reached and the time actually spent.
+# 3. The training pipeline on the local store backend: one full retrain, and
+#    the search trace it writes into model_info.json.
+# NeuralNetwork is skipped when tensorflow isn't installed.
+
+TRAIN_FRACTION = 0.8
+DEADLINE_FRACTIONS = [0.1, 0.5]
+DAYS = 8
+
+
+def history():
+    df = compute_features(pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'))).dropna()
+    return df.reset_index(drop=True)
+
+
+def exhaustive(X, y, candidates):
+    """Every sampled config at full budget on the search's rows: what successive halving avoids."""
+    anchor = len(X) // SEARCH_STEP * SEARCH_STEP
+    fit_end = anchor - VALIDATION_ROWS
+    X_arr, y_arr = X.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64)
+    best, fits = {}, 0
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in candidates:
+            scored = []
+            for params in sample_configs(name):
+                _, pred = FIT_FUNCTIONS[name](X_arr[:fit_end], y_arr[:fit_end], X_arr[fit_end:anchor],
+                                              y_arr[fit_end:anchor], params, list(X.columns), 1, workdir)
+                scored.append((mean_absolute_error(y_arr[fit_end:anchor], pred), params))
+                fits += 1
+            best[name] = min(scored, key=lambda s: s[0])
+    return best, fits
+
+
+def test_mae(name, params, X_train, y_train, X_test, y_test):
+    with tempfile.TemporaryDirectory() as workdir:
+        _, pred = FIT_FUNCTIONS[name](X_train.to_numpy(dtype=np.float64), y_train.to_numpy(dtype=np.float64),
+                                      X_test.to_numpy(dtype=np.float64), y_test.to_numpy(dtype=np.float64),
+                                      params, list(X_train.columns), 1, workdir)
+    return mean_absolute_error(y_test, pred)
+
+
+def search_costs(df, candidates, workdir):
+    X, y = df.drop(columns=['datetime', 'aqi']), df['aqi']
+    split = int(len(df) * TRAIN_FRACTION)
+    cache_path = os.path.join(workdir, 'search_cache.json')
+    print(f"{split:,} training rows, candidates: {', '.join(candidates)}; "
+          f"budgets {', '.join(f'{b:.2f}' for b in BUDGETS)}\n")
+
+    cold = None
+    days = [(f'day {d}, +{24 * (d - 1)} rows', split + 24 * (d - 1)) for d in range(2, DAYS + 1)]
+    for label, rows in [('cold', split), ('rerun (same data)', split)] + days:
+        start = time.perf_counter()
+        report = search_hyperparameters(X.iloc[:rows], y.iloc[:rows], candidates=candidates, cache_path=cache_path)
+        elapsed = time.perf_counter() - start
+        cold = cold or (elapsed, report)
+        fitted = sum(s['evaluated'] for s in report['summary'].values())
+        cached = sum(s['cached'] for s in report['summary'].values())
+        print(f"  search, {label:20s} {elapsed:7.2f}s   {fitted:3d} fitted, {cached:3d} cached   "
+              f"anchor row {report['anchor_rows']}")
+
+    start = time.perf_counter()
+    best_full, fits = exhaustive(X.iloc[:split], y.iloc[:split], candidates)
+    t_full = time.perf_counter() - start
+    print(f"  every config at full budget   {t_full:7.2f}s   {fits:3d} fitted "
+          f"({t_full / cold[0]:.1f}x the cold search)")
+
+    report = cold[1]
+    X_train, y_train, X_test, y_test = X.iloc[:split], y.iloc[:split], X.iloc[split:], y.iloc[split:]
+    print("\n  validation MAE (search / exhaustive best) and test MAE (searched params / defaults)")
+    for name in candidates:
+        s = report['summary'][name]
+        searched = test_mae(name, s['params'], X_train, y_train, X_test, y_test)
+        default = test_mae(name, DEFAULT_PARAMS[name], X_train, y_train, X_test, y_test)
+        print(f"    {name:14s} {s['mae']:.4f} / {best_full[name][0]:.4f}   test {searched:.4f} / {default:.4f}   "
+              f"{json.dumps(s['params'])}")
+    return X.iloc[:split], y.iloc[:split], cold[0]
+
+
+def deadlines(X, y, candidates, t_cold):
+    print()
+    for fraction in DEADLINE_FRACTIONS:
+        seconds = t_cold * fraction
+        report = search_hyperparameters(X, y, candidates=candidates, cache_path=None, seconds=seconds)
+        rungs = ", ".join(f"{name} rung {s['rung']}" for name, s in report['summary'].items()) or "no rung completed"
+        print(f"  budget {seconds:5.2f}s ({fraction:.0%} of cold): took {report['seconds']:5.2f}s, "
+              f"deadline hit: {report['deadline_hit']}; {rungs}")
+
+
+def pipeline_run(workdir, df, candidates):
+    import warnings
+    warnings.filterwarnings('ignore')
+    from training_pipeline import run_training
+    os.makedirs(os.path.join(workdir, 'run'))
+    os.chdir(os.path.join(workdir, 'run'))
+    os.environ['STORE_BACKEND'] = 'local'
+    os.environ['LOCAL_STORE_DIR'] = os.path.join(workdir, 'store')
+    fs = connect().get_feature_store()
+    fg = fs.get_or_create_feature_group(name='karachi_aqi_fg', version=1, primary_key=['datetime'],
+                                        event_time='datetime')
+    fg.insert(df)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = run_training(candidates=candidates)
+    elapsed = time.perf_counter() - start
+    search = run['model_info']['search']
+    print(f"\n  training pipeline, full retrain {elapsed:.2f}s (search {search['seconds']:.2f}s); model_info.json "
+          f"search trace: {len(search['trace'])} evaluations, "
+          f"{len(json.dumps(search)) / 1024:.1f} KiB")
+
+
+def main():
+    candidates = [c for c in CANDIDATES if c != 'NeuralNetwork' or importlib.util.find_spec('tensorflow')]
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        df = history()
+        X, y, t_cold = search_costs(df, candidates, workdir)
+        deadlines(X, y, candidates, t_cold)
+        pipeline_run(workdir, df, candidates)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+    if 'NeuralNetwork' not in candidates:
+        print("\n(tensorflow not installed: NeuralNetwork skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+import importlib.util
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from features import compute_features
+from parallel_training import DEFAULT_PARAMS, CANDIDATES
+from incremental_training import RidgeStats, ridge_model, grow_forest, RECENT_ROWS, MAX_TREES_FACTOR
+from store_backend import connect
+
+# Daily model updates as the history grows: DAYS days of 24 new rows each,
+# on the history tiled to SCALES x its length.
+#   full retrain   Ridge / RandomForest refitted from scratch on every row
+#   incremental    Ridge from its sufficient statistics (O(new rows)),
+#                  RandomForest warm-started with new trees on the recent rows
+# Accuracy is the MAE on each new day before either model has seen it.
+# The incremental Ridge must match a full Ridge fit on the same rows.
+# Then the training pipeline itself on the local store backend: a full retrain
+# followed by incremental days. NeuralNetwork fine-tuning needs tensorflow and
+# is skipped when it isn't installed.
+
+SCALES = [1, 4, 10]
+DAYS = 7
+
+
+def history_features(scale):
+    df = pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'), parse_dates=['datetime'])
+    rng = np.random.default_rng(0)
+    span = df['datetime'].iloc[-1] - df['datetime'].iloc[0] + pd.Timedelta(hours=1)
+    pollutants = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        copy['datetime'] = copy['datetime'] + (k - scale + 1) * span
+        if k < scale - 1:
+            copy[pollutants] = copy[pollutants] * rng.uniform(0.9, 1.1, (len(copy), len(pollutants)))
+        copies.append(copy)
+    return compute_features(pd.concat(copies, ignore_index=True)).dropna().reset_index(drop=True)
+
+
+def compare(df):
+    features = [c for c in df.columns if c not in ('datetime', 'aqi')]
+    X, y = df[features], df['aqi'].to_numpy(dtype=np.float64)
+    start_row = len(df) - DAYS * 24
+    ridge_params, forest_params = DEFAULT_PARAMS['Ridge'], DEFAULT_PARAMS['RandomForest']
+    max_trees = MAX_TREES_FACTOR * forest_params['n_estimators']
+
+    stats = RidgeStats(len(features)).update(X.iloc[:start_row], y[:start_row])
+    forest = RandomForestRegressor(**forest_params, random_state=42).fit(X.iloc[:start_row], y[:start_row])
+    full_forest = forest
+    times = {key: 0.0 for key in ('ridge_full', 'ridge_inc', 'forest_full', 'forest_inc')}
+    errors = {key: [] for key in times}
+    max_coef_diff = 0.0
+    for day in range(DAYS):
+        lo, hi = start_row + day * 24, start_row + (day + 1) * 24
+        X_day, y_day = X.iloc[lo:hi], y[lo:hi]
+
+        # Score on the new day before learning it
+        full_ridge = Ridge(alpha=ridge_params['alpha']).fit(X.iloc[:lo], y[:lo])
+        errors['ridge_full'].append(mean_absolute_error(y_day, full_ridge.predict(X_day)))
+        errors['ridge_inc'].append(mean_absolute_error(y_day, ridge_model(stats, ridge_params['alpha'], features).predict(X_day)))
+        errors['forest_full'].append(mean_absolute_error(y_day, full_forest.predict(X_day)))
+        errors['forest_inc'].append(mean_absolute_error(y_day, forest.predict(X_day)))
+
+        start = time.perf_counter()
+        full_ridge = Ridge(alpha=ridge_params['alpha']).fit(X.iloc[:hi], y[:hi])
+        times['ridge_full'] += time.perf_counter() - start
+        start = time.perf_counter()
+        stats.update(X_day, y_day)
+        inc_ridge = ridge_model(stats, ridge_params['alpha'], features)
+        times['ridge_inc'] += time.perf_counter() - start
+        max_coef_diff = max(max_coef_diff, float(np.abs(inc_ridge.coef_ - full_ridge.coef_).max()),
+                            abs(inc_ridge.intercept_ - full_ridge.intercept_))
+
+        start = time.perf_counter()
+        full_forest = RandomForestRegressor(**forest_params, random_state=42).fit(X.iloc[:hi], y[:hi])
+        times['forest_full'] += time.perf_counter() - start
+        start = time.perf_counter()
+        grow_forest(forest, X.iloc[max(0, hi - RECENT_ROWS):hi], y[max(0, hi - RECENT_ROWS):hi], max_trees=max_trees)
+        times['forest_inc'] += time.perf_counter() - start
+    return ({k: v / DAYS for k, v in times.items()}, {k: float(np.mean(v)) for k, v in errors.items()},
+            max_coef_diff, len(forest.estimators_))
+
+
+def pipeline_days(workdir, candidates):
+    import warnings
+    warnings.filterwarnings('ignore')
+    from training_pipeline import run_training
+    from incremental_training import IncrementalState
+    history = compute_features(pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'))).dropna()
+    os.makedirs(os.path.join(workdir, 'run'))
+    os.chdir(os.path.join(workdir, 'run'))
+    os.environ['STORE_BACKEND'] = 'local'
+    os.environ['LOCAL_STORE_DIR'] = os.path.join(workdir, 'store')
+    fs = connect().get_feature_store()
+    fg = fs.get_or_create_feature_group(name='karachi_aqi_fg', version=1, primary_key=['datetime'],
+                                        event_time='datetime')
+    fg.insert(history.iloc[:-72])
+    print(f"\ntraining pipeline, {len(history):,}-row history, candidates: {', '.join(candidates)}")
+    for day, rows in enumerate([None, history.iloc[-72:-48], history.iloc[-48:-24], history.iloc[-24:]], 1):
+        if rows is not None:
+            fg.insert(rows)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = run_training(candidates=candidates)
+        elapsed = time.perf_counter() - start
+        updates = IncrementalState().meta['updates']
+        mode = f"incremental update {updates}" if updates else "full retrain"
+        info = run['model_info']['models']
+        print(f"  day {day}: {mode:22s} {elapsed:6.2f}s  model v{run['model_version']}  "
+              + ", ".join(f"{m['name']} MAE {m['mae']:.4f}" for m in info))
+
+
+def main():
+    print(f"{DAYS} daily updates of 24 rows; time per update, MAE on each new day before learning it")
+    for scale in SCALES:
+        df = history_features(scale)
+        times, errors, coef_diff, trees = compare(df)
+        print(f"\n  {scale:2d}x history ({len(df):,} rows)")
+        print(f"    Ridge          full {times['ridge_full'] * 1e3:8.2f} ms   incremental {times['ridge_inc'] * 1e3:7.2f} ms"
+              f"  ({times['ridge_full'] / times['ridge_inc']:6.1f}x)   MAE {errors['ridge_full']:.4f} / "
+              f"{errors['ridge_inc']:.4f}   max |coef diff| {coef_diff:.1e}")
+        print(f"    RandomForest   full {times['forest_full'] * 1e3:8.1f} ms   incremental {times['forest_inc'] * 1e3:7.1f} ms"
+              f"  ({times['forest_full'] / times['forest_inc']:6.1f}x)   MAE {errors['forest_full']:.4f} / "
+              f"{errors['forest_inc']:.4f}   {trees} trees")
+
+    candidates = [c for c in CANDIDATES if c != 'NeuralNetwork' or importlib.util.find_spec('tensorflow')]
+    if 'NeuralNetwork' not in candidates:
+        print("\n(tensorflow not installed: NeuralNetwork fine-tuning skipped)")
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        pipeline_days(workdir, candidates)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import warnings
+import sklearn.ensemble  # noqa: F401 - imported up front so the cold timing excludes import cost
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from model_cache import ModelCache
+
+# Cold / warm-disk / in-process load latency of the model artifact cache against
+# a local stand-in for the Hopsworks model registry. Hits, content addressing and
+# LRU eviction are checked by tests/test_model_cache.py.
+
+DOWNLOAD_LATENCY = 0.5  # Seconds a registry download takes in the stand-in
+
+
+class LocalRegistryModel:
+    """Stands in for a hopsworks Model: name, version and download() into a fresh directory."""
+
+    def __init__(self, name, version, artifact, download_root, latency=DOWNLOAD_LATENCY):
+        self.name = name
+        self.version = version
+        self.artifact = artifact
+        self.download_root = download_root
+        self.latency = latency
+        self.downloads = 0
+
+    def download(self):
+        self.downloads += 1
+        time.sleep(self.latency)
+        target = tempfile.mkdtemp(prefix=f'{self.name}-{self.version}-', dir=self.download_root)
+        shutil.copy(self.artifact, os.path.join(target, 'best_model.joblib'))
+        return target
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    artifact = os.path.join(ROOT, 'models', 'karachi_aqi_model.joblib')
+    size = os.path.getsize(artifact)
+
+    warnings.simplefilter('ignore')
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'cache')
+        v19 = LocalRegistryModel('karachi_aqi_model', 19, artifact, tmp)
+
+        cache = ModelCache(root=root)
+        _, t_cold = timed(lambda: cache.load(v19))
+        _, t_memo = timed(lambda: cache.load(v19))
+        # A new process: the memo is empty but the artifact is on disk
+        restarted = ModelCache(root=root)
+        _, t_disk = timed(lambda: restarted.load(v19))
+
+        print(f"artifact size: {size / 1e6:.1f} MB, simulated download: {DOWNLOAD_LATENCY * 1e3:.0f} ms")
+        print(f"  cold (download + unpickle): {t_cold * 1e3:8.1f} ms")
+        print(f"  warm disk (unpickle only):  {t_disk * 1e3:8.1f} ms")
+        print(f"  in-process memo:            {t_memo * 1e3:8.3f} ms")
+        print(f"  registry downloads: {v19.downloads}, stats: {cache.stats} / {restarted.stats}")
+
+
+if __name__ == "__main__":
+    main()
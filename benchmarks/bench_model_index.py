@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+from datetime import datetime, timedelta
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from store_backend import LocalModelRegistry
+from model_index import (
+    ModelIndex, record_version, prune_registry, MODEL_NAME, MIN_ACCEPTABLE_R2, MAX_REALISTIC_R2, KEEP_LATEST,
+    RELIST_SECONDS,
+)
+from inference_pipeline import select_model
+
+# Model selection at inference against the number of registered versions, on
+# the local registry backend (one tiny artifact per version, R2 drawn from
+# 0.50-0.97 so some versions fall outside the realistic zone).
+#   scan    what run_inference did before: get_models() reads every version's
+#           metadata, filters to the realistic zone and takes the best R2
+#   index   select_model(): a get_model() for the version after the newest
+#           indexed one (nothing new: it doesn't exist), the champion pointer in
+#           data/model_index.json, then one get_model() for that version
+# Registry metadata reads are counted; on Hopsworks each one is a REST round
+# trip, so the estimate adds REMOTE_LATENCY per read. Both must pick the same
+# version. Then the training side (recording a new version) and pruning to the
+# champion + KEEP_LATEST newest versions, and a version registered without
+# touching the index (training on another host), which the next select must pick up.
+# Last, a gap: the version after the newest indexed one is deleted, so the
+# probe stops short of the version after it; the next registry listing (due
+# RELIST_SECONDS after the last) must index it.
+
+SIZES = [100, 1000, 5000]
+REPEATS = 5
+REMOTE_LATENCY = 0.05   # Seconds per registry metadata request on a remote registry
+
+
+class CountingRegistry(LocalModelRegistry):
+    reads = 0
+
+    def get_model(self, name, version=None):
+        CountingRegistry.reads += 1
+        return super().get_model(name, version)
+
+
+def scan_select(mr, name=MODEL_NAME):
+    all_models = mr.get_models(name)
+    realistic = [m for m in all_models if MIN_ACCEPTABLE_R2 <= m.training_metrics.get('r2', 0) <= MAX_REALISTIC_R2]
+    if realistic:
+        return max(realistic, key=lambda m: m.training_metrics.get('r2', 0))
+    return mr.get_best_model(name, "r2", "max")
+
+
+def populate(mr, n, artifact):
+    rng = np.random.default_rng(0)
+    for r2 in rng.uniform(0.50, 0.97, n):
+        mr.python.create_model(name=MODEL_NAME, metrics={'mae': 0.1, 'r2': float(r2)}).save(artifact)
+
+
+def timed(fn):
+    CountingRegistry.reads = 0
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        times.append(time.perf_counter() - start)
+    return result, float(np.median(times)), CountingRegistry.reads // REPEATS
+
+
+def run(n, workdir):
+    store = os.path.join(workdir, f'store-{n}')
+    index_path = os.path.join(workdir, f'model_index-{n}.json')
+    mr = CountingRegistry(os.path.join(store, 'model_registry'))
+    artifact = os.path.join(workdir, 'best_model.joblib')
+    with open(artifact, 'wb') as f:
+        f.write(b'\0' * 1024)
+    populate(mr, n, artifact)
+
+    start = time.perf_counter()
+    ModelIndex(index_path).rebuild(mr.get_models(MODEL_NAME))
+    t_build = time.perf_counter() - start
+
+    scanned, t_scan, scan_reads = timed(lambda: scan_select(mr))
+    indexed, t_index, index_reads = timed(lambda: select_model(mr, path=index_path))
+    print(f"\n  {n:5d} versions   scan {t_scan * 1e3:8.1f} ms ({scan_reads} reads, ~{scan_reads * REMOTE_LATENCY:6.1f}s "
+          f"remote)   index {t_index * 1e3:6.2f} ms ({index_reads} reads, ~{index_reads * REMOTE_LATENCY:.2f}s remote)   "
+          f"same version: {scanned.version == indexed.version} (v{indexed.version})")
+
+    # Training side: one more version recorded in the index, no scan
+    mr.python.create_model(name=MODEL_NAME, metrics={'mae': 0.1, 'r2': 0.5}).save(artifact)
+    start = time.perf_counter()
+    record_version(mr, n + 1, {'mae': 0.1, 'r2': 0.5}, path=index_path)
+    t_record = time.perf_counter() - start
+    size = os.path.getsize(index_path) / 1024
+
+    os.environ['STORE_BACKEND'] = 'local'
+    os.environ['LOCAL_STORE_DIR'] = store
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pruned = prune_registry(path=index_path)
+    t_prune = time.perf_counter() - start
+    after, t_after, _ = timed(lambda: select_model(mr, path=index_path))
+    remaining = len(mr.get_models(MODEL_NAME))
+    print(f"                  first index build {t_build * 1e3:.0f} ms ({size:.0f} KiB); record a version "
+          f"{t_record * 1e3:.1f} ms; prune {len(pruned)} in {t_prune:.2f}s -> {remaining} left, "
+          f"champion unchanged: {after.version == indexed.version}; index select after pruning {t_after * 1e3:.2f} ms")
+
+    # Registered elsewhere: the index file doesn't know about it, the next select does
+    newer = mr.python.create_model(name=MODEL_NAME, metrics={'mae': 0.1, 'r2': MAX_REALISTIC_R2}).save(artifact)
+    picked, _, _ = timed(lambda: select_model(mr, path=index_path, verbose=False))
+    expected = scan_select(mr)
+    print(f"                  v{newer.version} registered without the index: indexed on the next select: "
+          f"{str(newer.version) in ModelIndex(index_path).versions}, selection == scan: "
+          f"{picked.version == expected.version} (v{picked.version})")
+
+    gap = mr.python.create_model(name=MODEL_NAME, metrics={'mae': 0.1, 'r2': 0.7}).save(artifact)
+    past_gap = mr.python.create_model(name=MODEL_NAME, metrics={'mae': 0.1, 'r2': 0.7}).save(artifact)
+    gap.delete()
+    select_model(mr, path=index_path, verbose=False)
+    probed = str(past_gap.version) in ModelIndex(index_path).versions
+    index = ModelIndex(index_path)
+    index.listed_at = (datetime.now() - timedelta(seconds=RELIST_SECONDS)).isoformat()
+    index.save()
+    picked, _, _ = timed(lambda: select_model(mr, path=index_path, verbose=False))
+    print(f"                  v{gap.version} deleted: v{past_gap.version} indexed by the probe: {probed}, "
+          f"by the listing {RELIST_SECONDS}s later: {str(past_gap.version) in ModelIndex(index_path).versions}, "
+          f"selection == scan: {picked.version == scan_select(mr).version}")
+
+
+def main():
+    print(f"champion selection, median of {REPEATS}; remote estimate at {REMOTE_LATENCY * 1e3:.0f} ms per "
+          f"metadata read; retention: champion + {KEEP_LATEST} newest")
+    workdir = tempfile.mkdtemp()
+    try:
+        for n in SIZES:
+            run(n, workdir)
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
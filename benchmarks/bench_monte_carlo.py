@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+import joblib
+import numpy as np
+from datetime import datetime
+from sklearn.linear_model import Ridge
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+from forecaster import recursive_forecast, monte_carlo_forecast
+from bench_forecaster import FEATURES, load_history, legacy_forecast
+
+# Time and peak memory of the batched Monte Carlo forecaster against the number
+# of trajectories, next to the single-trajectory forecast (original loop and engine).
+
+PATH_COUNTS = [1, 10, 100, 1_000, 10_000]
+REPEATS = 5
+
+
+def measure(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(timings)), peak
+
+
+def main():
+    history = load_history()
+    last = history.iloc[-1]
+    start_time = datetime(2026, 2, 25)
+
+    models = {'Ridge': Ridge(alpha=50.0).fit(history[FEATURES], history['aqi'])}
+    rf_path = os.path.join(ROOT, 'models', 'best_model.joblib')
+    if os.path.exists(rf_path):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            models['RandomForest'] = joblib.load(rf_path)
+
+    for name, model in models.items():
+        t_legacy, _ = measure(lambda: legacy_forecast(model, history.tail(1), start_time, FEATURES))
+        t_single, m_single = measure(lambda: recursive_forecast(model, last, start_time, FEATURES))
+        print(f"\n{name}: original loop {t_legacy * 1e3:.2f} ms, "
+              f"single trajectory {t_single * 1e3:.2f} ms, peak {m_single / 1024:.0f} KiB")
+        print(f"{'paths':>8} | {'time (ms)':>10} | {'vs single':>9} | {'vs loop':>8} | {'peak (KiB)':>10}")
+        print("-" * 58)
+        for n_paths in PATH_COUNTS:
+            rng = np.random.default_rng(0)
+            t_mc, m_mc = measure(lambda: monte_carlo_forecast(model, last, start_time, FEATURES,
+                                                              n_paths=n_paths, rng=rng))
+            print(f"{n_paths:>8,} | {t_mc * 1e3:>10.2f} | {t_mc / t_single:>8.2f}x | "
+                  f"{t_mc / t_legacy:>7.2f}x | {m_mc / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from openweather_client import OpenWeatherClient
+from city_ingest import ingest, collect_new_rows
+from watermark import load_city_watermarks, insert_with_city_watermarks
+
+# Hourly ingest of 100 cities against a local stub of /air_pollution whose
+# per-city latency is drawn between 50 and 400 ms. A sequential loop pays the
+# sum of the latencies; the asyncio fan-out should finish in about the slowest
+# one. The second hour checks that lags come from each city's own watermark.
+
+N_CITIES = 100
+LATENCY_RANGE = (0.05, 0.4)
+
+
+def make_cities(n):
+    rng = np.random.default_rng(0)
+    return [{'city': f'city_{i:03d}', 'name': f'City {i}', 'lat': round(float(lat), 4), 'lon': round(float(lon), 4)}
+            for i, (lat, lon) in enumerate(zip(rng.uniform(24, 36, n), rng.uniform(61, 77, n)))]
+
+
+class Stub:
+    def __init__(self, cities):
+        rng = np.random.default_rng(1)
+        self.latency = {(c['lat'], c['lon']): float(rng.uniform(*LATENCY_RANGE)) for c in cities}
+        self.aqi = {(c['lat'], c['lon']): int(rng.integers(1, 6)) for c in cities}
+        self.dt = 1769212800
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def observation(self, lat, lon):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency[(lat, lon)])
+        with self.lock:
+            self.in_flight -= 1
+        aqi = self.aqi[(lat, lon)]
+        return {'coord': {'lat': lat, 'lon': lon},
+                'list': [{'dt': self.dt, 'main': {'aqi': aqi},
+                          'components': {'co': 100.0 * aqi, 'no2': 1.0, 'o3': 50.0, 'so2': 0.5,
+                                         'pm2_5': 10.0 * aqi, 'pm10': 20.0 * aqi, 'nh3': 0.1}}]}
+
+
+def serve(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            payload = json.dumps(stub.observation(float(query['lat'][0]), float(query['lon'][0]))).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.request_queue_size = 256
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class InMemoryFeatureGroup:
+    def __init__(self):
+        self.inserts = []
+
+    def insert(self, df):
+        self.inserts.append(df)
+
+
+def main():
+    cities = make_cities(N_CITIES)
+    stub = Stub(cities)
+    server, base_url = serve(stub)
+    latencies = list(stub.latency.values())
+    print(f"{N_CITIES} cities, stub latency {LATENCY_RANGE[0] * 1e3:.0f}-{LATENCY_RANGE[1] * 1e3:.0f} ms "
+          f"(slowest {max(latencies):.2f}s, sum {sum(latencies):.2f}s)")
+
+    # Sequential: one city after another
+    client = OpenWeatherClient(token='x', base_url=base_url, cache_window=0)
+    start = time.perf_counter()
+    observations = {c['city']: client.current(c['lat'], c['lon'])['list'][0] for c in cities}
+    t_seq = time.perf_counter() - start
+    sequential_df, _, _, _ = collect_new_rows(cities, observations, {})
+    print(f"\n  sequential loop:            {t_seq:6.2f}s")
+
+    for concurrency in [20, 100]:
+        client = OpenWeatherClient(token='x', base_url=base_url, cache_window=0, pool_size=concurrency)
+        stub.max_in_flight = 0
+        start = time.perf_counter()
+        new_df, skipped, failed, states = ingest(cities, client, {}, concurrency)
+        elapsed = time.perf_counter() - start
+        print(f"  asyncio fan-out (limit {concurrency:3d}): {elapsed:6.2f}s, {len(new_df)} rows, "
+              f"{len(failed)} failed, max in flight {stub.max_in_flight}, "
+              f"same rows as sequential: {new_df.equals(sequential_df)}")
+
+    # Bulk insert + per-city watermarks, then the next hour
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'city_watermarks.json')
+        fg = InMemoryFeatureGroup()
+        insert_with_city_watermarks(fg, new_df, {}, path, states)
+        watermarks = load_city_watermarks(path)
+
+        new_df, skipped, _, _ = ingest(cities, client, watermarks, 100)
+        print(f"\n  same hour again: {len(new_df)} new rows, {len(skipped)} skipped by watermark")
+
+        stub.dt += 3600
+        stub.aqi = {key: aqi % 5 + 1 for key, aqi in stub.aqi.items()}
+        new_df, skipped, _, states = ingest(cities, client, watermarks, 100)
+        insert_with_city_watermarks(fg, new_df, watermarks, path, states)
+        lags_ok = all(row['aqi_lag_1h'] == watermarks[row['city']]['aqi'] for _, row in new_df.iterrows())
+        print(f"  next hour: {len(new_df)} new rows, lags from each city's own watermark: {lags_ok}")
+        print(f"  bulk inserts: {len(fg.inserts)} ({', '.join(str(len(df)) for df in fg.inserts)} rows)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from features import compute_features
+from online_store import OnlineFeatureStore, FeatureViewSource, OfflineSource, LocalOnlineStore
+
+# Latest-feature-vector lookups for CITIES entities (the multi-city feature
+# group, keyed by city + datetime), against local stand-ins for Hopsworks:
+#   offline scan  - fg.read() (a Parquet file here), sort, newest row of the city
+#   online store  - a primary-key lookup in LocalOnlineStore, with and
+#                   without ONLINE_RTT of simulated network round trip
+#   memory        - OnlineFeatureStore hits
+# Row contents, TTL expiry, LRU eviction and the offline fallback are checked
+# by tests/test_online_store.py.
+
+CITIES = 100
+ONLINE_RTT = 0.002
+LOOKUPS = 200_000
+
+
+class ParquetGroup:
+    """Offline feature group stand-in: every read() is a full scan of the file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        return pd.read_parquet(self.path)
+
+
+def city_frame(history, cities):
+    features = compute_features(history)
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(cities):
+        frame = features.copy()
+        frame['pm2_5'] = frame['pm2_5'] * rng.uniform(0.5, 1.5)
+        frame.insert(0, 'city', f"city_{i:03d}")
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def per_call(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    history = pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'), parse_dates=['datetime'])
+    base = city_frame(history, CITIES)
+    columns = list(base.columns)
+    names = [f"city_{i:03d}" for i in range(CITIES)]
+
+    workdir = tempfile.mkdtemp()
+    parquet = os.path.join(workdir, 'city_aqi_fg.parquet')
+    base.to_parquet(parquet, index=False)
+    offline = ParquetGroup(parquet)
+    online = LocalOnlineStore(columns, primary_key=('city', 'datetime'))
+    online.insert(base)
+    hours = base.groupby('city')['datetime'].max().to_dict()   # What the ingest watermarks hold
+    print(f"{CITIES} cities, {len(base):,} offline rows, {len(columns)} columns\n")
+
+    # Cost of one lookup of the latest vector
+    def offline_scan(i):
+        df = offline.read().sort_values('datetime')
+        return df[df['city'] == names[i % CITIES]].iloc[-1]
+
+    source = FeatureViewSource(online, entity_col='city', latest=lambda: hours, required=('aqi',))
+    store = OnlineFeatureStore(source, OfflineSource(offline))
+    t_offline = per_call(offline_scan, 10)
+    t_online = per_call(lambda i: source.get(names[i % CITIES]), 5000)
+    online.latency = ONLINE_RTT
+    t_online_rtt = per_call(lambda i: source.get(names[i % CITIES]), 50)
+    store.get(names[0])
+    for name in names:
+        store.get(name)
+    t_memory = per_call(lambda i: store.get(names[i % CITIES]), LOOKUPS)
+    online.latency = 0.0
+    print("latest vector lookup:")
+    print(f"  offline scan (fg.read + sort + tail) {t_offline * 1e3:9.2f} ms")
+    print(f"  online store, key lookup             {t_online * 1e6:9.1f} us   (+{ONLINE_RTT * 1e3:.0f} ms RTT: "
+          f"{t_online_rtt * 1e3:.2f} ms)")
+    print(f"  in-memory layer, hit                 {t_memory * 1e6:9.2f} us   ({1 / t_memory / 1e6:.1f} M lookups/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import openweather_client
+from openweather_client import OpenWeatherClient
+
+# Bare requests.get versus the pooled OpenWeather client against a local stub
+# of /air_pollution: connections opened, per-call latency, hour-window cache
+# hits, and recovery from injected 503s. The stub is plain HTTP on localhost,
+# so the saved connection setup is far cheaper here than a TLS handshake to
+# api.openweathermap.org; the connection counts are the portable number.
+
+CALLS = 200
+PAYLOAD = {'coord': {'lon': 67.0011, 'lat': 24.8607},
+           'list': [{'main': {'aqi': 3}, 'dt': 1769212800,
+                     'components': {'co': 125.08, 'no2': 0.26, 'o3': 105.94, 'so2': 0.09,
+                                    'pm2_5': 5.68, 'pm10': 28.72, 'nh3': 0.05}}]}
+
+
+class Stub:
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self.fail_next = 0
+        self.lock = threading.Lock()
+
+
+def serve(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out in separate writes; without this, keep-alive
+            # responses stall ~40 ms on Nagle + delayed ACK
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with stub.lock:
+                stub.connections += 1
+
+        def do_GET(self):
+            with stub.lock:
+                stub.requests += 1
+                failing = stub.fail_next > 0
+                stub.fail_next -= failing
+            status, body = (503, b'{"message": "busy"}') if failing else (200, json.dumps(PAYLOAD).encode())
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    stub = Stub()
+    server, base_url = serve(stub)
+    url = f"{base_url}/air_pollution?lat=24.8607&lon=67.0011&appid=x"
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        requests.get(url).json()
+    t_bare = time.perf_counter() - start
+    bare_connections, stub.connections = stub.connections, 0
+
+    client = OpenWeatherClient(token='x', base_url=base_url, cache_window=0)
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        client.current(24.8607, 67.0011)
+    t_pooled = time.perf_counter() - start
+    latency = client.stats()['endpoints']['/air_pollution']
+
+    print(f"{CALLS} sequential /air_pollution calls (local stub, plain HTTP)")
+    print(f"  bare requests.get: {t_bare / CALLS * 1e3:6.2f} ms/call, {bare_connections} connections")
+    print(f"  pooled client:     {t_pooled / CALLS * 1e3:6.2f} ms/call, {stub.connections} connections "
+          f"(p50 {latency['p50_ms']:.2f} ms, p95 {latency['p95_ms']:.2f} ms)")
+
+    # Hour-window cache: repeated reads of an hourly endpoint only go out once
+    cached = OpenWeatherClient(token='x', base_url=base_url)
+    stub.requests = 0
+    for _ in range(CALLS):
+        cached.current(24.8607, 67.0011)
+    print(f"\n  cached client: {CALLS} reads -> {stub.requests} request, {cached.stats()['cache_hits']} cache hits")
+
+    # Two 503s in a row are retried with jittered backoff
+    openweather_client.BACKOFF_BASE = 0.05
+    retrying = OpenWeatherClient(token='x', base_url=base_url, cache_window=0)
+    stub.fail_next = 2
+    start = time.perf_counter()
+    retrying.current(24.8607, 67.0011)
+    stats = retrying.stats()
+    print(f"  after 2 injected 503s: succeeded in {(time.perf_counter() - start) * 1e3:.0f} ms, "
+          f"{stats['requests']} attempts, {stats['retries']} retries")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
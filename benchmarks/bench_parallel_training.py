@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import importlib.util
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from parallel_training import train_candidates, CANDIDATES
+
+# Wall-clock retrain time with the candidates fitted one after another versus
+# concurrently in the process pool, on the 4,200-row history and on a synthetic
+# dataset 10x that size. The parallel run should track the slowest candidate.
+
+FEATURES = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3', 'hour', 'day_of_week', 'month',
+            'aqi_lag_1h', 'pm2_5_lag_1h', 'co_lag_1h', 'no2_lag_1h', 'aqi_change_rate']
+
+
+def history_features(scale=1):
+    df = pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'), parse_dates=['datetime'])
+    if scale > 1:
+        # Tile the history forward in time; later copies get a little multiplicative noise
+        rng = np.random.default_rng(0)
+        span = df['datetime'].iloc[-1] - df['datetime'].iloc[0] + pd.Timedelta(hours=1)
+        copies = []
+        for k in range(scale):
+            copy = df.copy()
+            copy['datetime'] = copy['datetime'] + k * span
+            pollutants = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
+            if k > 0:
+                copy[pollutants] = copy[pollutants] * rng.uniform(0.9, 1.1, (len(copy), len(pollutants)))
+            copies.append(copy)
+        df = pd.concat(copies, ignore_index=True)
+
+    df['hour'] = df['datetime'].dt.hour
+    df['day_of_week'] = df['datetime'].dt.dayofweek
+    df['month'] = df['datetime'].dt.month
+    df['aqi_lag_1h'] = df['aqi'].shift(1)
+    df['pm2_5_lag_1h'] = df['pm2_5'].shift(1)
+    df['co_lag_1h'] = df['co'].shift(1)
+    df['no2_lag_1h'] = df['no2'].shift(1)
+    df['aqi_change_rate'] = df['aqi'].shift(1) - df['aqi'].shift(2)
+    return df.dropna().reset_index(drop=True)
+
+
+def split(df):
+    split_idx = int(len(df) * 0.8)
+    return (df[FEATURES].iloc[:split_idx], df['aqi'].iloc[:split_idx],
+            df[FEATURES].iloc[split_idx:], df['aqi'].iloc[split_idx:])
+
+
+def main():
+    candidates = [c for c in CANDIDATES if c != 'NeuralNetwork' or importlib.util.find_spec('tensorflow')]
+    print(f"cores: {os.cpu_count()}, candidates: {', '.join(candidates)}")
+    if 'NeuralNetwork' not in candidates:
+        print("(tensorflow not installed: NeuralNetwork skipped)")
+
+    for label, scale in [('history (4.2k rows)', 1), ('synthetic 10x (42k rows)', 10)]:
+        X_train, y_train, X_test, y_test = split(history_features(scale))
+
+        start = time.perf_counter()
+        sequential = train_candidates(X_train, y_train, X_test, y_test, candidates=candidates, parallel=False)
+        t_seq = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = train_candidates(X_train, y_train, X_test, y_test, candidates=candidates, parallel=True)
+        t_par = time.perf_counter() - start
+
+        print(f"\n{label}")
+        for seq, par in zip(sequential, parallel):
+            print(f"  {seq['Name']:>14}: fit {seq['FitSeconds']:6.2f}s sequential / {par['FitSeconds']:6.2f}s in pool,"
+                  f" MAE {seq['MAE']:.4f} / {par['MAE']:.4f}")
+        slowest = max(r['FitSeconds'] for r in parallel)
+        print(f"  sequential wall: {t_seq:6.2f}s (sum of fits {sum(r['FitSeconds'] for r in sequential):.2f}s)")
+        print(f"  parallel wall:   {t_par:6.2f}s (slowest fit {slowest:.2f}s, pool overhead {t_par - slowest:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+# Next-hour predictions: the one-shot predict_next_hour.py run per query
+# (before) against the warm prediction service (after), with OpenWeather
+# replaced by a local stub that answers after STUB_DELAY.
+#   before   - a fresh `python` process per query: imports, joblib.load,
+#              forest flattening, one /air_pollution call, one predict
+#   after    - CLIENTS keep-alive HTTP clients hammering GET /predict, and
+#              CLIENTS threads calling PredictionService.predict() in-process,
+#              with micro-batching off (one predict per request) and on
+# Halfway through the batched run the model file is replaced by a different
+# model; requests must keep succeeding and switch to the new version. Also
+# checks the service's answer against sklearn on the same feature row.
+
+STUB_DELAY = 0.08          # Seconds per OpenWeather call (a close, fast region)
+ONE_SHOT_RUNS = 3
+CLIENTS = 16
+REQUESTS_PER_CLIENT = 150
+PAYLOAD = {'coord': {'lon': 67.0011, 'lat': 24.8607},
+           'list': [{'main': {'aqi': 3}, 'dt': 1769212800,
+                     'components': {'co': 125.08, 'no2': 0.26, 'o3': 105.94, 'so2': 0.09,
+                                    'pm2_5': 5.68, 'pm10': 28.72, 'nh3': 0.05}}]}
+
+# The script as it was: everything happens once per process
+ONE_SHOT = """
+import joblib, pandas as pd
+from datetime import datetime
+from forest_runtime import compile_model
+from openweather_client import get_client
+MODEL = compile_model(joblib.load('models/best_model.joblib'))
+row = get_client().current(24.8607, 67.0011)['list'][0]
+now = datetime.now()
+features = {**row['components'], 'hour': (now.hour + 1) % 24, 'day_of_week': now.weekday(), 'month': now.month,
+            'aqi_lag_1h': row['main']['aqi'], 'pm2_5_lag_1h': 0.0, 'co_lag_1h': 0.0, 'no2_lag_1h': 0.0,
+            'aqi_change_rate': 0.0}
+print(MODEL.predict(pd.DataFrame([features])[MODEL.feature_names])[0])
+"""
+
+
+def serve_stub():
+    calls = [0]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            calls[0] += 1
+            time.sleep(STUB_DELAY)
+            body = json.dumps(PAYLOAD).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", calls
+
+
+def http_client(url):
+    session = requests.Session()
+
+    def call():
+        response = session.get(url)
+        return response.status_code, response.json()
+    return call
+
+
+def load_test(make_client, on_halfway=None):
+    """CLIENTS threads x REQUESTS_PER_CLIENT calls; returns (latencies, wall seconds, responses)."""
+    latencies, responses = [], []
+    lock = threading.Lock()
+    halfway = threading.Barrier(CLIENTS, action=on_halfway) if on_halfway else None
+
+    def client():
+        call = make_client()
+        mine, seen = [], []
+        for i in range(REQUESTS_PER_CLIENT):
+            if halfway is not None and i == REQUESTS_PER_CLIENT // 2:
+                halfway.wait()
+            start = time.perf_counter()
+            status, result = call()
+            mine.append(time.perf_counter() - start)
+            seen.append((i, status, result))
+        with lock:
+            latencies.extend(mine)
+            responses.extend(seen)
+
+    threads = [threading.Thread(target=client) for _ in range(CLIENTS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array(latencies), time.perf_counter() - start, responses
+
+
+def report(label, latencies, wall):
+    print(f"  {label}: p50 {np.percentile(latencies, 50) * 1e3:6.2f} ms, p99 {np.percentile(latencies, 99) * 1e3:7.2f} ms, "
+          f"{len(latencies) / wall:6.0f} req/s")
+
+
+def main():
+    stub, base_url, calls = serve_stub()
+    os.environ['OPENWEATHER_BASE_URL'] = base_url
+    os.environ['OPENWEATHER_TOKEN'] = 'x'
+    import warnings
+    warnings.filterwarnings('ignore')
+    import joblib
+    import pandas as pd
+    from prediction_service import PredictionService, LocalModelSource, make_server
+
+    # Before: one process per query
+    env = {**os.environ, 'PYTHONPATH': os.path.join(ROOT, 'src'), 'PYTHONWARNINGS': 'ignore'}
+    times = []
+    for _ in range(ONE_SHOT_RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', ONE_SHOT], cwd=ROOT, env=env, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    print(f"one-shot script: {np.median(times) * 1e3:.0f} ms per query (median of {ONE_SHOT_RUNS} runs)\n")
+
+    workdir = tempfile.mkdtemp()
+    model_path = os.path.join(workdir, 'model.joblib')
+    shutil.copyfile(os.path.join(ROOT, 'models', 'best_model.joblib'), model_path)
+    total = CLIENTS * REQUESTS_PER_CLIENT
+    print(f"service: {CLIENTS} concurrent clients x {REQUESTS_PER_CLIENT} requests")
+    try:
+        for label, window, max_batch in [('unbatched', 0.0, 1), ('batched  ', None, None)]:
+            kwargs = {} if window is None else {'batch_window': window, 'max_batch': max_batch}
+            service = PredictionService(LocalModelSource(model_path), model_poll=3600, **kwargs)
+            server = make_server(service, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+            old_version = service.model.version
+
+            def swap():
+                # Another model (different feature set) lands on disk; the watcher would find it on its next poll
+                tmp = model_path + '.new'
+                shutil.copyfile(os.path.join(ROOT, 'models', 'karachi_aqi_model.joblib'), tmp)
+                os.replace(tmp, model_path)
+                service.reload()
+
+            latencies, wall, _ = load_test(lambda: (lambda: (200, service.predict())))
+            report(f"{label} in-process", latencies, wall)
+            print(f"    {service.stats['batches']} predict calls for {service.stats['requests']} requests "
+                  f"(largest batch {service.stats['max_batch']})")
+            latencies, wall, responses = load_test(lambda: http_client(url),
+                                                   on_halfway=swap if window is None else None)
+            report(f"{label} HTTP      ", latencies, wall)
+            print(f"    {service.stats['observation_fetches']} observation fetch(es) for "
+                  f"{service.stats['requests']} requests, {calls[0]} OpenWeather call(s) on the wire so far")
+            if window is None:
+                ok = sum(status == 200 for _, status, _ in responses)
+                before = {r['model_version'] for i, _, r in responses if i < REQUESTS_PER_CLIENT // 2}
+                after = {r['model_version'] for i, _, r in responses if i >= REQUESTS_PER_CLIENT // 2}
+                print(f"    hot swap mid-run: {ok}/{total} OK, first half served {sorted(before) == [old_version]}, "
+                      f"second half served only the new model: {old_version not in after and len(after) == 1}")
+
+                # Same answer as sklearn on the feature row the service builds
+                model = joblib.load(model_path)
+                result = service.predict()
+                row = {'hour': pd.Timestamp(result['forecast_time']).hour,
+                       'day_of_week': pd.Timestamp(result['forecast_time']).dayofweek,
+                       'month': pd.Timestamp(result['forecast_time']).month, 'aqi_lag_1h': result['observed_aqi']}
+                expected = model.predict(pd.DataFrame([row])[list(model.feature_names_in_)])[0]
+                print(f"    matches sklearn predict: {abs(round(expected, 2) - result['predicted_aqi']) < 1e-9}")
+            server.shutdown()
+            server.server_close()
+            service.close()
+    finally:
+        shutil.rmtree(workdir)
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
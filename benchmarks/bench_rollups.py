@@ -0,0 +1,93 @@
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from rollups import build_rollups, update_rollups, save_rollups, load_rollups, lttb, VALUE_COLUMNS, LTTB_POINTS
+
+# Dashboard history cost as the history grows. Before, every page load parsed
+# the full history CSV to draw 168 hourly points; now it parses the hourly
+# rollup (and, for the long-range chart, one small daily/weekly/LTTB file).
+# Also checks that the hourly incremental update, saved and read back every
+# hour as the pipeline does, matches a full rebuild, and
+# how much of the series' range LTTB keeps compared with a plain stride.
+
+HISTORY_YEARS = [0.5, 2, 5, 20]
+REPEATS = 5
+
+
+def synthetic_history(n_rows):
+    rng = np.random.default_rng(0)
+    hours = np.arange(n_rows)
+    cycle = 1 + 0.3 * np.sin(2 * np.pi * hours / 24) + 0.2 * np.sin(2 * np.pi * hours / (24 * 365))
+    spikes = rng.random(n_rows) < 0.002  # Rare pollution episodes a chart must not drop
+    df = pd.DataFrame({'datetime': pd.date_range('2006-01-01', periods=n_rows, freq='h').astype(str),
+                       'aqi': np.clip(np.round(3 * cycle + rng.normal(0, 0.5, n_rows)), 1, 5).astype(int)})
+    for col in VALUE_COLUMNS[1:]:
+        df[col] = np.round(cycle * rng.gamma(2.0, 20.0, n_rows) * np.where(spikes, 6, 1), 2)
+    return df
+
+
+def to_csv(df):
+    return df.to_csv(index=False, lineterminator='\n').encode()
+
+
+def parse_time(body):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        df = pd.read_csv(io.BytesIO(body))
+        df['datetime'] = pd.to_datetime(df['datetime'])
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    print("page load: full history CSV (old) vs precomputed rollups (new)")
+    for years in HISTORY_YEARS:
+        history = synthetic_history(int(years * 365 * 24))
+        full = to_csv(history)
+        start = time.perf_counter()
+        rollups = build_rollups(history)
+        t_build = time.perf_counter() - start
+        hourly, daily, long_range = to_csv(rollups['hourly']), to_csv(rollups['daily']), to_csv(rollups['lttb_aqi'])
+        print(f"  {years:4.1f} years ({len(history):7,} rows): "
+              f"old {len(full) / 1e6:6.2f} MB, parse {parse_time(full) * 1e3:7.1f} ms | "
+              f"new hourly {len(hourly) / 1e3:4.1f} kB, parse {parse_time(hourly) * 1e3:4.1f} ms; "
+              f"daily {len(daily) / 1e3:5.1f} kB, LTTB {len(long_range) / 1e3:4.1f} kB | "
+              f"rebuild {t_build * 1e3:5.0f} ms")
+
+    # Hourly pipeline: fold rows in one at a time (load, update, save) vs rebuild from scratch
+    history = synthetic_history(2 * 365 * 24)
+    split = len(history) - 24 * 10
+    rollups_dir = tempfile.mkdtemp()
+    save_rollups(build_rollups(history.iloc[:split]), rollups_dir)
+    start = time.perf_counter()
+    for i in range(split, len(history)):
+        save_rollups(update_rollups(load_rollups(rollups_dir), history.iloc[i:i + 1]), rollups_dir)
+    t_update = (time.perf_counter() - start) / (len(history) - split)
+    rollups = load_rollups(rollups_dir)
+    shutil.rmtree(rollups_dir)
+    rebuilt = build_rollups(history)
+    worst = max(np.abs(rollups[name][VALUE_COLUMNS].to_numpy() - rebuilt[name][VALUE_COLUMNS].to_numpy()).max()
+                for name in ['hourly', 'daily', 'weekly'])
+    same_rows = all(rollups[name]['datetime'].equals(rebuilt[name]['datetime']) for name in ['hourly', 'daily', 'weekly'])
+    print(f"\nincremental update, saved and reloaded: {t_update * 1e3:.1f} ms/hour, same periods as a rebuild: {same_rows}, "
+          f"max abs diff {worst:.1e}")
+
+    # Peak preservation at LTTB_POINTS points
+    x = pd.to_datetime(history['datetime']).to_numpy().astype('datetime64[s]').astype(np.int64)
+    print(f"\n{LTTB_POINTS} points out of {len(history):,}: share of the true max kept")
+    for col in ['pm2_5', 'pm10']:
+        y = history[col].to_numpy()
+        stride = y[np.linspace(0, len(y) - 1, LTTB_POINTS).astype(int)]
+        downsampled = y[lttb(x, y, LTTB_POINTS)]
+        print(f"  {col:6s}: LTTB {downsampled.max() / y.max():5.1%}, stride {stride.max() / y.max():5.1%}")
+
+
+if __name__ == "__main__":
+    main()
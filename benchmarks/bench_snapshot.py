@@ -0,0 +1,145 @@
+import io
+import os
+import sys
+import json
+import time
+import pickle
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from snapshot import build_snapshot, snapshot_bytes, read_snapshot
+
+# Dashboard render cost before and after the Arrow snapshot bundle, without
+# Streamlit: per rerun the app gets its cached data back (st.cache_data
+# pickles it), derives what it draws and builds the plotly figures.
+#   before - parse the forecast CSV + model_info.json, then per-row
+#            get_aqi_status loops and date/hour groupbys on every rerun
+#   after  - read the bundle (zero-copy numeric columns), everything derived
+#            is already in it
+# Also checks that both paths produce the same numbers.
+
+REPEATS = 200
+
+
+def get_aqi_status(aqi_value):
+    """The dashboard's previous per-value status lookup."""
+    for bound, label, color in [(1.5, "Good", "#24A148"), (2.5, "Fair", "#F1C21B"), (3.5, "Moderate", "#FF8C00"),
+                                (4.5, "Poor", "#DA1E28")]:
+        if aqi_value <= bound:
+            return label, color
+    return "Very Poor", "#8B00FF"
+
+
+def legacy_load(csv_body, json_body):
+    df = pd.read_csv(io.BytesIO(csv_body))
+    df['forecast_time'] = pd.to_datetime(df['forecast_time'])
+    return df, json.loads(json_body)
+
+
+def legacy_derive(df):
+    """The derivations main() used to run on every rerun."""
+    df = df.copy()
+    status = get_aqi_status(df['predicted_aqi'].iloc[0])
+    df['date'] = df['forecast_time'].dt.date
+    daily = df.groupby('date')['predicted_aqi'].mean().reset_index().sort_values('date').reset_index(drop=True)
+    outlook = [(row['date'], row['predicted_aqi'], get_aqi_status(row['predicted_aqi']))
+               for _, row in (daily.iloc[1:4] if len(daily) >= 4 else daily.head(3)).iterrows()]
+    daily_avg = df.groupby('date').agg(avg_aqi=('predicted_aqi', 'mean'),
+                                       mid_time=('forecast_time', lambda x: x.iloc[len(x) // 2])).reset_index()
+    categories = {"Good": 0, "Fair": 0, "Moderate": 0, "Poor": 0, "Very Poor": 0}
+    for val in df['predicted_aqi']:
+        categories[get_aqi_status(val)[0]] += 1
+    df['hour'] = df['forecast_time'].dt.hour
+    hourly = df.groupby('hour')['predicted_aqi'].mean().reset_index()
+    bar_colors = [get_aqi_status(v)[1] for v in hourly['predicted_aqi']]
+    return {'status': status, 'outlook': outlook, 'daily_avg': daily_avg, 'categories': categories,
+            'hourly': hourly, 'bar_colors': bar_colors, 'forecast': df}
+
+
+def figures(x, y, p10, p90, mid_time, avg_aqi, labels, values, hours, hour_aqi, bar_colors):
+    """The three forecast figures, built the same way for both paths."""
+    trend = go.Figure()
+    trend.add_trace(go.Scatter(x=x, y=p90, line=dict(width=0), showlegend=False))
+    trend.add_trace(go.Scatter(x=x, y=p10, fill='tonexty'))
+    trend.add_trace(go.Scatter(x=x, y=y, fill='tozeroy'))
+    trend.add_trace(go.Scatter(x=mid_time, y=avg_aqi, mode='markers+text', text=[f"Avg: {v:.1f}" for v in avg_aqi]))
+    donut = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.55)])
+    bars = go.Figure(data=[go.Bar(x=hours, y=hour_aqi, marker=dict(color=bar_colors))])
+    return trend, donut, bars
+
+
+def render_before(cached):
+    df, model_info = pickle.loads(cached)
+    d = legacy_derive(df)
+    f = d['forecast']
+    labels = [k for k, v in d['categories'].items() if v > 0]
+    figures(f['forecast_time'], f['predicted_aqi'], f['aqi_p10'], f['aqi_p90'], d['daily_avg']['mid_time'],
+            d['daily_avg']['avg_aqi'], labels, [d['categories'][k] for k in labels], d['hourly']['hour'],
+            d['hourly']['predicted_aqi'], d['bar_colors'])
+    return d, model_info
+
+
+def render_after(cached):
+    snapshot = pickle.loads(cached)
+    f, daily, hourly, cats = snapshot['forecast'], snapshot['daily'], snapshot['hourly'], snapshot['categories']
+    present = cats['hours'] > 0
+    figures(f['forecast_time'], f['predicted_aqi'], f['aqi_p10'], f['aqi_p90'], daily['mid_time'], daily['avg_aqi'],
+            cats['category'][present], cats['hours'][present], hourly['hour'], hourly['avg_aqi'], hourly['color'])
+    return snapshot
+
+
+def timed(fn, *args):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(*args)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    forecast = pd.read_csv(os.path.join(ROOT, 'data', 'aqi_forecast_72h.csv'))
+    # Production forecasts carry the Monte Carlo bands as well
+    rng = np.random.default_rng(0)
+    spread = rng.uniform(0.1, 0.5, len(forecast))
+    forecast['aqi_p10'] = forecast['predicted_aqi'] - spread
+    forecast['aqi_p50'] = forecast['predicted_aqi']
+    forecast['aqi_p90'] = forecast['predicted_aqi'] + spread
+    with open(os.path.join(ROOT, 'data', 'model_info.json'), 'rb') as f:
+        json_body = f.read()
+    csv_body = forecast.to_csv(index=False).encode()
+    bundle = snapshot_bytes(build_snapshot(forecast, json.loads(json_body)))
+    print(f"inputs: forecast CSV {len(csv_body) / 1e3:.1f} kB + model_info {len(json_body) / 1e3:.1f} kB, "
+          f"snapshot bundle {len(bundle) / 1e3:.1f} kB")
+
+    # Cold load (once per download): parse vs read
+    t_parse = timed(legacy_load, csv_body, json_body)
+    t_read = timed(read_snapshot, bundle)
+    print(f"\n  load        CSV + JSON parse {t_parse * 1e3:6.2f} ms   snapshot read {t_read * 1e3:6.2f} ms")
+
+    # Every rerun: cached value back from st.cache_data, derive, build figures
+    before_cached = pickle.dumps(legacy_load(csv_body, json_body))
+    after_cached = pickle.dumps(read_snapshot(bundle))
+    t_derive = timed(legacy_derive, legacy_load(csv_body, json_body)[0])
+    t_before = timed(render_before, before_cached)
+    t_after = timed(render_after, after_cached)
+    print(f"  per rerun   before {t_before * 1e3:6.2f} ms (of which derivations {t_derive * 1e3:5.2f} ms)   "
+          f"after {t_after * 1e3:6.2f} ms")
+
+    # Same numbers either way
+    d, _ = render_before(before_cached)
+    s = render_after(after_cached)
+    outlook = range(1, 4) if len(s['daily']['date']) >= 4 else range(min(3, len(s['daily']['date'])))
+    same = (np.allclose(d['daily_avg']['avg_aqi'], s['daily']['avg_aqi'])
+            and [o[2][0] for o in d['outlook']] == [s['daily']['category'][i] for i in outlook]
+            and list(d['categories'].values()) == list(s['categories']['hours'])
+            and np.allclose(d['hourly']['predicted_aqi'], s['hourly']['avg_aqi'])
+            and d['bar_colors'] == list(s['hourly']['color'])
+            and d['status'] == (s['forecast']['category'][0], s['forecast']['color'][0]))
+    print(f"\n  snapshot matches the old per-rerun derivations: {same}")
+
+
+if __name__ == "__main__":
+    main()
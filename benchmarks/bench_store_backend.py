@@ -0,0 +1,111 @@
+import os
+import io
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from features import compute_features
+from rollups import VALUE_COLUMNS
+from store_backend import connect
+
+# The local store backend (STORE_BACKEND=local) on HISTORY_YEARS of synthetic
+# hourly features: what a full fg.read() costs against reads that prune
+# months by event time and project columns, the cost of the hourly insert,
+# and the hourly insert. Then the inference pipeline runs end to end with no
+# Hopsworks connection, against a local feature group and model registry.
+# tests/test_store_backend.py checks upserts, filters and key lookups.
+
+HISTORY_YEARS = 5
+REPEATS = 5
+
+
+def synthetic_history(n_rows):
+    rng = np.random.default_rng(0)
+    hours = np.arange(n_rows)
+    cycle = 1 + 0.3 * np.sin(2 * np.pi * hours / 24)
+    df = pd.DataFrame({'datetime': pd.date_range('2021-01-01', periods=n_rows, freq='h'),
+                       'aqi': np.clip(np.round(3 * cycle + rng.normal(0, 0.5, n_rows)), 1, 5).astype(int)})
+    for col in VALUE_COLUMNS[1:]:
+        df[col] = np.round(cycle * rng.gamma(2.0, 20.0, n_rows), 2)
+    return compute_features(df).dropna().reset_index(drop=True)
+
+
+def timed(fn):
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - start) / REPEATS, result
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        history = synthetic_history(HISTORY_YEARS * 365 * 24)
+        fs = connect('local', os.path.join(workdir, 'store')).get_feature_store()
+        fg = fs.get_or_create_feature_group(name='karachi_aqi_fg', version=1, primary_key=['datetime'],
+                                            event_time='datetime')
+        start = time.perf_counter()
+        fg.insert(history)
+        t_load = time.perf_counter() - start
+        months = len(os.listdir(fg.root)) - 1
+        print(f"{len(history):,} rows x {history.shape[1]} columns in {months} monthly partitions "
+              f"(initial load {t_load:.2f}s)\n")
+
+        end = history['datetime'].iloc[-1]
+        raw = ['datetime'] + VALUE_COLUMNS
+        reads = [
+            ("full fg.read()", lambda: fg.read()),
+            ("last 7 days, all columns", lambda: fg.filter(fg.datetime > end - pd.Timedelta(days=7)).read()),
+            ("full range, 9 raw columns", lambda: fg.select(raw).read()),
+            ("last 30 days, 9 raw columns",
+             lambda: fg.select(raw).filter(fg.datetime > end - pd.Timedelta(days=30)).read()),
+        ]
+        t_full = None
+        for label, read in reads:
+            t, df = timed(read)
+            t_full = t_full or t
+            print(f"  {label:28s} {t * 1e3:8.2f} ms  {len(df):7,} rows x {df.shape[1]:2d} cols  ({t_full / t:5.1f}x)")
+
+        # Hourly insert: one row lands in the current month's partition
+        next_hour = history.tail(1).assign(datetime=end + pd.Timedelta(hours=1))
+        start = time.perf_counter()
+        fg.insert(next_hour)
+        t_insert = time.perf_counter() - start
+        print(f"\n  hourly insert: {t_insert * 1e3:.1f} ms")
+
+        # Inference end to end on the local backend
+        run_dir = os.path.join(workdir, 'run')
+        os.makedirs(os.path.join(run_dir, 'data'))
+        shutil.copyfile(os.path.join(ROOT, 'data', 'model_info.json'), os.path.join(run_dir, 'data', 'model_info.json'))
+        os.chdir(run_dir)
+        os.environ['STORE_BACKEND'] = 'local'
+        os.environ['LOCAL_STORE_DIR'] = os.path.join(workdir, 'store')
+        fs.create_feature_view(name='karachi_aqi_view', query=fg.select_all(), labels=['aqi'], version=1)
+        mr = connect().get_model_registry()
+        model = mr.python.create_model(name='karachi_aqi_model', metrics={'mae': 0.15, 'r2': 0.91})
+        model.save(os.path.join(ROOT, 'models', 'best_model.joblib'))
+        import warnings
+        warnings.filterwarnings('ignore')
+        from inference_pipeline import run_inference
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            forecast, model_info = run_inference(n_paths=200)
+        t_inference = time.perf_counter() - start
+        print(f"\n  inference pipeline, local backend: {t_inference:.2f}s, {len(forecast)} forecast hours from "
+              f"{model_info['model_name']} v{model_info['model_version']}, wrote "
+              f"{', '.join(sorted(os.listdir('data')))}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+import importlib.util
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from features import compute_features
+from rollups import VALUE_COLUMNS
+from store_backend import connect
+from parallel_training import CANDIDATES
+from training_snapshots import SnapshotStore
+
+# Training data as versioned snapshots, on the local store backend.
+# 1. Daily data read on HISTORY_YEARS of synthetic hourly features: the full
+#    fg.read() + sort the training job did before, against a snapshot sync
+#    that pulls one new day; plus parity (snapshot == feature group) and hash
+#    stability (a full resync of the same rows gets the same hash).
+# 2. The training pipeline over consecutive days on the real history: a day
+#    with new rows trains and registers, a day without new rows reuses the
+#    registered model. NeuralNetwork is skipped when tensorflow isn't installed.
+
+HISTORY_YEARS = 5
+REPEATS = 5
+
+
+def synthetic_history(n_rows):
+    rng = np.random.default_rng(0)
+    hours = np.arange(n_rows)
+    cycle = 1 + 0.3 * np.sin(2 * np.pi * hours / 24)
+    df = pd.DataFrame({'datetime': pd.date_range('2021-01-01', periods=n_rows, freq='h'),
+                       'aqi': np.clip(np.round(3 * cycle + rng.normal(0, 0.5, n_rows)), 1, 5).astype(int)})
+    for col in VALUE_COLUMNS[1:]:
+        df[col] = np.round(cycle * rng.gamma(2.0, 20.0, n_rows), 2)
+    return compute_features(df).dropna().reset_index(drop=True)
+
+
+def feature_group(root, name='karachi_aqi_fg'):
+    fs = connect('local', root).get_feature_store()
+    return fs.get_or_create_feature_group(name=name, version=1, primary_key=['datetime'], event_time='datetime')
+
+
+def sync_costs(workdir):
+    history = synthetic_history(HISTORY_YEARS * 365 * 24)
+    days = [history.iloc[len(history) - 24 * (REPEATS + 1) + 24 * i:][:24] for i in range(REPEATS + 1)]
+    fg = feature_group(os.path.join(workdir, 'store'))
+    fg.insert(history.iloc[:len(history) - 24 * (REPEATS + 1)])
+    store = SnapshotStore(os.path.join(workdir, 'snapshots'))
+    start = time.perf_counter()
+    store.sync(fg)
+    t_first = time.perf_counter() - start
+
+    t_full = t_sync = 0.0
+    for day in days[:REPEATS]:
+        fg.insert(day)
+        start = time.perf_counter()
+        full = fg.read().sort_values('datetime')
+        t_full += time.perf_counter() - start
+        start = time.perf_counter()
+        snapshot = store.sync(fg)
+        t_sync += time.perf_counter() - start
+    print(f"{len(history):,} rows x {history.shape[1]} columns; one new day per sync ({REPEATS} days)\n")
+    print(f"  full fg.read() + sort      {t_full / REPEATS * 1e3:8.1f} ms")
+    print(f"  snapshot sync (+24 rows)   {t_sync / REPEATS * 1e3:8.1f} ms   ({t_full / t_sync:.1f}x; first sync "
+          f"{t_first * 1e3:.0f} ms; reads 24 rows from the store instead of {len(full):,})")
+    start = time.perf_counter()
+    unchanged = store.sync(fg)
+    t_noop = time.perf_counter() - start
+    print(f"  sync with no new rows      {t_noop * 1e3:8.1f} ms   same snapshot: {unchanged is snapshot}")
+
+    rows = store.load(snapshot)
+    same_rows = rows.reset_index(drop=True).equals(full[rows.columns].reset_index(drop=True))
+    resynced = SnapshotStore(os.path.join(workdir, 'resync')).sync(fg)
+    print(f"\n  snapshot v{snapshot['version']}: {len(snapshot['parts'])} parts, rows == fg.read(): {same_rows}; "
+          f"full resync hash == incremental hash: {resynced['hash'] == snapshot['hash']}")
+    fg.insert(days[-1].assign(pm2_5=days[-1]['pm2_5'] + 1))
+    changed = store.sync(fg)
+    print(f"  next day's rows change the hash: {changed['hash'] != snapshot['hash']}")
+
+
+def training_days(workdir, candidates):
+    import warnings
+    warnings.filterwarnings('ignore')
+    from training_pipeline import run_training
+    history = compute_features(pd.read_csv(os.path.join(ROOT, 'data', 'karachi_aqi_history.csv'))).dropna()
+    run_dir = os.path.join(workdir, 'run')
+    os.makedirs(run_dir)
+    os.chdir(run_dir)
+    os.environ['STORE_BACKEND'] = 'local'
+    os.environ['LOCAL_STORE_DIR'] = os.path.join(workdir, 'train_store')
+    fg = feature_group(os.environ['LOCAL_STORE_DIR'])
+    fg.insert(history.iloc[:-48])
+    registry = connect().get_model_registry()
+
+    print(f"\ntraining pipeline, {len(history):,}-row history, candidates: {', '.join(candidates)}")
+    schedule = [('day 1', None), ('day 2, no new rows', None), ('day 3, +24 rows', history.iloc[-48:-24]),
+                ('day 3, rerun', None), ('day 4, +24 rows', history.iloc[-24:])]
+    for label, new_rows in schedule:
+        if new_rows is not None:
+            fg.insert(new_rows)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = run_training(candidates=candidates)
+        elapsed = time.perf_counter() - start
+        versions = len(registry.get_models('karachi_aqi_model'))
+        print(f"  {label:20s} {elapsed:7.2f}s  snapshot v{run['snapshot_version']}, model v{run['model_version']}, "
+              f"{versions} registered")
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    candidates = [c for c in CANDIDATES if c != 'NeuralNetwork' or importlib.util.find_spec('tensorflow')]
+    try:
+        sync_costs(workdir)
+        training_days(workdir, candidates)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from watermark import load_watermark, save_watermark, watermark_from_frame
+
+# Ingest-side lookup latency against history size.
+# "scan" is the old fg.read().sort_values().tail(1) path, "watermark" is the
+# persisted last-row lookup + atomic update done on every hourly insert.
+# The in-memory frame stands in for fg.read(), so the scan numbers are a lower
+# bound: a real Hopsworks read also pays the network transfer.
+
+HISTORY_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+REPEATS = 5
+
+
+class InMemoryFeatureGroup:
+    def __init__(self, n_rows):
+        rng = np.random.default_rng(0)
+        times = pd.date_range('2020-01-01', periods=n_rows, freq='h')
+        # Shuffle so the scan really has to sort, as the offline store gives no order guarantee
+        order = rng.permutation(n_rows)
+        self.df = pd.DataFrame({
+            'datetime': times[order],
+            'aqi': rng.integers(1, 6, n_rows),
+            'co': rng.random(n_rows) * 200,
+            'no2': rng.random(n_rows),
+            'o3': rng.random(n_rows) * 150,
+            'so2': rng.random(n_rows),
+            'pm2_5': rng.random(n_rows) * 75,
+            'pm10': rng.random(n_rows) * 200,
+            'nh3': rng.random(n_rows),
+        })
+
+    def read(self):
+        return self.df.copy()
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'rows':>10} | {'scan (ms)':>10} | {'watermark (ms)':>14} | {'speedup':>8}")
+    print("-" * 52)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'watermark.json')
+        for n_rows in HISTORY_SIZES:
+            fg = InMemoryFeatureGroup(n_rows)
+            save_watermark(watermark_from_frame(fg.df), path)
+
+            def scan():
+                fg.read().sort_values(by="datetime").tail(1)
+
+            def watermark():
+                last_row = load_watermark(path)
+                last_row['datetime'] += pd.Timedelta(hours=1)
+                save_watermark(last_row, path)
+
+            t_scan = best_of(scan)
+            t_mark = best_of(watermark)
+            print(f"{n_rows:>10,} | {t_scan * 1e3:>10.2f} | {t_mark * 1e3:>14.3f} | {t_scan / t_mark:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
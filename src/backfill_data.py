@@ -1,55 +1,232 @@
 import os
-import requests
-import pandas as pd
-from datetime import datetime
+import csv
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from openweather_client import OpenWeatherClient, BASE_URL
 
 # 1. Setup
 load_dotenv()
 TOKEN = os.getenv('OPENWEATHER_TOKEN')
 LAT, LON = 24.8607, 67.0011  # Karachi
 
-# 2. Define Time Range (Aug 1, 2025 to Jan 2, 2026)
+OUTPUT_PATH = os.path.join('data', 'karachi_aqi_history.csv')
+CHECKPOINT_PATH = os.path.join('data', 'backfill_checkpoint.json')
+PARTS_DIR = os.path.join('data', 'backfill_parts')
+
+CHUNK_HOURS = 24 * 7           # One request per week of history
+MAX_WORKERS = 4                # Concurrent requests in flight
+REQUESTS_PER_MINUTE = 60       # OpenWeather free-tier limit
+
+COLUMNS = ['datetime', 'aqi', 'co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
+COMPONENTS = COLUMNS[2:]
+
+# Default range: Aug 1, 2025 to Jan 23, 2026
 # Note: OpenWeather uses Unix timestamps (seconds since 1970)
-start_date = datetime(2025, 8, 1, 0, 0)
-end_date = datetime(2026, 1, 23, 23, 59)
-
-start_unix = int(start_date.timestamp())
-end_unix = int(end_date.timestamp())
-
-# 3. Construct API URL for History
-url = f"http://api.openweathermap.org/data/2.5/air_pollution/history?lat={LAT}&lon={LON}&start={start_unix}&end={end_unix}&appid={TOKEN}"
-
-print(f"⏳ Fetching history from {start_date} to {end_date}...")
-
-# 4. Get the Data
-response = requests.get(url)
-
-if response.status_code == 200:
-    raw_data = response.json()['list']
-    
-    # 5. Process into a Table
-    data_rows = []
-    for entry in raw_data:
-        row = {
-            "datetime": datetime.fromtimestamp(entry['dt']),
-            "aqi": entry['main']['aqi'],
-            "co": entry['components']['co'],
-            "no2": entry['components']['no2'],
-            "o3": entry['components']['o3'],
-            "so2": entry['components']['so2'],
-            "pm2_5": entry['components']['pm2_5'],
-            "pm10": entry['components']['pm10'],
-            "nh3": entry['components']['nh3']
-        }
-        data_rows.append(row)
-    
-    df = pd.DataFrame(data_rows)
-    
-    # 6. Save to Folder
-    os.makedirs('data', exist_ok=True)
-    df.to_csv('data/karachi_aqi_history.csv', index=False)
-    
-    print(f"✅ Success! Saved {len(df)} hourly rows to data/karachi_aqi_history.csv")
-else:
-    print(f"❌ Failed: {response.status_code} - {response.text}")
\ No newline at end of file
+DEFAULT_START = datetime(2025, 8, 1, 0, 0)
+DEFAULT_END = datetime(2026, 1, 23, 23, 59)
+
+
+def make_chunks(start_date, end_date, chunk_hours=CHUNK_HOURS):
+    """Splits [start_date, end_date] into non-overlapping (start_unix, end_unix) windows."""
+    chunks = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(hours=chunk_hours), end_date + timedelta(seconds=1))
+        chunks.append((int(chunk_start.timestamp()), int(chunk_end.timestamp()) - 1))
+        chunk_start = chunk_end
+    return chunks
+
+
+class RateLimiter:
+    """Spaces request start times at least 60 / per_minute seconds apart across threads."""
+
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def fetch_chunk(client, start_unix, end_unix):
+    """Returns the raw 'list' entries for one window (the client retries throttling and transient errors)."""
+    return client.history(LAT, LON, start_unix, end_unix)['list']
+
+
+def iter_rows(entries):
+    """Yields one CSV row per hourly entry, oldest first."""
+    for entry in sorted(entries, key=lambda e: e['dt']):
+        components = entry['components']
+        yield [datetime.fromtimestamp(entry['dt']), int(entry['main']['aqi'])] + \
+              [float(components[c]) for c in COMPONENTS]
+
+
+def part_path(parts_dir, start_unix, end_unix):
+    return os.path.join(parts_dir, f"{start_unix}-{end_unix}.csv")
+
+
+def write_part(entries, path):
+    """Streams a chunk's rows to its part file; the rename makes the part visible only once complete."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.part-', suffix='.tmp')
+    n_rows = 0
+    with os.fdopen(fd, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for row in iter_rows(entries):
+            writer.writerow(row)
+            n_rows += 1
+    os.replace(tmp_path, path)
+    return n_rows
+
+
+def load_checkpoint(path, job):
+    """Returns the completed chunks of a previous run of the same job, else an empty checkpoint."""
+    try:
+        with open(path, 'r') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('job') == job:
+            return checkpoint
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return {'job': job, 'done': {}}
+
+
+def save_checkpoint(checkpoint, path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.backfill-', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def stitch_parts(chunks, parts_dir, output_path):
+    """Concatenates the part files in time order into the output CSV, one line at a time."""
+    directory = os.path.dirname(output_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.history-', suffix='.tmp')
+    with os.fdopen(fd, 'w', newline='') as out:
+        csv.writer(out, lineterminator='\n').writerow(COLUMNS)
+        for start_unix, end_unix in chunks:
+            with open(part_path(parts_dir, start_unix, end_unix), 'r', newline='') as part:
+                shutil.copyfileobj(part, out)
+    os.replace(tmp_path, output_path)
+
+
+def run_backfill(start_date=DEFAULT_START, end_date=DEFAULT_END, output_path=OUTPUT_PATH,
+                 checkpoint_path=CHECKPOINT_PATH, parts_dir=PARTS_DIR, base_url=BASE_URL, token=TOKEN,
+                 chunk_hours=CHUNK_HOURS, max_workers=MAX_WORKERS, requests_per_minute=REQUESTS_PER_MINUTE):
+    """Fetches [start_date, end_date] in concurrent chunks and writes it to output_path.
+
+    Every finished chunk is written to its own part file and recorded in the
+    checkpoint, so re-running after an interruption only fetches the missing
+    chunks. Returns True once the output CSV has been written.
+    """
+    chunks = make_chunks(start_date, end_date, chunk_hours)
+    job = {'lat': LAT, 'lon': LON, 'start': chunks[0][0], 'end': chunks[-1][1], 'chunk_hours': chunk_hours}
+    checkpoint = load_checkpoint(checkpoint_path, job)
+    os.makedirs(parts_dir, exist_ok=True)
+
+    def is_done(chunk):
+        return f"{chunk[0]}-{chunk[1]}" in checkpoint['done'] and os.path.exists(part_path(parts_dir, *chunk))
+
+    pending = [chunk for chunk in chunks if not is_done(chunk)]
+    print(f"⏳ Fetching history from {start_date} to {end_date}: "
+          f"{len(chunks)} chunks, {len(chunks) - len(pending)} already done")
+
+    # 2. Fetch the missing chunks concurrently; the checkpoint is only touched from this thread
+    # The rate limit applies to every attempt, retries included
+    client = OpenWeatherClient(token=token, base_url=base_url, pool_size=max_workers,
+                               limiter=RateLimiter(requests_per_minute))
+    failures, skipped = 0, 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_chunk, client, start_unix, end_unix): (start_unix, end_unix)
+                   for start_unix, end_unix in pending}
+        for future in as_completed(futures):
+            start_unix, end_unix = futures[future]
+            if future.cancelled():
+                skipped += 1
+                continue
+            try:
+                n_rows = write_part(future.result(), part_path(parts_dir, start_unix, end_unix))
+            except Exception as e:
+                failures += 1
+                print(f"❌ Chunk {datetime.fromtimestamp(start_unix):%Y-%m-%d} failed: {e}")
+                # Stop queueing requests; whatever is already in flight still gets checkpointed
+                for other in futures:
+                    other.cancel()
+                continue
+            checkpoint['done'][f"{start_unix}-{end_unix}"] = n_rows
+            save_checkpoint(checkpoint, checkpoint_path)
+            print(f"   ✔ {datetime.fromtimestamp(start_unix):%Y-%m-%d} → "
+                  f"{datetime.fromtimestamp(end_unix):%Y-%m-%d}: {n_rows} rows "
+                  f"({len(checkpoint['done'])}/{len(chunks)})")
+
+    client.log_latency()
+    if failures or skipped:
+        print(f"⚠️ {failures} chunks failed, {skipped} not attempted. Progress is saved in {checkpoint_path}; re-run to resume.")
+        return False
+
+    # 3. Stitch the parts into the output and clear the checkpoint
+    stitch_parts(chunks, parts_dir, output_path)
+    total = sum(checkpoint['done'].values())
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"✅ Success! Saved {total} hourly rows to {output_path}")
+    return True
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Backfill hourly air-pollution history from OpenWeather")
+    parser.add_argument('--start', type=datetime.fromisoformat, default=DEFAULT_START)
+    parser.add_argument('--end', type=datetime.fromisoformat, default=DEFAULT_END)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--chunk-hours', type=int, default=CHUNK_HOURS)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--rpm', type=int, default=REQUESTS_PER_MINUTE, help="Request rate limit per minute")
+    parser.add_argument('--store', help="History store to rebuild (default: the production store, only when "
+                                        "--output is the default CSV)")
+    parser.add_argument('--rollups', help="Dashboard rollups directory to rebuild (same default rule as --store)")
+    args = parser.parse_args(argv)
+    if os.path.abspath(args.output) == os.path.abspath(OUTPUT_PATH):
+        from history_store import STORE_PATH
+        from rollups import ROLLUPS_DIR
+        args.store = args.store or STORE_PATH
+        args.rollups = args.rollups or ROLLUPS_DIR
+    completed = run_backfill(args.start, args.end, output_path=args.output, chunk_hours=args.chunk_hours,
+                             max_workers=args.workers, requests_per_minute=args.rpm)
+    if not completed:
+        return
+    if not (args.store or args.rollups):
+        print("ℹ️ --output isn't the default history: the history store and dashboard rollups were left alone")
+        return
+    # Rebuild the binary history store from the new CSV, then the dashboard's precomputed
+    # history views from the store (a full-range read of the memory map, no second CSV parse)
+    import pandas as pd
+    history = pd.read_csv(args.output)
+    if args.store:
+        from history_store import write_store, HistoryStore
+        write_store(history, args.store)
+        print(f"🗄️ History store rebuilt: {args.store}")
+        history = HistoryStore(args.store).frame()
+    if args.rollups:
+        from rollups import build_rollups, save_rollups
+        save_rollups(build_rollups(history), args.rollups)
+        print(f"📉 Dashboard rollups rebuilt: {args.rollups}")
+
+if __name__ == "__main__":
+    main()
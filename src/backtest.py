@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+from parallel_training import (
+    CANDIDATES, DEFAULT_PARAMS, FIT_FUNCTIONS,
+    share_arrays, attach_arrays, release, threads_per_worker, worker_pool, _candidate_dir,
+)
+
+# Rolling-origin (walk-forward) backtesting for model selection.
+# Fold k trains on rows [0, end_k) and tests on [end_k, end_k + TEST_ROWS) of the
+# chronologically sorted data. The boundaries are anchored to the start of the
+# history, so the folds that existed yesterday are identical today and only
+# new folds need fitting. Every fold matrix is a slice (view) of one shared array.
+
+BACKTEST_CACHE_PATH = os.path.join('data', 'backtest_cache.json')
+INITIAL_TRAIN_ROWS = 24 * 60   # 60 days before the first test window
+TEST_ROWS = 24 * 7             # One week per test window
+STEP_ROWS = 24 * 7             # A new fold every week
+MAX_FOLDS = 12                 # Score on the most recent folds only
+RISK_WEIGHT = 1.0              # score = mean MAE + RISK_WEIGHT * std MAE
+
+
+def make_folds(n_rows, initial_train=INITIAL_TRAIN_ROWS, test_size=TEST_ROWS, step=STEP_ROWS, max_folds=MAX_FOLDS):
+    """Returns [(train_end, test_end), ...] for the most recent ``max_folds`` folds."""
+    folds = [(end, end + test_size) for end in range(initial_train, n_rows - test_size + 1, step)]
+    return folds[-max_folds:] if max_folds else folds
+
+
+def prefix_digests(data, boundaries):
+    """SHA-256 of data[:b] for every boundary b, computed in a single pass over the rows."""
+    digests = {}
+    hasher = hashlib.sha256()
+    position = 0
+    for boundary in sorted(set(boundaries)):
+        hasher.update(np.ascontiguousarray(data[position:boundary]).tobytes())
+        position = boundary
+        digests[boundary] = hasher.copy().hexdigest()
+    return digests
+
+
+def fold_key(name, params, feature_names, digest, train_end, test_end):
+    config = json.dumps({'name': name, 'params': params, 'features': feature_names}, sort_keys=True)
+    return hashlib.sha256(f"{config}|{digest}|{train_end}|{test_end}".encode()).hexdigest()
+
+
+def load_cache(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(cache, path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.backtest-', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def evaluate_fold(name, params, specs, feature_names, train_end, test_end, threads, workdir):
+    """Worker entry point: fits one candidate on one fold and returns its test MAE."""
+    handles, arrays = attach_arrays(specs)
+    try:
+        start = time.perf_counter()
+        X, y = arrays['X'], arrays['y']
+        # Basic slicing keeps every fold matrix a view of the shared array
+        X_train, y_train = X[:train_end], y[:train_end]
+        X_test, y_test = X[train_end:test_end], y[train_end:test_end]
+        _, predictions = FIT_FUNCTIONS[name](X_train, y_train, X_test, y_test, params, feature_names,
+                                             threads, _candidate_dir(workdir, f"{name}-{train_end}"))
+        return mean_absolute_error(y_test, predictions), time.perf_counter() - start
+    finally:
+        del arrays
+        release(handles)
+
+
+def walk_forward_backtest(X, y, candidates=CANDIDATES, params=None, cache_path=BACKTEST_CACHE_PATH,
+                          parallel=True, max_workers=None, **fold_kwargs):
+    """Scores every candidate across the walk-forward folds.
+
+    ``X`` and ``y`` must already be sorted by time. Fold results are cached in
+    ``cache_path`` by candidate config and a hash of the rows the fold touches,
+    so unchanged folds are skipped on the next run. Returns a summary dict:
+    {name: {'maes': [...], 'mean_mae', 'var_mae', 'std_mae', 'score', 'folds',
+    'evaluated', 'cached', 'fit_seconds'}}.
+    """
+    params = {name: (params or {}).get(name, DEFAULT_PARAMS[name]) for name in candidates}
+    feature_names = list(X.columns) if isinstance(X, pd.DataFrame) else None
+    X_arr = np.ascontiguousarray(X, dtype=np.float64)
+    y_arr = np.ascontiguousarray(np.ravel(y), dtype=np.float64)
+
+    folds = make_folds(len(X_arr), **fold_kwargs)
+    if not folds:
+        raise ValueError(f"Not enough rows ({len(X_arr)}) for a single walk-forward fold")
+    combined = np.column_stack([X_arr, y_arr])
+    digests = prefix_digests(combined, [test_end for _, test_end in folds])
+
+    cache = load_cache(cache_path) if cache_path else {}
+    results = {name: {} for name in candidates}
+    pending = []
+    for name in candidates:
+        for train_end, test_end in folds:
+            key = fold_key(name, params[name], feature_names, digests[test_end], train_end, test_end)
+            if key in cache:
+                results[name][(train_end, test_end)] = (cache[key]['mae'], 0.0, True)
+            else:
+                pending.append((name, train_end, test_end, key))
+
+    if pending:
+        workdir = tempfile.TemporaryDirectory(prefix='aqi-backtest-')
+        handles, specs = share_arrays({'X': X_arr, 'y': y_arr})
+        try:
+            n_workers = max_workers or min(len(pending), os.cpu_count() or 1)
+            if parallel and n_workers > 1:
+                with worker_pool(n_workers) as (pool, threads):
+                    futures = [pool.submit(evaluate_fold, name, params[name], specs, feature_names,
+                                           train_end, test_end, threads, workdir.name)
+                               for name, train_end, test_end, _ in pending]
+                    outcomes = [f.result() for f in futures]
+            else:
+                threads = threads_per_worker(1)
+                outcomes = [evaluate_fold(name, params[name], specs, feature_names,
+                                          train_end, test_end, threads, workdir.name)
+                            for name, train_end, test_end, _ in pending]
+        finally:
+            release(handles, unlink=True)
+            workdir.cleanup()
+
+        for (name, train_end, test_end, key), (mae, seconds) in zip(pending, outcomes):
+            results[name][(train_end, test_end)] = (mae, seconds, False)
+            cache[key] = {'candidate': name, 'train_end': train_end, 'test_end': test_end, 'mae': mae}
+        if cache_path:
+            # Folds that slid out of the scoring window will never be asked for again
+            oldest = folds[0][1]
+            cache = {k: v for k, v in cache.items() if v['test_end'] >= oldest}
+            save_cache(cache, cache_path)
+
+    summary = {}
+    for name in candidates:
+        maes = np.array([results[name][fold][0] for fold in folds])
+        summary[name] = {
+            'maes': maes.tolist(),
+            'mean_mae': float(maes.mean()),
+            'var_mae': float(maes.var()),
+            'std_mae': float(maes.std()),
+            'score': float(maes.mean() + RISK_WEIGHT * maes.std()),
+            'folds': len(folds),
+            'evaluated': sum(not results[name][fold][2] for fold in folds),
+            'cached': sum(results[name][fold][2] for fold in folds),
+            'fit_seconds': sum(results[name][fold][1] for fold in folds),
+        }
+    return summary
+
+
+def select_candidate(summary):
+    """Picks the candidate with the lowest mean + RISK_WEIGHT * std of fold MAEs."""
+    return min(summary, key=lambda name: summary[name]['score'])
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+from collections import defaultdict
+
+# Single entry point for the pipelines:
+#   python src/cli.py ingest [--cities]    hourly ingest (Karachi, or every city in config/cities.json)
+#   python src/cli.py backfill [...]       OpenWeather history backfill (options of backfill_data.py)
+#   python src/cli.py upload               history CSV -> feature group + watermark (hopsworks_backfill.py)
+#   python src/cli.py train [--full-sync] [--full-retrain]
+#                                          daily training: incremental update, or full retrain every few days
+#   python src/cli.py infer [--paths N]    72h forecast, snapshot and rollups
+#   python src/cli.py predict              one next-hour prediction
+#   python src/cli.py serve [...]          prediction service (options of prediction_service.py)
+#   python src/cli.py prune [--keep N] [--dry-run]
+#                                          delete registry versions outside the retention policy (model_index.py)
+# Only the standard library is imported until the command is known; then just
+# the module that runs it is. Heavy backends (hopsworks, scipy, sklearn,
+# TensorFlow, numba, joblib) are imported by the code paths that use them, so a
+# runner only pays for what its command needs.
+# --import-report runs a command's imports (not the command) in a fresh
+# interpreter under -X importtime and lists what they cost, by package.
+
+HEAVY_PACKAGES = ['hopsworks', 'tensorflow', 'keras', 'sklearn', 'scipy', 'numba', 'joblib']
+REPORT_TOP = 12
+
+
+def _target(args, rest):
+    """(module, function, kwargs) the parsed command runs; nothing is imported here."""
+    if args.command == 'ingest':
+        if args.cities:
+            return 'multi_city_pipeline', 'run_hourly_cities', {}
+        return 'feature_pipeline', 'run_hourly', {}
+    if args.command == 'backfill':
+        return 'backfill_data', 'main', {'argv': rest, 'prog': 'cli.py backfill'}
+    if args.command == 'upload':
+        return 'hopsworks_backfill', 'upload_history', {}
+    if args.command == 'train':
+        return 'training_pipeline', 'run_training', {'full_sync': args.full_sync, 'full_retrain': args.full_retrain}
+    if args.command == 'infer':
+        return 'inference_pipeline', 'run_inference', {'n_paths': args.paths}
+    if args.command == 'predict':
+        return 'predict_next_hour', 'get_live_forecast', {}
+    if args.command == 'prune':
+        keep = {} if args.keep is None else {'keep_latest': args.keep}
+        return 'model_index', 'prune_registry', {**keep, 'dry_run': args.dry_run}
+    return 'prediction_service', 'main', {'argv': rest, 'prog': 'cli.py serve'}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Karachi AQI pipelines")
+    parser.add_argument('--import-report', action='store_true',
+                        help="Report what the command's imports cost instead of running it")
+    parser.add_argument('--import-only', action='store_true', help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help="Hourly feature ingest")
+    ingest.add_argument('--cities', action='store_true', help="Ingest every city in config/cities.json instead")
+    # backfill and serve hand their arguments (and -h) to the module's own parser
+    commands.add_parser('backfill', add_help=False, help="Backfill history from OpenWeather")
+    commands.add_parser('upload', help="Upload the history CSV to the feature group and seed the watermark")
+    train = commands.add_parser('train', help="Train, backtest and register the best model")
+    train.add_argument('--full-sync', action='store_true', help="Rebuild the training snapshot from the whole feature group")
+    train.add_argument('--full-retrain', action='store_true', help="Refit every candidate instead of updating them")
+    infer = commands.add_parser('infer', help="72-hour forecast with uncertainty bands")
+    infer.add_argument('--paths', type=int, default=1000, help="Monte Carlo trajectories")
+    commands.add_parser('predict', help="Predict the next hour once")
+    commands.add_parser('serve', add_help=False, help="Run the next-hour prediction service")
+    prune = commands.add_parser('prune', help="Delete old non-champion model versions from the registry")
+    prune.add_argument('--keep', type=int, help="Newest versions to keep besides the champion (default: model_index.KEEP_LATEST)")
+    prune.add_argument('--dry-run', action='store_true', help="Only list the versions that would be deleted")
+    return parser
+
+
+def import_profile(argv):
+    """Imports of ``cli.py argv`` in a fresh interpreter: (wall seconds, {package: self seconds})."""
+    cmd = [sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--import-only'] + list(argv)
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    packages = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # import time: <self us> | <cumulative us> | <indented module name>
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1e6
+    return wall, dict(packages)
+
+
+def import_report(argv, top=REPORT_TOP):
+    wall, packages = import_profile(argv)
+    total = sum(packages.values())
+    heavy = [p for p in HEAVY_PACKAGES if p in packages]
+    print(f"📦 cli.py {' '.join(argv)}: {total:.2f}s of imports, {wall:.2f}s to start")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {name:24s} {seconds * 1e3:8.1f} ms  {seconds / total:6.1%}")
+    print(f"   heavy backends loaded: {', '.join(heavy) if heavy else 'none'}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and args.command not in ('backfill', 'serve'):
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if args.import_report:
+        import_report([a for a in argv if a != '--import-report'])
+        return
+    module, function, kwargs = _target(args, rest)
+    run = getattr(importlib.import_module(module), function)
+    if not args.import_only:
+        run(**kwargs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import os
-import requests
-import hopsworks
 import pandas as pd
 import time
 from datetime import datetime
 from dotenv import load_dotenv
-from requests.exceptions import ConnectionError
+from store_backend import connect
+from watermark import load_watermark, save_watermark, watermark_from_frame, insert_with_watermark
+from features import FeatureState
+from openweather_client import get_client
+from rollups import load_rollups, save_rollups, update_rollups
+from history_store import append_rows, write_store, STORE_PATH, COLUMNS as HISTORY_COLUMNS
 
 # Load environment variables
 load_dotenv()
@@ -13,7 +16,7 @@ load_dotenv()
 def run_hourly():
     # 1. Connect to Hopsworks
     try:
-        project = hopsworks.login(api_key_value=os.getenv('HOPSWORKS_TOKEN'))
+        project = connect()
         fs = project.get_feature_store()
         fg = fs.get_feature_group(name="karachi_aqi_fg", version=1)
     except Exception as e:
@@ -22,23 +25,30 @@ def run_hourly():
 
     # 2. Get Live Data for Karachi from OpenWeather
     LAT, LON = 24.8607, 67.0011
-    API_KEY = os.getenv('OPENWEATHER_TOKEN')
-    url = f"http://api.openweathermap.org/data/2.5/air_pollution?lat={LAT}&lon={LON}&appid={API_KEY}"
-    
+    client = get_client()
+
     try:
-        response_raw = requests.get(url).json()
+        response_raw = client.current(LAT, LON)
         response = response_raw['list'][0]
         new_ts = datetime.fromtimestamp(response['dt'])
     except Exception as e:
         print(f"❌ Failed to fetch data from OpenWeather: {e}")
         return
+    finally:
+        client.log_latency()
     
     # 3. DUPLICATE CHECK
-    # Pull the last record to compare timestamps
-    last_df = fg.read().sort_values(by="datetime").tail(1)
+    # Compare against the persisted watermark instead of scanning the feature group
+    last_row = load_watermark()
+    if last_row is None:
+        print("ℹ️ No watermark found. Bootstrapping it from the feature group...")
+        history = fg.read()
+        last_row = watermark_from_frame(history)
+        if last_row is not None:
+            last_row = save_watermark(last_row, state=FeatureState.from_frame(history))
     
-    if not last_df.empty:
-        last_ts = pd.to_datetime(last_df['datetime'].values[0])
+    if last_row is not None:
+        last_ts = pd.Timestamp(last_row['datetime'])
         if new_ts <= last_ts:
             print(f"⏭️ Data for {new_ts} already exists in Hopsworks. Skipping...")
             return
@@ -46,25 +56,17 @@ def run_hourly():
         print("ℹ️ Feature group is empty. Proceeding with first insertion.")
 
     # 4. PREPARE ALL 17 FEATURES
-    new_data = {
-        'datetime': [new_ts],
-        'aqi': [int(response['main']['aqi'])],
-        'co': [float(response['components']['co'])],
-        'no2': [float(response['components']['no2'])],
-        'o3': [float(response['components']['o3'])],
-        'so2': [float(response['components']['so2'])],
-        'pm2_5': [float(response['components']['pm2_5'])],
-        'pm10': [float(response['components']['pm10'])],
-        'nh3': [float(response['components']['nh3'])],
-        'hour': [int(new_ts.hour)],
-        'day_of_week': [int(new_ts.weekday())],
-        'month': [int(new_ts.month)],
-        'aqi_lag_1h': [float(last_df['aqi'].values[0]) if not last_df.empty else 0.0],
-        'pm2_5_lag_1h': [float(last_df['pm2_5'].values[0]) if not last_df.empty else 0.0],
-        'co_lag_1h': [float(last_df['co'].values[0]) if not last_df.empty else 0.0],
-        'no2_lag_1h': [float(last_df['no2'].values[0]) if not last_df.empty else 0.0],
-        'aqi_change_rate': [float(response['main']['aqi'] - last_df['aqi'].values[0]) if not last_df.empty else 0.0]
+    # Lags come from the streaming feature state, the same definitions the backfill uses in batch
+    state = FeatureState.from_watermark(last_row)
+    observation = {
+        'datetime': new_ts,
+        'aqi': int(response['main']['aqi']),
+        **{col: float(response['components'][col]) for col in ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']},
     }
+    features = state.update(observation)
+    # The very first row has no history to lag from
+    new_data = {col: [value] for col, value in observation.items()}
+    new_data.update({col: [0.0 if pd.isna(value) else value] for col, value in features.items()})
     
     # 5. CREATE DATAFRAME AND FORCE TYPE CASTING
     new_df = pd.DataFrame(new_data)
@@ -84,7 +86,8 @@ def run_hourly():
     for attempt in range(max_retries):
         try:
             print(f"🚀 Attempting to insert data (Attempt {attempt + 1}/{max_retries})...")
-            fg.insert(new_df)
+            # The watermark only advances once the insert has been committed
+            insert_with_watermark(fg, new_df, state=state)
             print(f"✅ Successfully inserted new data for {new_ts}")
             break 
         except Exception as e:
@@ -97,5 +100,17 @@ def run_hourly():
                 print("❌ All retry attempts failed. Please check Hopsworks service status.")
                 raise e
 
+    # 7. Fold the new hour into the dashboard rollups (the daily inference rebuilds them in full)
+    rollups = load_rollups()
+    if rollups is not None:
+        save_rollups(update_rollups(rollups, new_df))
+
+    # 8. Append the hour to the binary history store (kept between runs in the runner cache)
+    if not os.path.exists(STORE_PATH):
+        # First run on this machine or the cache was evicted: seed it once from the feature group
+        print("ℹ️ No history store found. Building it from the feature group...")
+        write_store(fg.select(HISTORY_COLUMNS).read())
+    append_rows(new_df[HISTORY_COLUMNS])
+
 if __name__ == "__main__":
     run_hourly()
\ No newline at end of file
@@ -0,0 +1,251 @@
+import numpy as np
+import pandas as pd
+
+# Single definition of the engineered features, in two modes:
+#   batch     - compute_features(df): vectorized over a whole (sorted) history
+#   streaming - FeatureState.update(row): per hourly event from fixed-size ring buffers
+# Both produce the same values for the same sequence of rows (rolling stats to
+# within float rounding: batch mode uses pandas' running-window kernels, the
+# streaming state reduces each window directly). Every feature of
+# row t only looks at rows before t: lags are taken over the previous *rows*,
+# exactly like pandas shift(), rolling windows cover the w rows before t and
+# EWMAs are smoothed through t-1. Rows without enough history get NaN.
+#
+# Which features are produced is set by a config dict:
+#   lags         {column: [hours, ...]}        -> <col>_lag_<h>h
+#   windows      {column: [hours, ...]}        -> <col>_roll_<stat>_<w>h for each of window_stats
+#   window_stats ['mean', 'min', 'max', 'std'] (std is the population std, ddof=0)
+#   ewm_spans    {column: [span, ...]}         -> <col>_ewm_<span>h, alpha = 2 / (span + 1)
+
+DEFAULT_CONFIG = {
+    # The schema of karachi_aqi_fg v1
+    'lags': {'aqi': [1], 'pm2_5': [1], 'co': [1], 'no2': [1]},
+    'windows': {},
+    'window_stats': ['mean', 'min', 'max', 'std'],
+    'ewm_spans': {},
+}
+EXTENDED_CONFIG = {
+    # Daily and weekly cycles: multi-horizon lags, rolling stats and EWMAs
+    'lags': {'aqi': [1, 3, 6, 24, 168], 'pm2_5': [1, 3, 6, 24, 168], 'co': [1, 24], 'no2': [1, 24]},
+    'windows': {'aqi': [3, 24, 168], 'pm2_5': [3, 24, 168]},
+    'window_stats': ['mean', 'min', 'max', 'std'],
+    'ewm_spans': {'aqi': [6, 24], 'pm2_5': [6, 24]},
+}
+
+TIME_FEATURES = ['hour', 'day_of_week', 'month']
+
+
+def source_columns(config=DEFAULT_CONFIG):
+    """Raw columns the config reads; 'aqi' is always needed for aqi_change_rate."""
+    columns = ['aqi']
+    for group in ('lags', 'windows', 'ewm_spans'):
+        columns += [col for col in config[group] if col not in columns]
+    return columns
+
+
+def history_rows(config=DEFAULT_CONFIG):
+    """Rows of history the streaming state has to keep (longest lag or window, at least 2)."""
+    spans = [h for hours in config['lags'].values() for h in hours]
+    spans += [w for windows in config['windows'].values() for w in windows]
+    return max([2] + spans)
+
+
+def feature_columns(config=DEFAULT_CONFIG):
+    columns = list(TIME_FEATURES)
+    columns += [f'{col}_lag_{h}h' for col, hours in config['lags'].items() for h in hours]
+    columns.append('aqi_change_rate')
+    columns += [f'{col}_roll_{stat}_{w}h' for col, windows in config['windows'].items()
+                for w in windows for stat in config['window_stats']]
+    columns += [f'{col}_ewm_{span}h' for col, spans in config['ewm_spans'].items() for span in spans]
+    return columns
+
+
+LAG_SOURCE_COLUMNS = source_columns(DEFAULT_CONFIG)
+FEATURE_COLUMNS = feature_columns(DEFAULT_CONFIG)
+HISTORY_ROWS = history_rows(DEFAULT_CONFIG)
+
+
+def _shift(values, periods):
+    shifted = np.full(len(values), np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def _window_stats(block, stats):
+    """{stat: values} over the last axis of ``block``; std reuses the mean (same ops as np.std)."""
+    n = block.shape[-1]
+    mean = np.add.reduce(block, axis=-1) / n
+    out = {}
+    for stat in stats:
+        if stat == 'mean':
+            out[stat] = mean
+        elif stat == 'min':
+            out[stat] = np.minimum.reduce(block, axis=-1)
+        elif stat == 'max':
+            out[stat] = np.maximum.reduce(block, axis=-1)
+        elif stat == 'std':
+            deviations = block - mean[..., None]
+            np.multiply(deviations, deviations, out=deviations)
+            out[stat] = np.sqrt(np.add.reduce(deviations, axis=-1) / n)
+    return out
+
+
+def _rolling(values, window, stats):
+    """{stat: array} over the ``window`` values before each row (pandas rolling on the series shifted by one)."""
+    # pandas' rolling kernels update each window in O(1); reducing a strided view
+    # of every window costs O(window) per row and was slower at every window size
+    rolling = pd.Series(_shift(values, 1)).rolling(window)
+    return {stat: (rolling.std(ddof=0) if stat == 'std' else getattr(rolling, stat)()).to_numpy() for stat in stats}
+
+
+def _ewm(values, span):
+    """EWMA through each row (y0 = x0, y_t = alpha * x_t + (1 - alpha) * y_t-1)."""
+    if len(values) == 0:
+        return np.empty(0)
+    # scipy.signal costs ~1 s to import; only the extended (EWM) config needs it
+    from scipy.signal import lfilter
+    alpha = 2.0 / (span + 1)
+    smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    return smoothed
+
+
+def compute_features(df, config=DEFAULT_CONFIG):
+    """Batch mode: returns a copy of ``df`` sorted by datetime with every engineered column added."""
+    df = df.copy()
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    if not df['datetime'].is_monotonic_increasing:
+        df = df.sort_values('datetime', kind='stable')
+    df = df.reset_index(drop=True)
+    values = {col: df[col].to_numpy(dtype=np.float64) for col in source_columns(config)}
+    features = {}
+
+    # --- Time features ---
+    features['hour'] = df['datetime'].dt.hour
+    features['day_of_week'] = df['datetime'].dt.dayofweek
+    features['month'] = df['datetime'].dt.month
+
+    # --- Lag features (previous rows) ---
+    for col, hours in config['lags'].items():
+        for h in hours:
+            features[f'{col}_lag_{h}h'] = _shift(values[col], h)
+
+    # --- Change rate: movement over the last known hour (no look-ahead at the current AQI) ---
+    features['aqi_change_rate'] = _shift(values['aqi'], 1) - _shift(values['aqi'], 2)
+
+    # --- Rolling windows over the rows before t ---
+    for col, windows in config['windows'].items():
+        for w in windows:
+            for stat, column in _rolling(values[col], w, config['window_stats']).items():
+                features[f'{col}_roll_{stat}_{w}h'] = column
+
+    # --- EWMAs smoothed through t-1 ---
+    for col, spans in config['ewm_spans'].items():
+        for span in spans:
+            features[f'{col}_ewm_{span}h'] = _shift(_ewm(values[col], span), 1)
+
+    # One concat instead of a column insert per feature
+    df = df.drop(columns=[col for col in features if col in df.columns])
+    return pd.concat([df, pd.DataFrame(features, index=df.index)], axis=1)
+
+
+class FeatureState:
+    """Streaming mode: a ring buffer of the last history_rows(config) values per source column.
+
+    Each update writes one slot per column and reads at most the longest window,
+    so the cost per event is independent of how much history has been seen.
+    """
+
+    def __init__(self, rows=(), config=DEFAULT_CONFIG):
+        self.config = config
+        self.columns = source_columns(config)
+        self.size = history_rows(config)
+        self.buffers = {col: np.full(self.size, np.nan) for col in self.columns}
+        self.head = 0    # Slot the next row is written to
+        self.count = 0   # Rows seen, capped at size
+        self.ewm = {(col, span): np.nan for col, spans in config['ewm_spans'].items() for span in spans}
+        for row in rows:
+            self.push(row)
+
+    def push(self, row):
+        for col in self.columns:
+            self.buffers[col][self.head] = float(row[col])
+        for (col, span), previous in self.ewm.items():
+            value = float(row[col])
+            alpha = 2.0 / (span + 1)
+            self.ewm[(col, span)] = value if np.isnan(previous) else alpha * value + (1.0 - alpha) * previous
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def lag(self, col, hours):
+        """Value of ``col`` ``hours`` rows back, or NaN if the state doesn't reach that far."""
+        return self.buffers[col][(self.head - hours) % self.size] if hours <= self.count else np.nan
+
+    def window(self, col, hours):
+        """The last ``hours`` values of ``col``, oldest first, or None without enough history."""
+        if hours > self.count:
+            return None
+        buffer = self.buffers[col]
+        # Unroll the ring: [head, size) holds the older rows, [0, head) the newer ones
+        return np.concatenate((buffer[self.head:], buffer[:self.head]))[self.size - hours:]
+
+    def features(self, row):
+        """Features of ``row`` given the rows seen so far, without advancing the state."""
+        ts = pd.Timestamp(row['datetime'])
+        return {'hour': ts.hour, 'day_of_week': ts.dayofweek, 'month': ts.month, **self.next_lags()}
+
+    def next_lags(self):
+        """History features for the row that follows the last one pushed (e.g. the first forecast hour)."""
+        features = {f'{col}_lag_{h}h': self.lag(col, h) for col, hours in self.config['lags'].items() for h in hours}
+        features['aqi_change_rate'] = self.lag('aqi', 1) - self.lag('aqi', 2)
+        stats = self.config['window_stats']
+        for col, windows in self.config['windows'].items():
+            # Unroll the ring once per column; each window is a suffix of it
+            history = self.window(col, self.count)
+            for w in windows:
+                reduced = _window_stats(history[self.count - w:], stats) if w <= self.count else {}
+                for stat in stats:
+                    features[f'{col}_roll_{stat}_{w}h'] = float(reduced[stat]) if reduced else np.nan
+        for (col, span), value in self.ewm.items():
+            features[f'{col}_ewm_{span}h'] = value
+        return features
+
+    def update(self, row):
+        """Returns the features of ``row`` and then advances the state with it."""
+        features = self.features(row)
+        self.push(row)
+        return features
+
+    def to_dict(self):
+        rows = [{col: float(self.lag(col, k)) for col in self.columns} for k in range(self.count, 0, -1)]
+        return {'rows': rows, 'ewm': {f'{col}:{span}': value for (col, span), value in self.ewm.items()}}
+
+    @classmethod
+    def from_dict(cls, data, config=DEFAULT_CONFIG):
+        state = cls(data.get('rows', []), config)
+        # Replaying only the buffered rows would restart the EWMAs; restore them as saved
+        for key, value in data.get('ewm', {}).items():
+            col, span = key.rsplit(':', 1)
+            if (col, int(span)) in state.ewm:
+                state.ewm[(col, int(span))] = value
+        return state
+
+    @classmethod
+    def from_frame(cls, df, config=DEFAULT_CONFIG):
+        """State after the last row of a history frame (EWMAs smoothed over all of it)."""
+        if df is None or df.empty:
+            return cls(config=config)
+        df = df.assign(datetime=pd.to_datetime(df['datetime'])).sort_values('datetime', kind='stable')
+        state = cls((row for _, row in df.tail(history_rows(config)).iterrows()), config)
+        for col, span in state.ewm:
+            state.ewm[(col, span)] = float(_ewm(df[col].to_numpy(dtype=np.float64), span)[-1])
+        return state
+
+    @classmethod
+    def from_watermark(cls, watermark, config=DEFAULT_CONFIG):
+        """State stored alongside a watermark; older watermarks only carry the last row."""
+        if watermark is None:
+            return cls(config=config)
+        if 'state' in watermark:
+            return cls.from_dict(watermark['state'], config)
+        return cls([watermark], config)
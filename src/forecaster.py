@@ -0,0 +1,160 @@
+import warnings
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+
+# Recursive 72-hour forecasting engine used by inference_pipeline.
+# Every exogenous column (decayed pollutants, calendar features) is known up front,
+# so it is precomputed as one matrix. Only aqi_lag_1h and aqi_change_rate depend on
+# the previous prediction and are filled in step by step.
+
+HORIZON = 72
+DECAY_PER_HOUR = 0.008       # 0.8% decay per hour
+MIN_DECAY = 0.3              # Don't go below 30% of original
+RUSH_HOURS = [7, 8, 9, 17, 18, 19]
+RUSH_MULTIPLIER = 1.2
+OFF_PEAK_MULTIPLIER = 0.95
+NOISE_STD = 0.3
+AQI_MIN, AQI_MAX = 0, 5
+
+RECURSIVE_FEATURES = ['aqi_lag_1h', 'aqi_change_rate']
+
+
+def build_exogenous(last_obs, start_time, feature_names, horizon=HORIZON):
+    """Returns (X, times): the horizon x features matrix with every non-recursive column filled in."""
+    times = [start_time + timedelta(hours=i) for i in range(horizon)]
+    steps = np.arange(horizon)
+    hours = np.array([t.hour for t in times])
+
+    decay = np.maximum(1.0 - (steps * DECAY_PER_HOUR), MIN_DECAY)
+    rush = np.where(np.isin(hours, RUSH_HOURS), RUSH_MULTIPLIER, OFF_PEAK_MULTIPLIER)
+
+    adjusted_co = float(last_obs['co']) * decay * rush
+    adjusted_no2 = float(last_obs['no2']) * decay * rush
+    adjusted_pm25 = float(last_obs['pm2_5']) * decay * rush
+    columns = {
+        'co': adjusted_co,
+        'no2': adjusted_no2,
+        'o3': float(last_obs['o3']) * decay,
+        'so2': float(last_obs['so2']) * decay,
+        'pm2_5': adjusted_pm25,
+        'pm10': float(last_obs['pm10']) * decay * rush,
+        'nh3': float(last_obs['nh3']) * decay,
+        'hour': hours,
+        'day_of_week': np.array([t.weekday() for t in times]),
+        'month': np.array([t.month for t in times]),
+        'pm2_5_lag_1h': adjusted_pm25,
+        'co_lag_1h': adjusted_co,
+        'no2_lag_1h': adjusted_no2,
+    }
+
+    X = np.zeros((horizon, len(feature_names)), dtype=np.float64)
+    for j, name in enumerate(feature_names):
+        if name in RECURSIVE_FEATURES:
+            continue
+        if name not in columns:
+            raise ValueError(f"Don't know how to project feature '{name}' over the forecast horizon")
+        X[:, j] = columns[name]
+    return X, times
+
+
+def make_predictor(model):
+    """Returns a low-overhead predict function for 2D float arrays."""
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    if coef is not None and intercept is not None and np.ndim(coef) == 1:
+        # Linear models (Ridge): evaluate the coefficients directly, no validation per call
+        coef = np.ascontiguousarray(coef, dtype=np.float64)
+        intercept = float(intercept)
+
+        def predict_linear(X):
+            return X @ coef + intercept
+        return predict_linear
+
+    def predict_generic(X):
+        # Models fitted on DataFrames warn about missing feature names on ndarray input
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            return np.ravel(model.predict(X))
+    return predict_generic
+
+
+def recursive_forecast(model, last_obs, start_time, feature_names, horizon=HORIZON, noise=None, predict=None,
+                       initial_change_rate=0.0):
+    """Runs the recursive forecast and returns a DataFrame of forecast_time / predicted_aqi.
+
+    ``noise`` defaults to one draw of N(0, NOISE_STD) per step from the global NumPy RNG,
+    in the same order as the original per-step loop. ``initial_change_rate`` is the
+    aqi_change_rate of the first step (from FeatureState.next_lags()).
+    """
+    X, times = build_exogenous(last_obs, start_time, feature_names, horizon)
+    if noise is None:
+        # Small stochastic noise to prevent unrealistic flatness
+        noise = np.random.normal(0, NOISE_STD, size=horizon)
+    if predict is None:
+        predict = make_predictor(model)
+
+    lag_idx = feature_names.index('aqi_lag_1h') if 'aqi_lag_1h' in feature_names else None
+    rate_idx = feature_names.index('aqi_change_rate') if 'aqi_change_rate' in feature_names else None
+
+    predictions = np.empty(horizon, dtype=np.float64)
+    current_aqi = float(last_obs['aqi'])
+    previous_aqi = current_aqi
+    for i in range(horizon):
+        if lag_idx is not None:
+            X[i, lag_idx] = current_aqi
+        if rate_idx is not None:
+            X[i, rate_idx] = current_aqi - previous_aqi if i > 0 else initial_change_rate
+
+        prediction = predict(X[i:i + 1])[0] + noise[i]
+        prediction = max(AQI_MIN, min(prediction, AQI_MAX))  # Clamp AQI to valid 0-5 range
+        predictions[i] = prediction
+
+        previous_aqi = current_aqi
+        current_aqi = prediction
+
+    return pd.DataFrame({
+        'forecast_time': times,
+        'predicted_aqi': [round(float(p), 2) for p in predictions],
+    })
+
+
+def monte_carlo_forecast(model, last_obs, start_time, feature_names, n_paths=1000, horizon=HORIZON,
+                         quantiles=(10, 50, 90), rng=None, predict=None, initial_change_rate=0.0):
+    """Advances ``n_paths`` noisy trajectories together and returns per-step quantile bands.
+
+    The state is an n_paths x horizon matrix; each horizon step makes one batched
+    predict call over all paths instead of n_paths single-row calls.
+    Returns a DataFrame with forecast_time and one ``aqi_p<q>`` column per quantile.
+    """
+    X, times = build_exogenous(last_obs, start_time, feature_names, horizon)
+    if rng is None:
+        rng = np.random.default_rng()
+    if predict is None:
+        predict = make_predictor(model)
+
+    lag_idx = feature_names.index('aqi_lag_1h') if 'aqi_lag_1h' in feature_names else None
+    rate_idx = feature_names.index('aqi_change_rate') if 'aqi_change_rate' in feature_names else None
+
+    paths = np.empty((n_paths, horizon), dtype=np.float64)
+    batch = np.empty((n_paths, len(feature_names)), dtype=np.float64)
+    current_aqi = np.full(n_paths, float(last_obs['aqi']))
+    previous_aqi = current_aqi.copy()
+    for i in range(horizon):
+        batch[:] = X[i]
+        if lag_idx is not None:
+            batch[:, lag_idx] = current_aqi
+        if rate_idx is not None:
+            batch[:, rate_idx] = current_aqi - previous_aqi if i > 0 else initial_change_rate
+
+        step = predict(batch) + rng.normal(0, NOISE_STD, size=n_paths)
+        np.clip(step, AQI_MIN, AQI_MAX, out=paths[:, i])
+
+        previous_aqi = current_aqi
+        current_aqi = paths[:, i]
+
+    bands = np.percentile(paths, quantiles, axis=0)
+    result = pd.DataFrame({'forecast_time': times})
+    for q, band in zip(quantiles, bands):
+        result[f'aqi_p{q}'] = np.round(band, 2)
+    return result
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+# Flat-array runtime for fitted sklearn forests.
+# export_forest() concatenates every tree into contiguous node arrays
+# (feature, threshold, left, right, value); FlatForest.predict() walks them in a
+# numba-jitted batch kernel, skipping sklearn's per-call validation and per-tree
+# Python dispatch. Falls back to a NumPy level-by-level walk when numba is missing.
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+LEAF = -1
+# Below this many rows the thread start-up of the parallel kernel costs more than it saves
+PARALLEL_MIN_ROWS = 2048
+
+
+# Rows are processed in blocks, tree by tree inside each block, so one tree's nodes
+# stay in cache while a block of rows walks it. Per-row sums still run in tree
+# order, which keeps the output bit-identical to sklearn's averaging.
+BLOCK_ROWS = 256
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True, inline='always')
+    def _step(X, i, node, feature, threshold, left):
+        # Siblings are adjacent (right == left + 1), so the step needs no branch
+        return left[node] + (0 if X[i, feature[node]] <= threshold[node] else 1)
+
+    @njit(cache=True, nogil=True)
+    def _predict_block(X, feature, threshold, left, right, value, roots, out, start, stop):
+        for i in range(start, stop):
+            out[i] = 0.0
+        for t in range(roots.shape[0]):
+            root = roots[t]
+            i = start
+            # Walk four rows through the tree in lockstep: the four independent
+            # node-load chains overlap instead of waiting on each other
+            while i + 4 <= stop:
+                n0 = n1 = n2 = n3 = root
+                moved = True
+                while moved:
+                    moved = False
+                    if left[n0] != LEAF:
+                        n0 = _step(X, i, n0, feature, threshold, left)
+                        moved = True
+                    if left[n1] != LEAF:
+                        n1 = _step(X, i + 1, n1, feature, threshold, left)
+                        moved = True
+                    if left[n2] != LEAF:
+                        n2 = _step(X, i + 2, n2, feature, threshold, left)
+                        moved = True
+                    if left[n3] != LEAF:
+                        n3 = _step(X, i + 3, n3, feature, threshold, left)
+                        moved = True
+                out[i] += value[n0]
+                out[i + 1] += value[n1]
+                out[i + 2] += value[n2]
+                out[i + 3] += value[n3]
+                i += 4
+            while i < stop:
+                node = root
+                while left[node] != LEAF:
+                    node = _step(X, i, node, feature, threshold, left)
+                out[i] += value[node]
+                i += 1
+        for i in range(start, stop):
+            out[i] /= roots.shape[0]
+
+    @njit(cache=True, nogil=True)
+    def _predict_serial(X, feature, threshold, left, right, value, roots, out):
+        n = X.shape[0]
+        for start in range(0, n, BLOCK_ROWS):
+            _predict_block(X, feature, threshold, left, right, value, roots, out,
+                           start, min(start + BLOCK_ROWS, n))
+
+    @njit(cache=True, nogil=True, parallel=True)
+    def _predict_parallel(X, feature, threshold, left, right, value, roots, out):
+        n = X.shape[0]
+        n_blocks = (n + BLOCK_ROWS - 1) // BLOCK_ROWS
+        for b in prange(n_blocks):
+            start = b * BLOCK_ROWS
+            _predict_block(X, feature, threshold, left, right, value, roots, out,
+                           start, min(start + BLOCK_ROWS, n))
+
+
+def _predict_numpy(X, feature, threshold, left, right, value, roots, out):
+    rows = np.arange(X.shape[0])
+    out[:] = 0.0
+    for root in roots:
+        node = np.full(X.shape[0], root, dtype=np.int32)
+        active = left[node] != LEAF
+        while active.any():
+            idx = node[active]
+            go_left = X[rows[active], feature[idx]] <= threshold[idx]
+            node[active] = np.where(go_left, left[idx], right[idx])
+            active = left[node] != LEAF
+        out += value[node]
+    out /= len(roots)
+
+
+class FlatForest:
+    """A fitted regression forest stored as contiguous node arrays."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, n_features, feature_names=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.n_features_in_ = int(n_features)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _as_matrix(self, X):
+        if isinstance(X, pd.DataFrame) and self.feature_names is not None:
+            X = X[self.feature_names]
+        # sklearn trees compare float32 inputs against float64 thresholds; do the same for parity
+        return np.ascontiguousarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+
+    def predict(self, X):
+        X = self._as_matrix(X)
+        out = np.empty(X.shape[0], dtype=np.float64)
+        args = (X, self.feature, self.threshold, self.left, self.right, self.value, self.roots, out)
+        if not NUMBA_AVAILABLE:
+            _predict_numpy(*args)
+        elif X.shape[0] >= PARALLEL_MIN_ROWS:
+            _predict_parallel(*args)
+        else:
+            _predict_serial(*args)
+        return out
+
+    def save(self, path):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left,
+                 right=self.right, value=self.value, roots=self.roots,
+                 n_features=self.n_features_in_, feature_names=np.array(self.feature_names or [], dtype=str))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        names = data['feature_names'].tolist() or None
+        return cls(data['feature'], data['threshold'], data['left'], data['right'],
+                   data['value'], data['roots'], int(data['n_features']), feature_names=names)
+
+
+def _breadth_first_order(left, right):
+    """Node ids of one tree in breadth-first order, so both children of a node end up adjacent."""
+    order = [0]
+    for node in order:
+        if left[node] != LEAF:
+            order.append(left[node])
+            order.append(right[node])
+    return np.array(order, dtype=np.int64)
+
+
+def export_forest(model):
+    """Flattens a fitted RandomForestRegressor (or any single-output tree ensemble) into a FlatForest.
+
+    Each tree is renumbered breadth-first and appended to the shared node arrays,
+    so ``right[n] == left[n] + 1`` for every internal node.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Only single-output regression forests can be flattened")
+        order = _breadth_first_order(tree.children_left, tree.children_right)
+        new_id = np.empty(tree.node_count, dtype=np.int64)
+        new_id[order] = np.arange(tree.node_count) + offset
+
+        left = tree.children_left[order]
+        right = tree.children_right[order]
+        is_leaf = left == LEAF
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature[order]))
+        thresholds.append(tree.threshold[order])
+        lefts.append(np.where(is_leaf, LEAF, new_id[left]))
+        rights.append(np.where(is_leaf, LEAF, new_id[right]))
+        values.append(tree.value[order, 0, 0])
+        offset += tree.node_count
+
+    return FlatForest(
+        np.concatenate(features), np.concatenate(thresholds),
+        np.concatenate(lefts), np.concatenate(rights),
+        np.concatenate(values), np.array(roots), model.n_features_in_,
+        feature_names=getattr(model, 'feature_names_in_', None),
+    )
+
+
+def compile_model(model):
+    """Returns a FlatForest for tree ensembles, or the model unchanged for anything else."""
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None or not hasattr(model, 'n_outputs_') or model.n_outputs_ != 1:
+        return model
+    if not all(hasattr(e, 'tree_') for e in estimators):
+        return model
+    # Classifiers average probabilities, not leaf values; only regressors are flattened
+    if hasattr(model, 'classes_'):
+        return model
+    return export_forest(model)
@@ -0,0 +1,128 @@
+import os
+import struct
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Append-only binary copy of karachi_aqi_history.csv.
+# A HEADER_SIZE-byte header (magic, format version, record size) followed by
+# fixed-width little-endian records of RECORD_DTYPE, oldest first. The row
+# count is derived from the file size, so appending new hours is a plain write
+# at the end: the header and existing rows are never rewritten.
+# Readers map the file with mmap; the datetime column is the index (records
+# are strictly increasing in time), so a range query is a binary search over
+# it plus a zero-copy slice of the mapping. Only the pages a query touches are
+# read from disk.
+
+STORE_PATH = os.path.join('data', 'karachi_aqi_history.bin')
+MAGIC = b'AQIHIST\x00'
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+POLLUTANTS = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
+RECORD_DTYPE = np.dtype([('datetime', '<M8[s]'), ('aqi', '<i8')] + [(col, '<f8') for col in POLLUTANTS])
+COLUMNS = list(RECORD_DTYPE.names)
+
+
+def _header():
+    return struct.pack('<8sII', MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize).ljust(HEADER_SIZE, b'\x00')
+
+
+def to_records(df):
+    """History rows (CSV columns) as a RECORD_DTYPE array sorted by time, one row per hour."""
+    df = df.assign(datetime=pd.to_datetime(df['datetime'])).sort_values('datetime', kind='stable')
+    df = df.drop_duplicates('datetime', keep='last')
+    records = np.empty(len(df), dtype=RECORD_DTYPE)
+    records['datetime'] = df['datetime'].to_numpy().astype('datetime64[s]')
+    for col in COLUMNS[1:]:
+        records[col] = df[col].to_numpy()
+    return records
+
+
+def write_store(df, path=STORE_PATH):
+    """Builds the store from a full history frame (backfill); atomic, replaces any existing file."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.history-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_header())
+            f.write(to_records(df).tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class HistoryStore:
+    """Read side of the store: a memory map of the records, re-mapped when the file grows."""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._size = None
+        self._records = None
+        self.refresh()
+
+    def refresh(self):
+        """Maps rows appended since the store was opened; cheap when the file hasn't grown."""
+        size = os.path.getsize(self.path)
+        if size == self._size:
+            return
+        with open(self.path, 'rb') as f:
+            magic, version, itemsize = struct.unpack('<8sII', f.read(16))
+        if magic != MAGIC or itemsize != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{self.path} is not a history store of this format")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"history store version {version} is newer than this reader ({FORMAT_VERSION})")
+        # A torn append (crash mid-write) leaves a partial record at the end; it's ignored
+        n_rows = (size - HEADER_SIZE) // itemsize
+        if n_rows == 0:
+            self._records = np.empty(0, dtype=RECORD_DTYPE)
+        else:
+            self._records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(n_rows,))
+        self._size = size
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def records(self):
+        return self._records
+
+    def _bisect(self, t):
+        # Binary search straight on the strided column of the mapping: O(log n) page reads
+        return int(np.searchsorted(self._records['datetime'], np.datetime64(pd.Timestamp(t).to_datetime64(), 's')))
+
+    def range(self, t0=None, t1=None):
+        """Records with t0 <= datetime < t1 (either bound optional), as a view of the mapping."""
+        start = 0 if t0 is None else self._bisect(t0)
+        stop = len(self._records) if t1 is None else self._bisect(t1)
+        return self._records[start:max(start, stop)]
+
+    def last_timestamp(self):
+        return pd.Timestamp(self._records['datetime'][-1]) if len(self._records) else None
+
+    def frame(self, t0=None, t1=None):
+        """Range query as a DataFrame with the CSV's columns (copies the selected rows)."""
+        frame = pd.DataFrame({col: np.asarray(self.range(t0, t1)[col]) for col in COLUMNS})
+        # Nanosecond datetimes, like the frames the rollups and features are built from elsewhere
+        return frame.astype({'datetime': 'datetime64[ns]'})
+
+
+def append_rows(df, path=STORE_PATH):
+    """Appends rows newer than the store's last hour (creating the store if needed); returns how many."""
+    records = to_records(df)
+    if not os.path.exists(path):
+        write_store(df, path)
+        return len(records)
+    last = HistoryStore(path).last_timestamp()
+    if last is not None:
+        records = records[records['datetime'] > np.datetime64(last.to_datetime64(), 's')]
+    if len(records):
+        with open(path, 'r+b') as f:
+            # Drop a torn record left by an interrupted append before writing after it
+            size = os.fstat(f.fileno()).st_size
+            f.truncate(HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(records.tobytes())
+    return len(records)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from contextlib import ExitStack
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+from parallel_training import (
+    CANDIDATES, DEFAULT_PARAMS, FIT_FUNCTIONS,
+    share_arrays, attach_arrays, release, threads_per_worker, worker_pool, _candidate_dir,
+)
+from backtest import prefix_digests, load_cache, save_cache
+
+# Successive-halving hyperparameter search for the candidates.
+# Every candidate gets N_CONFIGS configurations: its DEFAULT_PARAMS plus a fixed
+# random sample of SEARCH_SPACES. Rung 0 scores all of them on the cheapest
+# budget in BUDGETS, the best 1/ETA of each rung move on to the next one, and
+# the last rung runs at full budget. A budget b scales the resource of the
+# model (trees for the forest, epochs for the network) and fits on the most
+# recent fraction b of the rows, so rung 0 costs about 1/ETA^2 of a full fit.
+# Configurations are scored by their MAE on the VALIDATION_ROWS rows before the
+# search anchor, fitting on the rows before those. The anchor is the training
+# length rounded down to a multiple of SEARCH_STEP, so a week of daily runs sees
+# the same rows, and every evaluation is cached in SEARCH_CACHE_PATH by
+# candidate, params, budget and a hash of the rows up to the anchor.
+# Evaluations of all candidates in a rung run concurrently in one process pool
+# on a shared copy of the matrix. Past SEARCH_SECONDS no new evaluation starts
+# (running ones finish) and each candidate keeps the best configuration of the
+# highest rung in which every survivor was evaluated (no entry in the report
+# when it completed none).
+
+SEARCH_CACHE_PATH = os.path.join('data', 'search_cache.json')
+SEARCH_SPACES = {
+    'Ridge': {'alpha': [0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0, 300.0, 1000.0]},
+    'RandomForest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [3, 5, 8, 12],
+        'min_samples_leaf': [5, 10, 20, 40],
+        'max_features': ['sqrt', 0.5, 1.0],
+    },
+    'NeuralNetwork': {'units': [[16, 8], [32, 16], [64, 32]], 'dropout': [0.2, 0.4]},
+}
+N_CONFIGS = 9
+ETA = 3
+BUDGETS = [1 / 9, 1 / 3, 1.0]
+VALIDATION_ROWS = 24 * 14      # Two weeks scored per evaluation
+SEARCH_STEP = 24 * 7           # The anchor moves once a week
+MIN_FIT_ROWS = 24 * 7          # Smallest subsample a cheap budget fits on
+MIN_TREES = 10
+SEARCH_SECONDS = 300
+SEED = 42
+
+
+def search_config(candidates=CANDIDATES):
+    """Everything that decides which configurations the search tries (part of the training config)."""
+    return {
+        'spaces': {name: SEARCH_SPACES[name] for name in candidates},
+        'n_configs': N_CONFIGS, 'eta': ETA, 'budgets': [round(b, 6) for b in BUDGETS],
+        'validation_rows': VALIDATION_ROWS, 'step': SEARCH_STEP, 'seed': SEED,
+    }
+
+
+def sample_configs(name, n_configs=N_CONFIGS, seed=SEED):
+    """DEFAULT_PARAMS followed by distinct random draws from the candidate's grid (same draws every run)."""
+    space = SEARCH_SPACES[name]
+    keys = sorted(space)
+    rng = np.random.default_rng([seed, CANDIDATES.index(name)])
+    configs, seen = [DEFAULT_PARAMS[name]], {json.dumps(DEFAULT_PARAMS[name], sort_keys=True)}
+    grid_size = int(np.prod([len(space[k]) for k in keys]))
+    while len(configs) < min(n_configs, grid_size + 1):
+        draw = {k: space[k][rng.integers(len(space[k]))] for k in keys}
+        params = {**DEFAULT_PARAMS[name], **draw}
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(params)
+    return configs
+
+
+def budget_params(name, params, budget):
+    """The candidate's params with its resource (trees or epochs) scaled down to the budget."""
+    if name == 'RandomForest':
+        return {**params, 'n_estimators': max(MIN_TREES, int(round(params['n_estimators'] * budget)))}
+    if name == 'NeuralNetwork':
+        return {**params, 'epochs': max(1, int(round(params['epochs'] * budget)))}
+    return params
+
+
+def config_key(name, params, budget, feature_names, digest):
+    config = json.dumps({'name': name, 'params': params, 'budget': round(budget, 6), 'features': feature_names},
+                        sort_keys=True)
+    return hashlib.sha256(f"{config}|{digest}".encode()).hexdigest()
+
+
+def evaluate_config(name, params, specs, feature_names, fit_start, fit_end, threads, workdir):
+    """Worker entry point: fits one configuration on rows [fit_start, fit_end) and scores the validation window."""
+    handles, arrays = attach_arrays(specs)
+    try:
+        start = time.perf_counter()
+        X, y = arrays['X'], arrays['y']
+        X_fit, y_fit = X[fit_start:fit_end], y[fit_start:fit_end]
+        X_val, y_val = X[fit_end:], y[fit_end:]
+        _, predictions = FIT_FUNCTIONS[name](X_fit, y_fit, X_val, y_val, params, feature_names, threads, workdir)
+        return mean_absolute_error(y_val, predictions), time.perf_counter() - start
+    finally:
+        del arrays
+        release(handles)
+
+
+def search_hyperparameters(X, y, candidates=CANDIDATES, cache_path=SEARCH_CACHE_PATH, seconds=SEARCH_SECONDS,
+                           parallel=True, max_workers=None):
+    """Successive halving over each candidate's search space.
+
+    ``X`` and ``y`` are the training rows sorted by time. Returns
+    {'best': {name: params}, 'summary': {name: {...}}, 'trace': [...], ...};
+    'best' is empty when there are too few rows to search on.
+    """
+    start = time.perf_counter()
+    deadline = start + seconds
+    anchor = len(X) // SEARCH_STEP * SEARCH_STEP
+    fit_end = anchor - VALIDATION_ROWS
+    report = {'anchor_rows': anchor, 'validation_rows': VALIDATION_ROWS, 'budget_seconds': seconds,
+              'deadline_hit': False, 'best': {}, 'summary': {}, 'trace': []}
+    if fit_end < MIN_FIT_ROWS:
+        report['seconds'] = round(time.perf_counter() - start, 2)
+        return report
+
+    # 1. One shared matrix of the rows up to the anchor, and the hash the cache keys on
+    feature_names = list(X.columns) if isinstance(X, pd.DataFrame) else None
+    X_arr = np.ascontiguousarray(np.asarray(X, dtype=np.float64)[:anchor])
+    y_arr = np.ascontiguousarray(np.ravel(y).astype(np.float64)[:anchor])
+    digest = prefix_digests(np.column_stack([X_arr, y_arr]), [anchor])[anchor]
+    cache = load_cache(cache_path) if cache_path else {}
+
+    survivors = {name: sample_configs(name) for name in candidates}
+    scores = {name: [] for name in candidates}   # per rung: [(mae, params), ...]
+    trace = report['trace']
+    with ExitStack() as stack:
+        pool = specs = None
+        workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix='aqi-search-'))
+        for rung, budget in enumerate(BUDGETS):
+            fit_start = max(0, fit_end - max(MIN_FIT_ROWS, int(fit_end * budget)))
+
+            # 2. Cached evaluations first; the rest go to the pool
+            results, pending = {}, []
+            for name in candidates:
+                for i, params in enumerate(survivors[name]):
+                    key = config_key(name, params, budget, feature_names, digest)
+                    if key in cache:
+                        results[(name, i)] = (cache[key]['mae'], 0.0, True)
+                    else:
+                        pending.append((name, i, key))
+            if pending and time.perf_counter() >= deadline:
+                report['deadline_hit'] = True
+            elif pending:
+                if specs is None:
+                    handles, specs = share_arrays({'X': X_arr, 'y': y_arr})
+                    stack.callback(release, handles, unlink=True)
+                n_workers = max_workers or min(len(pending), os.cpu_count() or 1)
+                if parallel and n_workers > 1 and pool is None:
+                    pool, threads = stack.enter_context(worker_pool(n_workers))
+                elif pool is None:
+                    threads = threads_per_worker(1)
+
+                def task(name, i):
+                    return (name, budget_params(name, survivors[name][i], budget), specs, feature_names,
+                            fit_start, fit_end, threads, _candidate_dir(workdir, f"{name}-{rung}-{i}"))
+
+                if pool is not None:
+                    futures = {pool.submit(evaluate_config, *task(name, i)): (name, i, key) for name, i, key in pending}
+                    not_done = set(futures)
+                    while not_done:
+                        done, not_done = wait(not_done, timeout=max(0.0, deadline - time.perf_counter()),
+                                              return_when=FIRST_COMPLETED)
+                        for future in done:
+                            name, i, key = futures[future]
+                            mae, elapsed = future.result()
+                            results[(name, i)] = (mae, elapsed, False)
+                        if not done and not_done:
+                            # Past the deadline: drop what hasn't started, wait for what has
+                            report['deadline_hit'] = True
+                            not_done = {f for f in not_done if not f.cancel()}
+                            for future in not_done:
+                                name, i, key = futures[future]
+                                mae, elapsed = future.result()
+                                results[(name, i)] = (mae, elapsed, False)
+                            not_done = set()
+                else:
+                    for name, i, key in pending:
+                        if time.perf_counter() >= deadline:
+                            report['deadline_hit'] = True
+                            break
+                        mae, elapsed = evaluate_config(*task(name, i))
+                        results[(name, i)] = (mae, elapsed, False)
+                for name, i, key in pending:
+                    if (name, i) in results:
+                        cache[key] = {'candidate': name, 'anchor': anchor, 'mae': results[(name, i)][0]}
+
+            # 3. Record the rung and promote the best 1/ETA of each candidate
+            for name in candidates:
+                rung_scores = []
+                for i, params in enumerate(survivors[name]):
+                    if (name, i) not in results:
+                        continue
+                    mae, elapsed, cached = results[(name, i)]
+                    rung_scores.append((mae, params))
+                    trace.append({'candidate': name, 'rung': rung, 'budget': round(budget, 4), 'params': params,
+                                  'mae': round(mae, 4), 'seconds': round(elapsed, 2), 'cached': cached})
+                rung_scores.sort(key=lambda s: s[0])
+                # A rung the deadline cut short doesn't count: its best is only the best of what finished
+                if rung_scores and len(rung_scores) == len(survivors[name]):
+                    scores[name].append(rung_scores)
+                survivors[name] = [p for _, p in rung_scores[:max(1, len(survivors[name]) // ETA)]]
+            if report['deadline_hit']:
+                break
+
+    if cache_path:
+        # Evaluations on an older anchor will never be asked for again
+        save_cache({k: v for k, v in cache.items() if v['anchor'] >= anchor}, cache_path)
+
+    # 4. Each candidate's answer: the best configuration of the highest rung it completed
+    for name in candidates:
+        if not scores[name]:
+            continue
+        mae, params = scores[name][-1][0]
+        rows = [t for t in trace if t['candidate'] == name]
+        report['best'][name] = params
+        report['summary'][name] = {
+            'params': params, 'mae': round(mae, 4), 'rung': len(scores[name]) - 1,
+            'evaluated': sum(not t['cached'] for t in rows), 'cached': sum(t['cached'] for t in rows),
+        }
+    report['seconds'] = round(time.perf_counter() - start, 2)
+    return report
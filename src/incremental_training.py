@@ -0,0 +1,262 @@
+import os
+import json
+import glob
+import shutil
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+from parallel_training import EXTENSIONS
+
+# Incremental updates of the candidate models between full retrains.
+#   Ridge          running sufficient statistics: row count, feature/target
+#                  means and the centred cross-products sum (x - mx)(x - mx)^T
+#                  and sum (x - mx)(y - my), merged batch by batch (the pairwise
+#                  update of Chan et al.), so absorbing new rows costs
+#                  O(rows * p^2) and solving gives the Ridge a full fit on all
+#                  of them would
+#   RandomForest   warm start: ADD_TREES new trees are grown on the last
+#                  RECENT_ROWS rows and added to the ensemble; past
+#                  MAX_TREES_FACTOR x its fitted n_estimators the oldest trees
+#                  are dropped
+#   NeuralNetwork  fine-tuned from its last weights on the last RECENT_ROWS
+#                  rows for FINE_TUNE_EPOCHS at FINE_TUNE_LR
+# Every model is scored on the new rows before it learns from them (test, then
+# train); its metrics are the MAE/R2 over the last SCORE_ROWS of those scores.
+# A full retrain (training_pipeline.py) reseeds the state from the models it
+# fitted, with the hyperparameters its search chose. It stays the fallback:
+# every FULL_RETRAIN_EVERY updates, when the config or feature columns change,
+# when the state is missing, or when the selected model's rolling MAE drifts
+# past DRIFT_RATIO x its full-retrain MAE.
+# The state lives in STATE_DIR. Files carry the generation number that
+# state.json points to, and state.json is replaced last, so a crash mid-update
+# leaves the previous generation intact.
+
+STATE_DIR = os.path.join('.cache', 'incremental')
+FULL_RETRAIN_EVERY = 7          # Updates (days) between full retrains
+DRIFT_RATIO = 1.5
+RECENT_ROWS = 24 * 30           # Rows the new trees / the fine-tune see
+ADD_TREES = 5
+MAX_TREES_FACTOR = 2
+FINE_TUNE_EPOCHS = 5
+FINE_TUNE_LR = 1e-4
+SCORE_ROWS = 24 * 14
+
+
+class RidgeStats:
+    """Sufficient statistics of a Ridge fit with intercept, mergeable one batch at a time."""
+
+    def __init__(self, n_features):
+        self.n = 0
+        self.x_mean = np.zeros(n_features)
+        self.y_mean = 0.0
+        self.sxx = np.zeros((n_features, n_features))
+        self.sxy = np.zeros(n_features)
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        m = len(X)
+        if m == 0:
+            return self
+        bx, by = X.mean(axis=0), y.mean()
+        Xc, yc = X - bx, y - by
+        n = self.n + m
+        dx, dy = bx - self.x_mean, by - self.y_mean
+        # Centred batch products plus the correction for the shift between the two means
+        self.sxx += Xc.T @ Xc + np.outer(dx, dx) * (self.n * m / n)
+        self.sxy += Xc.T @ yc + dx * dy * (self.n * m / n)
+        self.x_mean += dx * (m / n)
+        self.y_mean += dy * (m / n)
+        self.n = n
+        return self
+
+    def solve(self, alpha):
+        """(coef, intercept) of Ridge(alpha) on every row absorbed so far."""
+        coef = np.linalg.solve(self.sxx + alpha * np.eye(len(self.sxy)), self.sxy)
+        return coef, self.y_mean - self.x_mean @ coef
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.savez(f, n=self.n, x_mean=self.x_mean, y_mean=self.y_mean, sxx=self.sxx, sxy=self.sxy)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            stats = cls(len(data['sxy']))
+            stats.n, stats.y_mean = int(data['n']), float(data['y_mean'])
+            stats.x_mean, stats.sxx, stats.sxy = data['x_mean'], data['sxx'], data['sxy']
+        return stats
+
+
+def ridge_model(stats, alpha, feature_names):
+    """A fitted sklearn Ridge built from the statistics (serves and pickles like any other)."""
+    from sklearn.linear_model import Ridge
+    model = Ridge(alpha=alpha)
+    model.coef_, model.intercept_ = stats.solve(alpha)
+    model.n_features_in_ = len(feature_names)
+    model.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    return model
+
+
+def grow_forest(model, X_recent, y_recent, add_trees=ADD_TREES, max_trees=None):
+    """Adds ``add_trees`` trees fitted on the recent rows; keeps at most ``max_trees`` (the newest)."""
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + add_trees)
+    model.fit(X_recent, y_recent)
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return model
+
+
+def fine_tune_network(path, X_recent, y_recent, params, out_path):
+    import tensorflow as tf
+    model = tf.keras.models.load_model(path, compile=False)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=FINE_TUNE_LR), loss='mse')
+    model.fit(X_recent, y_recent, epochs=FINE_TUNE_EPOCHS, batch_size=params['batch_size'], verbose=0)
+    model.save(out_path)
+    return out_path
+
+
+def _predict(name, model, X):
+    if name == 'NeuralNetwork':
+        import tensorflow as tf
+        return tf.keras.models.load_model(model, compile=False).predict(X.to_numpy(), verbose=0).ravel()
+    return model.predict(X)
+
+
+def _write_json_atomic(data, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.state-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class IncrementalState:
+    def __init__(self, root=STATE_DIR):
+        self.root = root
+        self.path = os.path.join(root, 'state.json')
+        try:
+            with open(self.path, 'r') as f:
+                self.meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.meta = None
+
+    def _file(self, name, generation):
+        ext = '.npz' if name == 'Ridge' else EXTENSIONS[name]
+        return os.path.join(self.root, f"{name}-{generation}{ext}")
+
+    def full_retrain_reason(self, config, feature_names):
+        """Why the next run has to be a full retrain, or None if an incremental update will do."""
+        meta = self.meta
+        if meta is None:
+            return "no incremental state"
+        if meta['config'] != json.loads(json.dumps(config)) or meta['feature_names'] != list(feature_names):
+            return "training config or features changed"
+        if any(not os.path.exists(self._file(name, meta['generation'])) for name in meta['candidates']):
+            return "incremental state incomplete"
+        if meta['updates'] >= FULL_RETRAIN_EVERY:
+            return f"{meta['updates']} incremental updates since the last one"
+        winner = meta['winner']
+        scores = meta['scores'][winner]
+        if scores['y'] and mean_absolute_error(scores['y'], scores['pred']) > DRIFT_RATIO * meta['full_mae'][winner]:
+            return f"{winner} drifted past {DRIFT_RATIO}x its full-retrain MAE"
+        return None
+
+    def _commit(self, meta):
+        """Publishes a generation: state.json last, then files of other generations are removed."""
+        _write_json_atomic(meta, self.path)
+        self.meta = meta
+        for path in glob.glob(os.path.join(self.root, '*-*.*')):
+            if not os.path.basename(path).rsplit('.', 1)[0].endswith(f"-{meta['generation']}"):
+                os.remove(path)
+
+    def seed(self, results, X_train, y_train, last_datetime, winner, backtest, config, search=None):
+        """State after a full retrain: the fitted models, which saw the rows up to ``last_datetime``."""
+        os.makedirs(self.root, exist_ok=True)
+        generation = (self.meta['generation'] if self.meta else 0) + 1
+        import joblib
+        for r in results:
+            path = self._file(r['Name'], generation)
+            if r['Name'] == 'Ridge':
+                RidgeStats(X_train.shape[1]).update(X_train, y_train).save(path)
+            elif r['Ext'] == '.h5':
+                shutil.copyfile(r['Model'], path)
+            else:
+                joblib.dump(r['Model'], path)
+        self._commit({
+            'generation': generation,
+            'candidates': [r['Name'] for r in results],
+            'config': json.loads(json.dumps(config)),
+            'params': {r['Name']: r['Params'] for r in results},
+            'search': search,
+            'feature_names': list(X_train.columns),
+            'last_datetime': pd.Timestamp(last_datetime).isoformat(),
+            'full_retrain_at': datetime.now().isoformat(),
+            'updates': 0,
+            'winner': winner,
+            'full_mae': {r['Name']: r['MAE'] for r in results},
+            'backtest': {name: {k: b[k] for k in ('mean_mae', 'var_mae', 'folds')} for name, b in backtest.items()},
+            'scores': {r['Name']: {'y': [], 'pred': []} for r in results},
+        })
+
+    def update(self, df):
+        """Scores every candidate on the rows it hasn't seen, then learns them.
+
+        Returns results shaped like train_candidates() (metrics over the rolling
+        score window), or None when there are no new rows.
+        """
+        import joblib
+        meta = self.meta
+        features = meta['feature_names']
+        df = df.sort_values('datetime', kind='stable')
+        new = df[pd.to_datetime(df['datetime']) > pd.Timestamp(meta['last_datetime'])]
+        if new.empty:
+            return None
+        recent = df.tail(max(RECENT_ROWS, len(new)))
+        X_new, y_new = new[features], new['aqi'].to_numpy(dtype=np.float64)
+        X_recent, y_recent = recent[features], recent['aqi'].to_numpy(dtype=np.float64)
+        generation = meta['generation'] + 1
+        scores, results = {}, []
+        for name in meta['candidates']:
+            start = time.perf_counter()
+            params = meta['params'][name]
+            old_path, path = self._file(name, meta['generation']), self._file(name, generation)
+            if name == 'Ridge':
+                stats = RidgeStats.load(old_path)
+                predictions = ridge_model(stats, params['alpha'], features).predict(X_new)
+                stats.update(X_new, y_new).save(path)
+                model = ridge_model(stats, params['alpha'], features)
+            elif name == 'RandomForest':
+                model = joblib.load(old_path)
+                predictions = model.predict(X_new)
+                max_trees = MAX_TREES_FACTOR * params['n_estimators']
+                grow_forest(model, X_recent, y_recent, max_trees=max_trees)
+                joblib.dump(model, path)
+            else:
+                predictions = _predict(name, old_path, X_new)
+                model = fine_tune_network(old_path, X_recent.to_numpy(), y_recent, params, path)
+            window = meta['scores'][name]
+            y = (window['y'] + y_new.tolist())[-SCORE_ROWS:]
+            pred = (window['pred'] + np.asarray(predictions, dtype=np.float64).tolist())[-SCORE_ROWS:]
+            scores[name] = {'y': y, 'pred': pred}
+            results.append({
+                "Name": name,
+                "MAE": mean_absolute_error(y, pred),
+                "R2": r2_score(y, pred),
+                "Model": model,
+                "Ext": EXTENSIONS[name],
+                "Params": params,
+                "FitSeconds": time.perf_counter() - start,
+                "NewRows": len(new),
+            })
+        self._commit({**meta, 'generation': generation, 'last_datetime': pd.Timestamp(df['datetime'].max()).isoformat(),
+                      'updates': meta['updates'] + 1, 'scores': scores})
+        return results
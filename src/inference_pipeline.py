@@ -1,49 +1,51 @@
-import hopsworks
-import joblib
 import pandas as pd
-import numpy as np
 import os
 import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from store_backend import connect
+from forecaster import recursive_forecast, monte_carlo_forecast
+from forest_runtime import compile_model
+from model_cache import ModelCache
+from features import FeatureState
+from rollups import build_rollups, save_rollups, VALUE_COLUMNS
+from snapshot import build_snapshot, write_snapshot
+from model_index import champion_model, MODEL_NAME, MODEL_INDEX_PATH, MIN_ACCEPTABLE_R2, MAX_REALISTIC_R2
 
 load_dotenv()
 
-def run_inference():
-    # 1. Login and get Model Registry
-    project = hopsworks.login(api_key_value=os.getenv('HOPSWORKS_TOKEN'))
-    mr = project.get_model_registry()
-    
-    # --- INDUSTRY THRESHOLD CHECK (REALISTIC ZONE) ---
-    MAX_REALISTIC_R2 = 0.92  # Anything higher is rejected as overfitted
-    MIN_ACCEPTABLE_R2 = 0.60  # Anything lower is rejected as underfitted
-    
-    print("🔎 Searching for a realistic, high-performing model...")
-    all_models = mr.get_models("karachi_aqi_model")
-    
-    # Filter models based on your industry constraints
-    realistic_models = [
-        m for m in all_models 
-        if MIN_ACCEPTABLE_R2 <= m.training_metrics.get('r2', 0) <= MAX_REALISTIC_R2
-    ]
 
-    if realistic_models:
-        # Pick the one with the highest R2 within the Realistic Zone
-        model_meta = max(realistic_models, key=lambda m: m.training_metrics.get('r2', 0))
-        print(f"✅ Selected Realistic Model: Version {model_meta.version} (R2: {model_meta.training_metrics.get('r2'):.4f})")
+def select_model(mr, name=MODEL_NAME, path=MODEL_INDEX_PATH, verbose=True):
+    """The registry version to serve: the champion the training job materialized in data/model_index.json.
+
+    ``verbose=False`` skips the selection report (the prediction service polls this every minute).
+    """
+    model_meta, champion = champion_model(mr, name, path)
+    if model_meta is None:
+        raise RuntimeError(f"No registered versions of {name} have an R2 to select on")
+    if not verbose:
+        return model_meta
+    if champion['reason'] == 'realistic':
+        print(f"✅ Selected Realistic Model: Version {model_meta.version} (R2: {champion['r2']:.4f})")
     else:
-        # Fallback: If no model is "realistic", we take the latest but print a heavy warning
-        model_meta = mr.get_best_model("karachi_aqi_model", "r2", "max")
+        # No model is "realistic": the best overall is served, with a heavy warning
         print(f"⚠️ WARNING: No models found in the Realistic Zone ({MIN_ACCEPTABLE_R2}-{MAX_REALISTIC_R2}).")
         print(f"Falling back to Best Overall Model: Version {model_meta.version}")
+    return model_meta
 
-    # 2. Download and Load Model
-    model_dir = model_meta.download()
-    model_path = os.path.join(model_dir, "best_model.joblib")
-    if not os.path.exists(model_path):
-         model_path = os.path.join(model_dir, "best_model.h5")
+def run_inference(n_paths=1000):
+    # 1. Login and get Model Registry
+    project = connect()
+    mr = project.get_model_registry()
     
-    model = joblib.load(model_path)
+    model_meta = select_model(mr)
+
+    # 2. Download and Load Model (skipped when this version is already in the local cache)
+    model_cache = ModelCache()
+    model = model_cache.load(model_meta)
+    print(f"📦 Model cache: {model_cache.stats}")
+    # Forests are flattened into contiguous node arrays and evaluated by a jitted kernel
+    predictor = compile_model(model)
 
     # Load existing model_info.json (has training comparison data) and merge
     model_info_path = os.path.join('data', 'model_info.json')
@@ -64,80 +66,46 @@ def run_inference():
     feature_view = fs.get_feature_view(name="karachi_aqi_view", version=1)
     fg = fs.get_feature_group(name="karachi_aqi_fg", version=1)
     
-    # Get latest data point for recursive start
-    df = fg.read().sort_values(by="datetime").tail(1)
+    # Get latest data point for recursive start; the forecast, lags and rollups only need the raw columns
+    history = fg.select(['datetime'] + VALUE_COLUMNS).read().sort_values(by="datetime")
+    df = history.tail(1)
+    # The first step's lag features come from the shared feature engine, like the hourly ingest
+    next_lags = FeatureState.from_frame(history).next_lags()
+    initial_change_rate = 0.0 if pd.isna(next_lags['aqi_change_rate']) else next_lags['aqi_change_rate']
     
-    current_aqi = df['aqi'].values[0]
     today = datetime.now().date()
     current_time = datetime.combine(today + timedelta(days=1), datetime.min.time())
-    last_pm25 = df['pm2_5'].values[0]
-    last_co = df['co'].values[0]
-    last_no2 = df['no2'].values[0]
     
-    # 4. Recursive Prediction Loop (72 Hours)
-    forecast_data = []
+    # 4. Recursive Prediction (72 Hours)
     training_feature_names = [f.name for f in feature_view.query.features 
                              if f.name not in ['datetime', 'aqi']]
 
-    previous_aqi = current_aqi
-    
-    for i in range(0, 72):
-        next_time = current_time + timedelta(hours=i)
-        
-        # Simulate realistic pollutant decay over 72 hours (gradual reduction)
-        decay_factor = 1.0 - (i * 0.008)  # 0.8% decay per hour
-        decay_factor = max(decay_factor, 0.3)  # Don't go below 30% of original
-        
-        # Apply rush hour multiplier for certain hours (peak pollution)
-        rush_hour_multiplier = 1.2 if next_time.hour in [7, 8, 9, 17, 18, 19] else 0.95
-        
-        adjusted_co = last_co * decay_factor * rush_hour_multiplier
-        adjusted_no2 = last_no2 * decay_factor * rush_hour_multiplier
-        adjusted_pm25 = last_pm25 * decay_factor * rush_hour_multiplier
-        adjusted_pm10 = df['pm10'].values[0] * decay_factor * rush_hour_multiplier
-        
-        # Calculate actual AQI change rate
-        aqi_change_rate = current_aqi - previous_aqi if i > 0 else 0
-        
-        input_data = {
-            'co': [adjusted_co], 'no2': [adjusted_no2], 'o3': [df['o3'].values[0] * decay_factor], 
-            'so2': [df['so2'].values[0] * decay_factor], 'pm2_5': [adjusted_pm25], 'pm10': [adjusted_pm10], 
-            'nh3': [df['nh3'].values[0] * decay_factor],
-            'hour': [next_time.hour],
-            'day_of_week': [next_time.weekday()],
-            'month': [next_time.month],
-            'aqi_lag_1h': [current_aqi],
-            'pm2_5_lag_1h': [adjusted_pm25],
-            'co_lag_1h': [adjusted_co],
-            'no2_lag_1h': [adjusted_no2],
-            'aqi_change_rate': [aqi_change_rate]
-        }
-        
-        X = pd.DataFrame(input_data)[training_feature_names]
-        prediction = model.predict(X)[0]
-        
-        # Add small stochastic noise to prevent unrealistic flatness
-        noise = np.random.normal(0, 0.3)
-        prediction = prediction + noise
-        prediction = max(0, min(prediction, 5))  # Clamp AQI to valid 0-5 range
-        
-        forecast_data.append({
-            'forecast_time': next_time,
-            'predicted_aqi': round(float(prediction), 2)
-        })
-        
-        # Recursive update
-        previous_aqi = current_aqi
-        current_aqi = prediction
+    # Exogenous features are precomputed as one matrix; only the AQI lag recursion is sequential
+    forecast_df = recursive_forecast(predictor, df.iloc[0], current_time, training_feature_names,
+                                     initial_change_rate=initial_change_rate)
+
+    # Probabilistic mode: advance n_paths noisy trajectories at once and publish p10/p50/p90 bands
+    if n_paths > 0:
+        print(f"🎲 Simulating {n_paths} forecast trajectories for uncertainty bands...")
+        bands = monte_carlo_forecast(predictor, df.iloc[0], current_time, training_feature_names, n_paths=n_paths,
+                                     initial_change_rate=initial_change_rate)
+        forecast_df = forecast_df.merge(bands, on='forecast_time')
+        model_info['forecast_paths'] = n_paths
 
     # 5. Save Artifacts
     os.makedirs('data', exist_ok=True)
-    pd.DataFrame(forecast_data).to_csv('data/aqi_forecast_72h.csv', index=False)
+    forecast_df.to_csv('data/aqi_forecast_72h.csv', index=False)
     
     with open(os.path.join('data', 'model_info.json'), 'w') as f:
         json.dump(model_info, f, indent=2)
 
-    return pd.DataFrame(forecast_data), model_info
+    # The dashboard reads forecast, its aggregates and model_info from one Arrow bundle
+    write_snapshot(build_snapshot(forecast_df, model_info))
+
+    # Hourly/daily/weekly/LTTB views of the history for the dashboard, rebuilt in full once a day
+    save_rollups(build_rollups(history))
+
+    return forecast_df, model_info
 
 if __name__ == "__main__":
     run_inference()
\ No newline at end of file
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import joblib
+
+# Local cache of model registry artifacts.
+# Artifacts are stored once per content hash under <root>/blobs and indexed by
+# "<name>@<version>", so a version that was already downloaded is never fetched
+# again. Deserialized models are memoized per content hash for the life of the
+# process. The on-disk size is bounded with least-recently-used eviction.
+
+CACHE_DIR = os.path.join('.cache', 'models')
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+ARTIFACT_NAMES = ('best_model.joblib', 'best_model.h5')
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_artifact(path):
+    """Deserializes a model artifact based on its extension."""
+    if path.endswith(('.h5', '.keras')):
+        from tensorflow.keras.models import load_model
+        return load_model(path)
+    return joblib.load(path)
+
+
+class ModelCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, loader=load_artifact):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.index_path = os.path.join(root, 'index.json')
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'memo_hits': 0}
+        self._memo = {}
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._index = self._read_index()
+
+    # --- index persistence -------------------------------------------------
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.index-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    # --- public API --------------------------------------------------------
+    def load(self, model_meta):
+        """Returns the deserialized model for a registry entry (anything with name, version and download())."""
+        key = f"{model_meta.name}@{model_meta.version}"
+        entry = self._index.get(key)
+        if entry is not None and os.path.exists(self._blob_path(entry)):
+            self.stats['hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            entry = self._fetch(model_meta)
+            self._index[key] = entry
+
+        entry['last_used'] = time.time()
+        self._evict(keep=key)
+        self._write_index()
+
+        if entry['sha256'] in self._memo:
+            self.stats['memo_hits'] += 1
+            return self._memo[entry['sha256']]
+        model = self._deserialize(key, entry, model_meta)
+        self._memo[entry['sha256']] = model
+        return model
+
+    def artifact_path(self, model_meta):
+        """Path of the cached artifact for a registry entry, or None when it is not cached."""
+        entry = self._index.get(f"{model_meta.name}@{model_meta.version}")
+        if entry is None or not os.path.exists(self._blob_path(entry)):
+            return None
+        return self._blob_path(entry)
+
+    def size_bytes(self):
+        blobs = {e['sha256']: e['size'] for e in self._index.values()}
+        return sum(blobs.values())
+
+    # --- internals ---------------------------------------------------------
+    def _blob_path(self, entry):
+        return os.path.join(self.blob_dir, entry['sha256'] + entry['ext'])
+
+    def _fetch(self, model_meta):
+        model_dir = model_meta.download()
+        for name in ARTIFACT_NAMES:
+            source = os.path.join(model_dir, name)
+            if os.path.exists(source):
+                break
+        else:
+            raise FileNotFoundError(f"No model artifact ({', '.join(ARTIFACT_NAMES)}) in {model_dir}")
+
+        sha = file_sha256(source)
+        entry = {'sha256': sha, 'ext': os.path.splitext(source)[1], 'size': os.path.getsize(source)}
+        blob = self._blob_path(entry)
+        if not os.path.exists(blob):
+            # Copy under a temp name first so a crash never leaves a truncated blob behind
+            tmp_path = blob + '.part'
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, blob)
+        return entry
+
+    def _deserialize(self, key, entry, model_meta):
+        blob = self._blob_path(entry)
+        if file_sha256(blob) != entry['sha256']:
+            # Corrupted on disk: drop it and fetch the artifact again
+            os.remove(blob)
+            self.stats['misses'] += 1
+            entry.update(self._fetch(model_meta))
+            self._index[key] = entry
+            self._write_index()
+            blob = self._blob_path(entry)
+        return self.loader(blob)
+
+    def _evict(self, keep):
+        # Least recently used entries go first; the entry being served is never evicted
+        for key in sorted(self._index, key=lambda k: self._index[k].get('last_used', 0)):
+            if self.size_bytes() <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._index.pop(key)
+            self.stats['evictions'] += 1
+            if not any(e['sha256'] == entry['sha256'] for e in self._index.values()):
+                self._memo.pop(entry['sha256'], None)
+                blob = self._blob_path(entry)
+                if os.path.exists(blob):
+                    os.remove(blob)
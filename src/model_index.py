@@ -0,0 +1,211 @@
+import os
+import json
+import tempfile
+from datetime import datetime
+
+# Materialized index of the registered model versions.
+# The training job is the registry's only writer, so it keeps data/model_index.json
+# next to it: every version with its training metrics, plus the champion, the
+# version the selection policy serves (highest R2 inside the realistic zone
+# MIN_ACCEPTABLE_R2..MAX_REALISTIC_R2, else the highest R2 overall). Inference
+# reads the champion pointer and fetches that one version instead of listing
+# every version ever registered and filtering them.
+#   {"name", "policy", "champion": {version, r2, reason}, "versions": {"<version>": {metrics, registered_at}}}
+# The champion is recomputed from the indexed metrics whenever a version is
+# added or removed, or when the policy in the file differs from this one.
+# A missing index, one for another model, or a champion the registry no longer
+# has is rebuilt from one full registry scan. Readers on other hosts (the
+# prediction service, the inference job) refresh it before reading: versions
+# registered after the newest indexed one are picked up by asking the registry
+# for the next version numbers, one request when nothing is new. A deleted or
+# failed version leaves a gap that stops that probe, so at most every
+# RELIST_SECONDS the refresh lists the registry instead (a rebuild counts as a
+# listing; the time is kept in the file as listed_at).
+# Retention: the champion and the KEEP_LATEST newest versions are kept;
+# prune_registry() deletes every other version from the registry and the index.
+
+MODEL_INDEX_PATH = os.path.join('data', 'model_index.json')
+MODEL_NAME = "karachi_aqi_model"
+
+# --- INDUSTRY THRESHOLD CHECK (REALISTIC ZONE) ---
+MAX_REALISTIC_R2 = 0.92  # Anything higher is rejected as overfitted
+MIN_ACCEPTABLE_R2 = 0.60  # Anything lower is rejected as underfitted
+KEEP_LATEST = 30          # Newest versions kept as rollback targets (about a month of daily runs)
+RELIST_SECONDS = 3600     # Longest a version registered past a gap can go unindexed
+
+
+def selection_policy():
+    return {'metric': 'r2', 'min': MIN_ACCEPTABLE_R2, 'max': MAX_REALISTIC_R2}
+
+
+def pick_champion(versions):
+    """{'version', 'r2', 'reason'} of the version the policy serves, or None when no version has an R2."""
+    ordered = sorted(versions, key=int)
+    r2 = {v: versions[v]['metrics'].get('r2') for v in ordered}
+    # Pick the one with the highest R2 within the Realistic Zone
+    realistic = [v for v in ordered if MIN_ACCEPTABLE_R2 <= (r2[v] or 0) <= MAX_REALISTIC_R2]
+    if realistic:
+        best, reason = max(realistic, key=lambda v: r2[v]), 'realistic'
+    else:
+        # Fallback: no model is "realistic", take the best overall
+        scored = [v for v in ordered if r2[v] is not None]
+        if not scored:
+            return None
+        best, reason = max(scored, key=lambda v: r2[v]), 'best_overall'
+    return {'version': int(best), 'r2': r2[best], 'reason': reason}
+
+
+def _write_json_atomic(data, path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.model-index-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelIndex:
+    def __init__(self, path=MODEL_INDEX_PATH, name=MODEL_NAME):
+        self.path = path
+        self.name = name
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        if data.get('name') != name:
+            data = {}
+        self.versions = data.get('versions', {})
+        self.champion = data.get('champion')
+        self.listed_at = data.get('listed_at')
+        if data and data.get('policy') != selection_policy():
+            self.champion = pick_champion(self.versions)
+
+    def __len__(self):
+        return len(self.versions)
+
+    def save(self):
+        self.champion = pick_champion(self.versions)
+        _write_json_atomic({'name': self.name, 'policy': selection_policy(), 'champion': self.champion,
+                            'updated': datetime.now().isoformat(), 'listed_at': self.listed_at,
+                            'versions': self.versions}, self.path)
+
+    def add(self, version, metrics):
+        self.versions[str(version)] = {'metrics': dict(metrics), 'registered_at': datetime.now().isoformat()}
+        self.save()
+
+    def rebuild(self, models):
+        """Replaces the index with ``models`` (registry entries: version + training_metrics)."""
+        self.versions = {str(m.version): {'metrics': dict(m.training_metrics or {}), 'registered_at': None}
+                         for m in models}
+        self.listed_at = datetime.now().isoformat()
+        self.save()
+
+    def prunable(self, keep_latest=KEEP_LATEST):
+        """Versions the retention policy drops: all but the champion and the ``keep_latest`` newest."""
+        ordered = sorted(self.versions, key=int)
+        keep = set(ordered[-keep_latest:]) if keep_latest else set()
+        if self.champion is not None:
+            keep.add(str(self.champion['version']))
+        return [int(v) for v in ordered if v not in keep]
+
+    def refresh(self, mr, relist_seconds=RELIST_SECONDS):
+        """Adds the versions registered since the index was written. Returns how many were added.
+
+        Probes the version numbers after the newest indexed one; when the last
+        listing is older than ``relist_seconds``, lists the registry instead so
+        versions past a gap are found too.
+        """
+        listed = datetime.fromisoformat(self.listed_at) if self.listed_at else None
+        if listed is None or (datetime.now() - listed).total_seconds() >= relist_seconds:
+            self.listed_at = datetime.now().isoformat()
+            new = [m for m in mr.get_models(self.name) if str(m.version) not in self.versions]
+            for model_meta in new:
+                self.versions[str(model_meta.version)] = {'metrics': dict(model_meta.training_metrics or {}),
+                                                          'registered_at': None}
+            self.save()
+            return len(new)
+        newest = max((int(v) for v in self.versions), default=0)
+        added = 0
+        while True:
+            try:
+                model_meta = mr.get_model(self.name, version=newest + 1)
+            except Exception:
+                model_meta = None
+            if model_meta is None:
+                break
+            newest += 1
+            added += 1
+            self.versions[str(newest)] = {'metrics': dict(model_meta.training_metrics or {}),
+                                          'registered_at': None}
+        if added:
+            self.save()
+        return added
+
+    def remove(self, versions):
+        for version in versions:
+            self.versions.pop(str(version), None)
+        self.save()
+
+
+def record_version(mr, version, metrics, name=MODEL_NAME, path=MODEL_INDEX_PATH):
+    """Adds a freshly registered version; the first call materializes the index from the registry."""
+    index = ModelIndex(path, name)
+    if len(index) == 0:
+        index.rebuild(mr.get_models(name))
+    if str(version) not in index.versions:
+        index.add(version, metrics)
+    return index
+
+
+def champion_model(mr, name=MODEL_NAME, path=MODEL_INDEX_PATH):
+    """The champion's registry entry: a check for newer versions plus one lookup, or a rebuild from a scan."""
+    index = ModelIndex(path, name)
+    if len(index) and index.refresh(mr):
+        print(f"➕ Indexed versions registered since the index was written; champion {index.champion['version']}")
+    if index.champion is not None:
+        try:
+            model_meta = mr.get_model(name, version=index.champion['version'])
+        except Exception:
+            model_meta = None
+        if model_meta is not None:
+            return model_meta, index.champion
+        print(f"⚠️ Indexed champion version {index.champion['version']} is no longer registered")
+    print("🔎 Rebuilding the model index from the registry...")
+    models = mr.get_models(name)
+    index.rebuild(models)
+    if index.champion is None:
+        return None, None
+    return next(m for m in models if int(m.version) == index.champion['version']), index.champion
+
+
+def prune_registry(name=MODEL_NAME, keep_latest=KEEP_LATEST, dry_run=False, path=MODEL_INDEX_PATH):
+    """Deletes the versions outside the retention policy from the registry and the index."""
+    from dotenv import load_dotenv
+    from store_backend import connect
+    load_dotenv()
+    mr = connect().get_model_registry()
+    index = ModelIndex(path, name)
+    if len(index) == 0:
+        index.rebuild(mr.get_models(name))
+    versions = index.prunable(keep_latest)
+    champion = index.champion['version'] if index.champion else None
+    print(f"🧹 {len(index)} versions indexed, champion {champion}; keeping the {keep_latest} newest: "
+          f"{len(versions)} to prune")
+    if dry_run or not versions:
+        return versions
+    deleted = []
+    for version in versions:
+        try:
+            mr.get_model(name, version=version).delete()
+            deleted.append(version)
+        except Exception as e:
+            print(f"   ⚠️ Version {version}: {e}")
+    index.remove(deleted)
+    print(f"✅ Pruned to {len(index)} versions")
+    return versions
@@ -0,0 +1,88 @@
+import time
+from dotenv import load_dotenv
+from store_backend import connect, missing_data_errors
+from features import FeatureState
+from openweather_client import OpenWeatherClient
+from city_ingest import load_cities, ingest, CITY_REGISTRY_PATH, MAX_CONCURRENCY
+from watermark import (
+    load_city_watermarks, save_city_watermarks, city_watermarks_from_frame, insert_with_city_watermarks,
+    CITY_WATERMARKS_PATH,
+)
+
+# Hourly ingest for every city in config/cities.json.
+# All locations are fetched concurrently, and the new rows for all cities go
+# into the feature group in one bulk insert keyed by (city, datetime).
+
+load_dotenv()
+FEATURE_GROUP = 'city_aqi_fg'
+
+
+def run_hourly_cities(registry_path=CITY_REGISTRY_PATH, watermark_path=CITY_WATERMARKS_PATH,
+                      concurrency=MAX_CONCURRENCY):
+    # 1. Connect to Hopsworks
+    try:
+        project = connect()
+        fs = project.get_feature_store()
+        fg = fs.get_or_create_feature_group(
+            name=FEATURE_GROUP,
+            version=1,
+            primary_key=['city', 'datetime'],
+            event_time='datetime',
+            online_enabled=True,
+            description="Hourly AQI data per city with time-based features and 1-hour lags"
+        )
+    except Exception as e:
+        print(f"❌ Failed to login to Hopsworks: {e}")
+        return
+
+    # 2. Per-city watermarks (bootstrapped from the feature group once)
+    cities = load_cities(registry_path)
+    watermarks = load_city_watermarks(watermark_path)
+    if not watermarks:
+        print("ℹ️ No city watermarks found. Bootstrapping them from the feature group...")
+        try:
+            history = fg.read()
+        except missing_data_errors():
+            history = None  # Feature group has no data yet; any other read failure propagates
+        watermarks = city_watermarks_from_frame(history)
+        if watermarks:
+            for city, group in history.groupby('city'):
+                watermarks[city]['state'] = FeatureState.from_frame(group).to_dict()
+            save_city_watermarks(watermarks, watermark_path)
+
+    # 3. Fetch all cities concurrently and build their features
+    print(f"🌍 Fetching {len(cities)} cities (up to {concurrency} at a time)...")
+    client = OpenWeatherClient(pool_size=concurrency)
+    start = time.perf_counter()
+    new_df, skipped, failed, states = ingest(cities, client, watermarks, concurrency)
+    print(f"   done in {time.perf_counter() - start:.2f}s: {len(new_df)} new, "
+          f"{len(skipped)} already ingested, {len(failed)} failed")
+    for key, error in failed:
+        print(f"❌ {key}: {error}")
+    client.log_latency()
+
+    if new_df.empty:
+        print("⏭️ No new data for any city. Skipping insert...")
+        return
+
+    # 4. ONE BULK INSERT WITH RETRY LOGIC; watermarks advance only after it succeeds
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            print(f"🚀 Inserting {len(new_df)} rows (Attempt {attempt + 1}/{max_retries})...")
+            insert_with_city_watermarks(fg, new_df, watermarks, watermark_path, states)
+            print(f"✅ Successfully inserted data for {len(new_df)} cities")
+            break
+        except Exception as e:
+            if attempt < max_retries - 1:
+                wait_time = (attempt + 1) * 30  # Wait 30s, then 60s
+                print(f"⚠️ Connection error occurred: {e}")
+                print(f"🔄 Retrying in {wait_time} seconds...")
+                time.sleep(wait_time)
+            else:
+                print("❌ All retry attempts failed. Please check Hopsworks service status.")
+                raise e
+
+
+if __name__ == "__main__":
+    run_hourly_cities()
@@ -0,0 +1,187 @@
+import time
+import threading
+from collections import OrderedDict
+import pandas as pd
+from watermark import load_watermark, load_city_watermarks
+
+# Online lookup of the latest feature vector per entity (a city; Karachi's own
+# feature group is the entity 'karachi').
+# OnlineFeatureStore keeps the newest row of each entity in memory, tagged with
+# its event hour. Entries expire after TTL (the hourly ingest writes a newer
+# row by then) and the table is LRU-bounded at MAX_ENTRIES. A miss or an
+# expired entry is read through from a source, and when that has nothing, from
+# a fallback:
+#   FeatureViewSource - key lookup in the Hopsworks online store (primary key
+#                       entry -> get_feature_vector), the latest hour per entity
+#                       taken from the ingest watermarks. A feature vector leaves
+#                       out the view's labels, so a view whose labels include a
+#                       column the caller needs (karachi_aqi_view: 'aqi') can't
+#                       serve it; such a source returns nothing and the fallback
+#                       answers
+#   OfflineSource     - the old path: one scan of the offline feature group,
+#                       newest row per entity
+#   LocalOnlineStore  - an in-process stand-in for the online store (same
+#                       insert / get_feature_vector surface) for benchmarks
+# The layer is read-through only: the ingests run in their own processes and
+# reach it through the online store, so a new hour is served within one TTL.
+
+KARACHI = 'karachi'
+TTL = 3600          # Seconds an entry is served before it's read through again
+MAX_ENTRIES = 10000
+
+
+class OnlineFeatureStore:
+    def __init__(self, source=None, fallback=None, ttl=TTL, max_entries=MAX_ENTRIES, clock=time.monotonic):
+        self.source = source
+        self.fallback = fallback
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'fallbacks': 0}
+        self._entries = OrderedDict()   # entity -> (expires_at, row)
+        self._lock = threading.Lock()
+
+    def get(self, entity, hour=None):
+        """Latest feature row of ``entity`` as a dict (or the row for ``hour``), None if no store has it."""
+        with self._lock:
+            entry = self._entries.get(entity)
+            if entry is not None:
+                expires_at, row = entry
+                if expires_at > self.clock() and (hour is None or row['datetime'] == hour):
+                    self._entries.move_to_end(entity)
+                    self.stats['hits'] += 1
+                    return row
+                self.stats['expired' if expires_at <= self.clock() else 'misses'] += 1
+            else:
+                self.stats['misses'] += 1
+        row = self.source.get(entity, hour) if self.source is not None else None
+        if row is None and self.fallback is not None:
+            row = self.fallback.get(entity, hour)
+            self.stats['fallbacks'] += row is not None
+        if row is not None:
+            self.put(entity, row)
+        return row
+
+    def put(self, entity, row):
+        """Stores ``row`` as the entity's latest unless a newer hour is already held."""
+        row = dict(row)
+        row['datetime'] = pd.Timestamp(row['datetime'])
+        with self._lock:
+            current = self._entries.get(entity)
+            if current is not None and current[1]['datetime'] > row['datetime'] and current[0] > self.clock():
+                return
+            self._entries[entity] = (self.clock() + self.ttl, row)
+            self._entries.move_to_end(entity)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def latest_hours(path=None, city_path=None):
+    """{entity: last committed hour} from the ingest watermarks."""
+    hours = {}
+    watermark = load_watermark(path) if path else load_watermark()
+    if watermark is not None:
+        hours[KARACHI] = pd.Timestamp(watermark['datetime'])
+    city_watermarks = load_city_watermarks(city_path) if city_path else load_city_watermarks()
+    for city, row in city_watermarks.items():
+        hours[city] = pd.Timestamp(row['datetime'])
+    return hours
+
+
+class FeatureViewSource:
+    """Primary-key lookups against an online store (a Hopsworks feature view, or LocalOnlineStore)."""
+
+    def __init__(self, feature_view, entity_col=None, latest=latest_hours, required=()):
+        self.feature_view = feature_view
+        self.entity_col = entity_col    # None for a single-entity group keyed by datetime alone
+        self.latest = latest
+        self.names = [f.name for f in feature_view.features if not getattr(f, 'label', False)]
+        self.missing = [c for c in required if c not in self.names]
+        if self.missing:
+            print(f"⚠️ Feature view {getattr(feature_view, 'name', '')} doesn't serve {', '.join(self.missing)} "
+                  f"(labels are left out of feature vectors); lookups go to the fallback")
+
+    def get(self, entity, hour=None):
+        if self.missing:
+            return None
+        if hour is None:
+            hour = self.latest().get(entity)
+            if hour is None:
+                return None
+        entry = {'datetime': hour} if self.entity_col is None else {self.entity_col: entity, 'datetime': hour}
+        try:
+            vector = self.feature_view.get_feature_vector(entry)
+        except Exception:
+            return None
+        if not vector:
+            return None
+        row = dict(zip(self.names, vector))
+        row.setdefault('datetime', hour)
+        return row
+
+
+class OfflineSource:
+    """The offline scan: the feature group is read at most once per ``max_age`` seconds, newest row per entity kept."""
+
+    def __init__(self, feature_group, max_age=TTL, clock=time.monotonic):
+        self.feature_group = feature_group
+        self.max_age = max_age
+        self.clock = clock
+        self._latest = None
+        self._read_at = None
+
+    def get(self, entity, hour=None):
+        if self._latest is None or self.clock() - self._read_at > self.max_age:
+            self._read_at = self.clock()
+            df = self.feature_group.read().sort_values('datetime', kind='stable')
+            if 'city' in df.columns:
+                self._latest = {city: g for city, g in df.groupby('city')}
+            else:
+                self._latest = {KARACHI: df}
+        rows = self._latest.get(entity)
+        if rows is None or rows.empty:
+            return None
+        if hour is not None:
+            rows = rows[pd.to_datetime(rows['datetime']) == pd.Timestamp(hour)]
+            if rows.empty:
+                return None
+        return rows.iloc[-1].to_dict()
+
+
+class _Feature:
+    def __init__(self, name, label=False):
+        self.name = name
+        self.label = label
+
+
+class LocalOnlineStore:
+    """In-process stand-in for a Hopsworks online feature view: one row per primary key.
+
+    Like get_feature_vector, lookups return the non-label columns only. ``latency``
+    (seconds) is slept on every lookup to stand in for the network round trip.
+    """
+
+    def __init__(self, columns, primary_key=('datetime',), labels=(), latency=0.0):
+        self.features = [_Feature(c, c in labels) for c in columns]
+        self.primary_key = list(primary_key)
+        self.latency = latency
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def insert(self, df):
+        names = [f.name for f in self.features if not f.label]
+        with self._lock:
+            for row in df.to_dict('records'):
+                key = tuple(pd.Timestamp(row[k]) if k == 'datetime' else row[k] for k in self.primary_key)
+                self._rows[key] = [row[n] for n in names]
+
+    def get_feature_vector(self, entry):
+        if self.latency:
+            time.sleep(self.latency)
+        key = tuple(pd.Timestamp(entry[k]) if k == 'datetime' else entry[k] for k in self.primary_key)
+        with self._lock:
+            return self._rows.get(key)
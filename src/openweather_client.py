@@ -0,0 +1,171 @@
+import os
+import time
+import random
+import threading
+from collections import defaultdict, deque
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# One pooled HTTP client for every OpenWeather (and dashboard) call.
+# A single requests.Session keeps connections alive across calls; every
+# request gets connect/read timeouts and jittered exponential backoff on
+# throttling, 5xx and connection errors; per-endpoint latency is recorded.
+# Endpoints that only change hourly are cached for the current hour window.
+
+load_dotenv()
+BASE_URL = os.getenv('OPENWEATHER_BASE_URL', 'http://api.openweathermap.org/data/2.5')
+
+CONNECT_TIMEOUT = 5       # Seconds to establish a connection
+READ_TIMEOUT = 30         # Seconds to wait for the response
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5        # Seconds; attempt n sleeps uniform(0, BACKOFF_BASE * 2**n)
+BACKOFF_CAP = 10
+POOL_SIZE = 10            # Keep-alive connections per host
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CACHE_WINDOW = 3600       # /air_pollution and /air_pollution/forecast update hourly
+LATENCY_SAMPLES = 1000    # Per-endpoint latencies kept for the percentiles
+
+
+class OpenWeatherError(Exception):
+    """Non-retryable HTTP status, or a retryable one that outlived MAX_RETRIES."""
+
+    def __init__(self, status_code, text):
+        super().__init__(f"{status_code} - {text}")
+        self.status_code = status_code
+
+
+class HTTPClient:
+    """Keep-alive session with timeouts, jittered retry and per-endpoint latency stats.
+
+    ``limiter`` is an optional object with a ``wait()`` method, called before
+    every attempt (retries included), e.g. the backfill's rate limiter.
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES,
+                 pool_size=POOL_SIZE, limiter=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.limiter = limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, endpoint=None, headers=None):
+        """GET with retries. Returns the Response (304 included); raises OpenWeatherError for failing statuses."""
+        endpoint = endpoint or url
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.wait()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            self._record(endpoint, time.perf_counter() - start, retry=attempt > 0)
+
+            if response is not None:
+                if response.status_code < 400:
+                    return response
+                error = OpenWeatherError(response.status_code, response.text)
+                if response.status_code not in RETRY_STATUSES:
+                    self._count('errors')
+                    raise error
+            if attempt < self.max_retries:
+                time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+        self._count('errors')
+        raise error
+
+    def _record(self, endpoint, seconds, retry):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            self.counters['requests'] += 1
+            if retry:
+                self.counters['retries'] += 1
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        """Counters plus per-endpoint latency summary in milliseconds."""
+        with self.lock:
+            endpoints = {
+                endpoint: {
+                    'calls': len(samples),
+                    'mean_ms': float(np.mean(samples)) * 1e3,
+                    'p50_ms': float(np.percentile(samples, 50)) * 1e3,
+                    'p95_ms': float(np.percentile(samples, 95)) * 1e3,
+                    'max_ms': float(np.max(samples)) * 1e3,
+                }
+                for endpoint, samples in self.latencies.items() if samples
+            }
+            return {**{k: 0 for k in ('requests', 'retries', 'errors', 'cache_hits')},
+                    **self.counters, 'endpoints': endpoints}
+
+    def log_latency(self):
+        stats = self.stats()
+        for endpoint, s in stats['endpoints'].items():
+            print(f"📶 {endpoint}: {s['calls']} calls, p50 {s['p50_ms']:.0f} ms, "
+                  f"p95 {s['p95_ms']:.0f} ms, max {s['max_ms']:.0f} ms")
+        if stats['retries'] or stats['cache_hits']:
+            print(f"   {stats['retries']} retries, {stats['cache_hits']} cache hits")
+
+
+class OpenWeatherClient(HTTPClient):
+    """Air-pollution API on top of HTTPClient; current and forecast are cached per hour window."""
+
+    def __init__(self, token=None, base_url=BASE_URL, cache_window=CACHE_WINDOW, **kwargs):
+        super().__init__(**kwargs)
+        self.token = token if token is not None else os.getenv('OPENWEATHER_TOKEN')
+        self.base_url = base_url
+        self.cache_window = cache_window
+        self.cache = {}
+
+    def _get_json(self, path, **params):
+        response = self.get(f"{self.base_url}{path}", params={**params, 'appid': self.token}, endpoint=path)
+        return response.json()
+
+    def _cached(self, path, lat, lon):
+        window = int(time.time() // self.cache_window) if self.cache_window else None
+        key = (path, lat, lon)
+        with self.lock:
+            cached = self.cache.get(key)
+            if window is not None and cached is not None and cached[0] == window:
+                self.counters['cache_hits'] += 1
+                return cached[1]
+        payload = self._get_json(path, lat=lat, lon=lon)
+        with self.lock:
+            self.cache[key] = (window, payload)
+        return payload
+
+    def current(self, lat, lon):
+        """/air_pollution: the latest hourly observation."""
+        return self._cached('/air_pollution', lat, lon)
+
+    def forecast(self, lat, lon):
+        """/air_pollution/forecast: hourly forecast for the next days."""
+        return self._cached('/air_pollution/forecast', lat, lon)
+
+    def history(self, lat, lon, start, end):
+        """/air_pollution/history between two unix timestamps (inclusive); never cached."""
+        return self._get_json('/air_pollution/history', lat=lat, lon=lon, start=start, end=end)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide OpenWeatherClient, so every caller shares one connection pool and cache."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OpenWeatherClient()
+        return _default_client
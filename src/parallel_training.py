@@ -0,0 +1,235 @@
+import os
+import shutil
+import tempfile
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+
+# Concurrent training of the candidate models.
+# The train/test matrices are copied once into shared memory as contiguous
+# float64 arrays; each worker attaches to them without copying and fits one
+# candidate. Thread pools inside every worker are capped to its share of the
+# cores so BLAS, sklearn and TensorFlow don't oversubscribe the machine.
+
+CANDIDATES = ['Ridge', 'RandomForest', 'NeuralNetwork']
+# Hyperparameters per candidate (AGGRESSIVE REGULARIZATION); also part of backtest cache keys
+DEFAULT_PARAMS = {
+    'Ridge': {'alpha': 50.0},
+    # Fewer trees and shallower depth force the model to learn general patterns
+    'RandomForest': {'n_estimators': 50, 'max_depth': 5, 'min_samples_leaf': 20, 'max_features': 'sqrt'},
+    # High dropout to prevent memorization
+    'NeuralNetwork': {'units': [16, 8], 'dropout': 0.4, 'epochs': 50, 'batch_size': 32, 'patience': 3},
+}
+EXTENSIONS = {'Ridge': '.joblib', 'RandomForest': '.joblib', 'NeuralNetwork': '.h5'}
+
+THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+    'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS',
+]
+
+
+# --- shared memory ---------------------------------------------------------
+def share_arrays(arrays):
+    """Copies each array once into shared memory. Returns (handles, specs); keep the handles alive."""
+    handles, specs = [], {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        handles.append(shm)
+        specs[key] = (shm.name, array.shape, array.dtype.str)
+    return handles, specs
+
+
+def attach_arrays(specs):
+    """Maps shared-memory specs back to ndarray views (no copy). Returns (handles, arrays)."""
+    handles, arrays = [], {}
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        handles.append(shm)
+        arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return handles, arrays
+
+
+def release(handles, unlink=False):
+    for shm in handles:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+# --- thread caps -----------------------------------------------------------
+def threads_per_worker(n_workers):
+    return max(1, (os.cpu_count() or 1) // n_workers)
+
+
+def _init_worker(threads):
+    # The environment is set before the worker imports numpy/TF (see worker_pool);
+    # threadpoolctl additionally caps BLAS/OpenMP pools that are already loaded.
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+
+
+@contextmanager
+def worker_pool(n_workers):
+    """Spawn-based process pool whose workers are capped to cpu_count // n_workers threads each.
+
+    Yields (pool, threads). Spawned workers inherit the environment at start-up,
+    before they import numpy/TF, so the caps are exported for the pool's lifetime.
+    """
+    threads = threads_per_worker(n_workers)
+    saved_env = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(threads,)) as pool:
+            yield pool, threads
+    finally:
+        for var, value in saved_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+# --- candidates ------------------------------------------------------------
+def _fit_ridge(X_train, y_train, X_test, y_test, params, feature_names, threads, workdir):
+    from sklearn.linear_model import Ridge
+    model = Ridge(alpha=params['alpha']).fit(pd.DataFrame(X_train, columns=feature_names, copy=False), y_train)
+    return model, model.predict(pd.DataFrame(X_test, columns=feature_names, copy=False))
+
+
+def _fit_random_forest(X_train, y_train, X_test, y_test, params, feature_names, threads, workdir):
+    from sklearn.ensemble import RandomForestRegressor
+    model = RandomForestRegressor(**params, random_state=42, n_jobs=threads).fit(
+        pd.DataFrame(X_train, columns=feature_names, copy=False), y_train)
+    return model, model.predict(pd.DataFrame(X_test, columns=feature_names, copy=False))
+
+
+def _fit_neural_network(X_train, y_train, X_test, y_test, params, feature_names, threads, workdir):
+    import tensorflow as tf
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout
+    from tensorflow.keras.callbacks import EarlyStopping
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+    except RuntimeError:
+        pass  # TF was already initialized in this process (sequential mode)
+
+    input_dim = X_train.shape[1]
+    first, *rest = params['units']
+    layers = [Dense(first, activation='relu', input_shape=(input_dim,)), Dropout(params['dropout'])]
+    layers += [Dense(units, activation='relu') for units in rest]
+    model = Sequential(layers + [Dense(1)])
+    model.compile(optimizer='adam', loss='mse')
+
+    early_stop = EarlyStopping(monitor='val_loss', patience=params['patience'], restore_best_weights=True)
+    model.fit(
+        X_train, y_train,
+        validation_data=(X_test, y_test),
+        epochs=params['epochs'],
+        batch_size=params['batch_size'],
+        callbacks=[early_stop],
+        verbose=0
+    )
+    predictions = model.predict(X_test, verbose=0).flatten()
+
+    # Keras models don't travel well between processes; hand back a saved file instead
+    path = os.path.join(workdir, 'best_model.h5')
+    model.save(path)
+    return path, predictions
+
+
+TRAINING_MESSAGES = {
+    'Ridge': "🏃 Training Ridge (Alpha={alpha})...",
+    'RandomForest': "🌲 Training Highly Regularized Random Forest...",
+    'NeuralNetwork': "🧠 Training Neural Network (Simple Architecture)...",
+}
+
+FIT_FUNCTIONS = {
+    'Ridge': _fit_ridge,
+    'RandomForest': _fit_random_forest,
+    'NeuralNetwork': _fit_neural_network,
+}
+
+
+def fit_candidate(name, specs, feature_names, threads, workdir, params=None):
+    """Worker entry point: fits one candidate on the shared matrices and scores it."""
+    handles, arrays = attach_arrays(specs)
+    try:
+        start = time.perf_counter()
+        y_test = arrays['y_test']
+        params = params if params is not None else DEFAULT_PARAMS[name]
+        print(TRAINING_MESSAGES[name].format(**params))
+        model, predictions = FIT_FUNCTIONS[name](arrays['X_train'], arrays['y_train'], arrays['X_test'], y_test,
+                                                 params, feature_names, threads, workdir)
+        return {
+            "Name": name,
+            "MAE": mean_absolute_error(y_test, predictions),
+            "R2": r2_score(y_test, predictions),
+            "Model": model,
+            "Ext": EXTENSIONS[name],
+            "Params": params,
+            "FitSeconds": time.perf_counter() - start,
+        }
+    finally:
+        del arrays
+        release(handles)
+
+
+def train_candidates(X_train, y_train, X_test, y_test, candidates=CANDIDATES, parallel=True, workdir=None,
+                     params=None):
+    """Fits every candidate and returns their results in ``candidates`` order.
+
+    With ``parallel=True`` each candidate runs in its own spawned process; the
+    wall-clock time is then bounded by the slowest candidate instead of the sum.
+    The NeuralNetwork result's "Model" is the path of its saved .h5 file.
+    ``params`` optionally overrides DEFAULT_PARAMS per candidate name.
+    """
+    params = params or {}
+    feature_names = list(X_train.columns) if isinstance(X_train, pd.DataFrame) else None
+    workdir = workdir or tempfile.mkdtemp(prefix='aqi-training-')
+    handles, specs = share_arrays({
+        'X_train': X_train, 'y_train': np.ravel(y_train),
+        'X_test': X_test, 'y_test': np.ravel(y_test),
+    })
+    try:
+        if not parallel:
+            threads = threads_per_worker(1)
+            return [fit_candidate(name, specs, feature_names, threads, _candidate_dir(workdir, name),
+                                  params.get(name))
+                    for name in candidates]
+
+        with worker_pool(len(candidates)) as (pool, threads):
+            futures = [pool.submit(fit_candidate, name, specs, feature_names, threads,
+                                   _candidate_dir(workdir, name), params.get(name))
+                       for name in candidates]
+            return [f.result() for f in futures]
+    finally:
+        release(handles, unlink=True)
+
+
+def save_model(result, path):
+    """Writes a candidate's model to ``path`` (joblib for sklearn, the saved .h5 for Keras)."""
+    if result['Ext'] == '.h5':
+        shutil.copyfile(result['Model'], path)
+    else:
+        import joblib
+        joblib.dump(result['Model'], path)
+
+
+def _candidate_dir(workdir, name):
+    path = os.path.join(workdir, name)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+import joblib
+from dotenv import load_dotenv
+from forecaster import build_exogenous, make_predictor, AQI_MIN, AQI_MAX
+from forest_runtime import compile_model
+from features import FeatureState
+from watermark import load_watermark
+from openweather_client import get_client, OpenWeatherError
+from store_backend import connect
+from online_store import OnlineFeatureStore, FeatureViewSource, OfflineSource, KARACHI
+
+# Long-running next-hour prediction service (the warm replacement for running
+# predict_next_hour.py once per query).
+#   - The selected model is loaded once, flattened by forest_runtime and kept in
+#     memory; a watcher polls its source and swaps a new version in atomically
+#     after it has been loaded and warmed up.
+#   - Requests are queued and one batcher thread merges whatever arrives within
+#     BATCH_WINDOW (up to MAX_BATCH rows) into a single predict call.
+#   - The latest observation is fetched once per hour window and shared by every
+#     request for that hour; concurrent first requests wait on the one fetch.
+#     With an online feature store it's the latest ingested row instead, looked
+#     up in memory on every request (OpenWeather only when the store has none).
+# In-process: PredictionService.predict() / submit(). Over HTTP: GET /predict
+# (optional ?at=<ISO hour>) and GET /health.
+
+load_dotenv()
+LAT, LON = 24.8607, 67.0011
+LOCAL_MODEL_PATH = os.path.join('models', 'best_model.joblib')
+REGISTRY_MODEL = 'karachi_aqi_model'
+ONLINE_VIEW = 'karachi_aqi_online_view'   # All of karachi_aqi_fg, no labels
+HOST, PORT = '127.0.0.1', 8000
+
+BATCH_WINDOW = 0.002      # Seconds the batcher waits for more requests after the first
+MAX_BATCH = 256
+OBSERVATION_WINDOW = 3600  # The air-pollution observation updates hourly
+MODEL_POLL = 60           # Seconds between checks for a new model version
+ONLINE_TTL = 300          # A new hourly row reaches the service within this many seconds
+# Online row columns observation() reads
+OBSERVATION_FEATURES = ['aqi', 'aqi_lag_1h']
+# Feature order when the model doesn't carry its own feature names
+DEFAULT_FEATURES = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3', 'hour', 'day_of_week', 'month',
+                    'aqi_lag_1h', 'pm2_5_lag_1h', 'co_lag_1h', 'no2_lag_1h', 'aqi_change_rate']
+
+
+class LocalModelSource:
+    """A joblib file on disk; a new version is a new mtime/size (e.g. after a redeploy or git pull)."""
+
+    def __init__(self, path=LOCAL_MODEL_PATH):
+        self.path = path
+
+    def latest(self):
+        st = os.stat(self.path)
+        return f"{os.path.basename(self.path)}@{st.st_mtime_ns}:{st.st_size}", self.path
+
+    def load(self, handle):
+        return joblib.load(handle)
+
+
+class RegistryModelSource:
+    """The registry version inference_pipeline would select, loaded through the ModelCache."""
+
+    def __init__(self, name=REGISTRY_MODEL):
+        from model_cache import ModelCache
+        self.project = connect()
+        self.mr = self.project.get_model_registry()
+        self.name = name
+        self.cache = ModelCache()
+
+    def latest(self):
+        from inference_pipeline import select_model
+        model_meta = select_model(self.mr, self.name, verbose=False)
+        return f"{self.name}@{model_meta.version}", model_meta
+
+    def load(self, handle):
+        return self.cache.load(handle)
+
+    def online_store(self):
+        """Latest karachi_aqi_fg row per lookup: online store by key, the offline group if that misses."""
+        fs = self.project.get_feature_store()
+        fg = fs.get_feature_group(name="karachi_aqi_fg", version=1)
+        # karachi_aqi_view has 'aqi' as its label, which feature vectors leave out;
+        # the service needs the observed AQI, so it reads a view without labels
+        try:
+            view = fs.get_feature_view(name=ONLINE_VIEW, version=1)
+        except Exception:
+            view = fs.create_feature_view(name=ONLINE_VIEW, query=fg.select_all(), version=1)
+        source = FeatureViewSource(view, required=OBSERVATION_FEATURES)
+        return OnlineFeatureStore(source, OfflineSource(fg), ttl=ONLINE_TTL)
+
+
+def fetch_observation(lat=LAT, lon=LON):
+    """The latest OpenWeather observation as a feature-pipeline row (datetime, aqi, pollutants)."""
+    response = get_client().current(lat, lon)['list'][0]
+    return {
+        'datetime': datetime.fromtimestamp(response['dt']),
+        'aqi': int(response['main']['aqi']),
+        **{col: float(response['components'][col]) for col in ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']},
+    }
+
+
+class ServedModel:
+    """One loaded model version: its predict function and the feature order it expects."""
+
+    def __init__(self, version, model):
+        names = getattr(model, 'feature_names_in_', None)
+        self.version = version
+        self.name = type(model).__name__
+        self.feature_names = [str(n) for n in names] if names is not None else DEFAULT_FEATURES
+        self.predict = make_predictor(compile_model(model))
+        # First call compiles the jitted forest kernel; pay it here, not on a request
+        self.predict(np.zeros((1, len(self.feature_names))))
+
+
+class PredictionService:
+    def __init__(self, source=None, observe=fetch_observation, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH,
+                 model_poll=MODEL_POLL, observation_window=OBSERVATION_WINDOW, features=None):
+        self.source = source or LocalModelSource()
+        self.observe = observe
+        self.features = features          # OnlineFeatureStore, or None to fetch from OpenWeather
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.model_poll = model_poll
+        self.observation_window = observation_window
+        self.stats = {'requests': 0, 'batches': 0, 'max_batch': 0, 'observation_fetches': 0, 'model_swaps': 0,
+                      'errors': 0}
+        self._queue = queue.Queue()
+        self._observation = None          # (window, observation, lags)
+        self._observation_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._model = None
+        self.reload()
+        self._threads = [threading.Thread(target=self._batch_loop, name='batcher', daemon=True),
+                         threading.Thread(target=self._watch_loop, name='model-watcher', daemon=True)]
+        for t in self._threads:
+            t.start()
+
+    # --- model --------------------------------------------------------------
+    @property
+    def model(self):
+        return self._model
+
+    def reload(self):
+        """Loads the source's latest version if it differs from the one being served; returns True on a swap."""
+        version, handle = self.source.latest()
+        if self._model is not None and version == self._model.version:
+            return False
+        served = ServedModel(version, self.source.load(handle))
+        self.stats['model_swaps'] += self._model is not None
+        # In-flight batches keep the model they started with; the next one picks this up
+        self._model = served
+        print(f"🔁 Serving {served.name} {version}")
+        return True
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.model_poll):
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the current version; try again next poll
+                print(f"⚠️ Model reload failed: {e}")
+
+    # --- observation ----------------------------------------------------------
+    def observation(self):
+        """(observation, lags) for the current hour window, fetched once and shared by every request."""
+        if self.features is not None:
+            row = self.features.get(KARACHI)
+            if row is not None:
+                # The ingested row's own lag is the hour before it, which gives the next hour's change rate
+                return row, {'aqi_lag_1h': float(row['aqi']),
+                             'aqi_change_rate': float(row['aqi']) - float(row['aqi_lag_1h'])}
+        window = int(time.time() // self.observation_window)
+        cached = self._observation
+        if cached is not None and cached[0] == window:
+            return cached[1], cached[2]
+        with self._observation_lock:
+            cached = self._observation
+            if cached is None or cached[0] != window:
+                obs = self.observe()
+                self.stats['observation_fetches'] += 1
+                # aqi_change_rate needs the hour before the observation: take it from the
+                # streaming state stored with the watermark, as the inference pipeline does
+                watermark = load_watermark()
+                state = FeatureState.from_watermark(watermark)
+                # The hourly ingest may already have committed this observation
+                ingested = watermark is not None and pd.Timestamp(watermark['datetime']) >= obs['datetime']
+                last = state.lag('aqi', 2 if ingested else 1)
+                lags = {'aqi_lag_1h': float(obs['aqi']),
+                        'aqi_change_rate': 0.0 if np.isnan(last) else float(obs['aqi']) - last}
+                cached = self._observation = (window, obs, lags)
+        return cached[1], cached[2]
+
+    # --- requests -------------------------------------------------------------
+    def submit(self, at=None):
+        """Queues a prediction for the hour starting at ``at`` (default: the hour after the observation).
+
+        Returns a Future resolving to a dict with forecast_time, predicted_aqi and model_version.
+        """
+        future = Future()
+        try:
+            obs, lags = self.observation()
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        if at is None:
+            at = obs['datetime'].replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        self._queue.put((at, obs, lags, future))
+        return future
+
+    def predict(self, at=None, timeout=None):
+        return self.submit(at).result(timeout)
+
+    def _batch_loop(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        served = self._model
+        try:
+            names = served.feature_names
+            rows = {}
+            X = np.empty((len(batch), len(names)), dtype=np.float64)
+            for i, (at, obs, lags, _) in enumerate(batch):
+                # Requests for the same hour share one feature row
+                key = (at, id(obs))
+                if key not in rows:
+                    row = build_exogenous(obs, at, names, horizon=1)[0][0]
+                    for name, value in lags.items():
+                        if name in names:
+                            row[names.index(name)] = value
+                    rows[key] = row
+                X[i] = rows[key]
+            predictions = np.clip(served.predict(X), AQI_MIN, AQI_MAX)
+        except Exception as e:
+            self.stats['errors'] += len(batch)
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        self.stats['requests'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+        for (at, obs, _, future), prediction in zip(batch, predictions):
+            future.set_result({'forecast_time': at.isoformat(), 'predicted_aqi': round(float(prediction), 2),
+                               'observed_at': obs['datetime'].isoformat(), 'observed_aqi': int(obs['aqi']),
+                               'model_version': served.version})
+
+    def close(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+
+
+def make_server(service, host=HOST, port=PORT):
+    """A threaded HTTP front end for the service (one thread per keep-alive connection)."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            # Headers and body are separate writes; avoid the Nagle + delayed-ACK stall
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                served = service.model
+                self._reply(200, {'model_version': served.version, 'model': served.name, **service.stats})
+            elif url.path == '/predict':
+                at = parse_qs(url.query).get('at', [None])[0]
+                try:
+                    at = datetime.fromisoformat(at) if at else None
+                except ValueError:
+                    self._reply(400, {'error': f"'at' is not an ISO datetime: {at}"})
+                    return
+                try:
+                    self._reply(200, service.predict(at))
+                except (OpenWeatherError, OSError) as e:
+                    self._reply(503, {'error': f"observation unavailable: {e}"})
+                except Exception as e:
+                    self._reply(500, {'error': str(e)})
+            else:
+                self._reply(404, {'error': f"unknown path {url.path}"})
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Serve next-hour AQI predictions from a warm model")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--model', default=LOCAL_MODEL_PATH, help="Local joblib model to serve")
+    parser.add_argument('--registry', action='store_true',
+                        help="Serve the version inference_pipeline selects from the Hopsworks registry instead")
+    parser.add_argument('--poll', type=int, default=MODEL_POLL, help="Seconds between checks for a new model")
+    args = parser.parse_args(argv)
+    source = RegistryModelSource() if args.registry else LocalModelSource(args.model)
+    features = source.online_store() if args.registry else None
+    service = PredictionService(source, model_poll=args.poll, features=features)
+    server = make_server(service, args.host, args.port)
+    print(f"🚀 Prediction service on http://{args.host}:{server.server_address[1]}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Precomputed views of the pollutant history for the dashboard, so a page load
+# reads a few hundred points instead of parsing the whole history:
+#   hourly.csv  - raw rows of the last HOURLY_ROWS hours (7-day trend, radar)
+#   daily.csv   - per-day means (+ row count n) over the last DAILY_DAYS days
+#   weekly.csv  - per-week means (+ n), weeks starting on Monday
+#   lttb_<column>.csv - one column over the full history, LTTB-downsampled
+#                 to LTTB_POINTS points (one file per column, so a chart only
+#                 downloads the series it draws)
+# build_rollups() rebuilds everything from a history frame (daily inference,
+# backfill); update_rollups() folds the hourly pipeline's new rows into the
+# hourly/daily/weekly files without reading the history. The LTTB series only
+# changes on full rebuilds.
+
+ROLLUPS_DIR = os.path.join('data', 'rollups')
+VALUE_COLUMNS = ['aqi', 'co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']
+HOURLY_ROWS = 168     # 7 days
+DAILY_DAYS = 365
+LTTB_POINTS = 500
+ROLLUP_FILES = ['hourly', 'daily', 'weekly'] + [f'lttb_{col}' for col in VALUE_COLUMNS]
+
+
+def lttb(x, y, n_out):
+    """Indices of the Largest-Triangle-Three-Buckets downsample of (x, y) to n_out points.
+
+    Keeps the first and last point; from each of the n_out - 2 buckets in between
+    picks the point forming the largest triangle with the previous pick and the
+    mean of the next bucket, which preserves peaks and dips a stride would skip.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # Bucket i is [edges[i], edges[i + 1])
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def _period_start(datetimes, freq):
+    days = datetimes.dt.normalize()
+    return days - pd.to_timedelta(days.dt.dayofweek, unit='D') if freq == 'W' else days
+
+
+def _aggregate(rows, freq):
+    """Per-period means of VALUE_COLUMNS plus the row count n."""
+    grouped = rows.groupby(_period_start(rows['datetime'], freq).rename('datetime'))
+    out = grouped[VALUE_COLUMNS].mean()
+    out.insert(0, 'n', grouped.size())
+    return out.reset_index()
+
+
+def _merge_aggregate(existing, rows, freq):
+    """Folds new rows into per-period means without the rows they were computed from."""
+    new = _aggregate(rows, freq)
+    # Back to sums, add, back to means
+    sums = pd.concat([frame.assign(**{c: frame[c] * frame['n'] for c in VALUE_COLUMNS}) for frame in [existing, new]])
+    merged = sums.groupby('datetime', as_index=False).sum()
+    for col in VALUE_COLUMNS:
+        merged[col] = merged[col] / merged['n']
+    return merged
+
+
+def _clean(history):
+    history = history.assign(datetime=pd.to_datetime(history['datetime']))
+    history = history.sort_values('datetime', kind='stable').drop_duplicates('datetime', keep='last')
+    return history[['datetime'] + VALUE_COLUMNS].reset_index(drop=True)
+
+
+def build_rollups(history):
+    """Every rollup in ROLLUP_FILES from a history frame (datetime + VALUE_COLUMNS)."""
+    history = _clean(history)
+    rollups = {
+        'hourly': history.tail(HOURLY_ROWS).reset_index(drop=True),
+        'daily': _aggregate(history, 'D').tail(DAILY_DAYS).reset_index(drop=True),
+        'weekly': _aggregate(history, 'W'),
+    }
+    x = history['datetime'].to_numpy().astype('datetime64[s]').astype(np.int64)
+    for col in VALUE_COLUMNS:
+        idx = lttb(x, history[col].to_numpy(), LTTB_POINTS)
+        rollups[f'lttb_{col}'] = history[['datetime', col]].iloc[idx].reset_index(drop=True)
+    return rollups
+
+
+def update_rollups(rollups, rows):
+    """Rollups with new hourly rows folded in (rows already present are ignored)."""
+    rows = _clean(rows)
+    hourly = rollups['hourly']
+    if not hourly.empty:
+        rows = rows[rows['datetime'] > hourly['datetime'].max()]
+    if rows.empty:
+        return rollups
+    return {
+        **rollups,
+        'hourly': pd.concat([hourly, rows], ignore_index=True).tail(HOURLY_ROWS).reset_index(drop=True),
+        'daily': _merge_aggregate(rollups['daily'], rows, 'D').tail(DAILY_DAYS).reset_index(drop=True),
+        'weekly': _merge_aggregate(rollups['weekly'], rows, 'W'),
+    }
+
+
+def load_rollups(rollups_dir=ROLLUPS_DIR):
+    """The saved rollups, or None if any file is missing."""
+    try:
+        return {name: pd.read_csv(os.path.join(rollups_dir, f'{name}.csv'), parse_dates=['datetime'])
+                for name in ROLLUP_FILES}
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.rollup-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_rollups(rollups, rollups_dir=ROLLUPS_DIR):
+    """Writes each rollup atomically (temp file + rename), then a manifest of what was written."""
+    os.makedirs(rollups_dir, exist_ok=True)
+    for name in ROLLUP_FILES:
+        # Full precision: the hourly run reads these back and merges into them, rounding would accumulate
+        _write_atomic(os.path.join(rollups_dir, f'{name}.csv'),
+                      lambda f: rollups[name].to_csv(f, index=False, lineterminator='\n'))
+    manifest = {'last_datetime': pd.Timestamp(rollups['hourly']['datetime'].max()).isoformat(),
+                'rows': {name: len(rollups[name]) for name in ROLLUP_FILES}}
+    _write_atomic(os.path.join(rollups_dir, 'manifest.json'), lambda f: json.dump(manifest, f, indent=2))
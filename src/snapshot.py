@@ -0,0 +1,119 @@
+import os
+import json
+import tempfile
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# One binary bundle with everything the dashboard draws from the forecast,
+# written by the inference pipeline as a single Arrow IPC record batch:
+#   forecast   - the 72 hourly rows (+ p10/p50/p90 bands) with each row's AQI
+#                category and colour already resolved
+#   daily      - per-day mean AQI, the mid-day timestamp and category
+#   hourly     - mean AQI per hour of day and its colour
+#   categories - hours per AQI category (all five, zeros included)
+# Each section is a list<struct> column of the single row, so reading one is
+# a zero-copy slice of the buffer. model_info and the bundle version live in
+# the schema metadata. Readers get plain numpy arrays: no CSV or timestamp
+# parsing and no groupbys on every dashboard rerun.
+
+SNAPSHOT_PATH = os.path.join('data', 'dashboard_snapshot.arrow')
+SNAPSHOT_VERSION = 1
+
+# The dashboard's AQI bands: a value belongs to the first category whose upper
+# bound it doesn't exceed (1.5 is Good, 1.51 is Fair)
+CATEGORY_BOUNDS = [1.5, 2.5, 3.5, 4.5]
+CATEGORY_LABELS = ['Good', 'Fair', 'Moderate', 'Poor', 'Very Poor']
+CATEGORY_COLORS = ['#24A148', '#F1C21B', '#FF8C00', '#DA1E28', '#8B00FF']
+SECTIONS = ['forecast', 'daily', 'hourly', 'categories']
+
+
+def aqi_categories(values):
+    """Index into CATEGORY_LABELS / CATEGORY_COLORS for every value."""
+    return np.searchsorted(CATEGORY_BOUNDS, np.asarray(values, dtype=np.float64), side='left')
+
+
+def _section(columns):
+    """A dict of equal-length columns as a one-element list<struct> array."""
+    struct = pa.StructArray.from_arrays([pa.array(v) for v in columns.values()], names=list(columns))
+    return pa.ListArray.from_arrays(pa.array([0, len(struct)], type=pa.int32()), struct)
+
+
+def build_snapshot(forecast_df, model_info):
+    """The bundle as a RecordBatch (one row, one column per section)."""
+    forecast_df = forecast_df.assign(forecast_time=pd.to_datetime(forecast_df['forecast_time']))
+    forecast_df = forecast_df.sort_values('forecast_time').reset_index(drop=True)
+    aqi = forecast_df['predicted_aqi'].to_numpy(dtype=np.float64)
+    category = aqi_categories(aqi)
+    forecast = {col: forecast_df[col].to_numpy() for col in forecast_df.columns}
+    forecast['category'] = np.array(CATEGORY_LABELS)[category]
+    forecast['color'] = np.array(CATEGORY_COLORS)[category]
+
+    by_date = forecast_df.groupby(forecast_df['forecast_time'].dt.normalize())
+    daily_mean = by_date['predicted_aqi'].mean()
+    daily_aqi = daily_mean.to_numpy()
+    daily = {
+        'date': daily_mean.index.to_numpy(),
+        'avg_aqi': daily_aqi,
+        'mid_time': by_date['forecast_time'].agg(lambda x: x.iloc[len(x) // 2]).to_numpy(),
+        'category': np.array(CATEGORY_LABELS)[aqi_categories(daily_aqi)],
+        'color': np.array(CATEGORY_COLORS)[aqi_categories(daily_aqi)],
+    }
+
+    by_hour = forecast_df.groupby(forecast_df['forecast_time'].dt.hour)['predicted_aqi'].mean()
+    hourly = {'hour': by_hour.index.to_numpy(), 'avg_aqi': by_hour.to_numpy(),
+              'color': np.array(CATEGORY_COLORS)[aqi_categories(by_hour.to_numpy())]}
+
+    categories = {'category': np.array(CATEGORY_LABELS), 'hours': np.bincount(category, minlength=len(CATEGORY_LABELS)),
+                  'color': np.array(CATEGORY_COLORS)}
+
+    sections = {'forecast': forecast, 'daily': daily, 'hourly': hourly, 'categories': categories}
+    metadata = {'snapshot_version': str(SNAPSHOT_VERSION), 'generated_at': datetime.now().isoformat(),
+                'model_info': json.dumps(model_info)}
+    return pa.RecordBatch.from_arrays([_section(sections[name]) for name in SECTIONS], names=SECTIONS,
+                                      metadata=metadata)
+
+
+def snapshot_bytes(batch):
+    """The bundle serialized as an Arrow IPC file."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def write_snapshot(batch, path=SNAPSHOT_PATH):
+    """Atomically writes the bundle as an Arrow IPC file (temp file + rename)."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(snapshot_bytes(batch))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_snapshot(source=SNAPSHOT_PATH):
+    """Reads a bundle from a path (memory-mapped) or from bytes already in memory.
+
+    Returns {'version', 'generated_at', 'model_info', <section>: {column: numpy array}}.
+    Numeric and timestamp columns are views of the buffer; only strings are copied.
+    """
+    buffer = pa.memory_map(source) if isinstance(source, str) else pa.py_buffer(source)
+    batch = pa.ipc.open_file(buffer).get_batch(0)
+    metadata = {k.decode(): v.decode() for k, v in batch.schema.metadata.items()}
+    version = int(metadata['snapshot_version'])
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {version} is newer than this reader ({SNAPSHOT_VERSION})")
+    snapshot = {'version': version, 'generated_at': metadata['generated_at'],
+                'model_info': json.loads(metadata['model_info'])}
+    for name in SECTIONS:
+        struct = batch.column(name).values
+        snapshot[name] = {field.name: struct.field(i).to_numpy(zero_copy_only=False)
+                          for i, field in enumerate(struct.type)}
+    return snapshot
@@ -0,0 +1,412 @@
+import os
+import json
+import errno
+import glob
+import shutil
+import tempfile
+from datetime import datetime
+import pandas as pd
+
+# Pluggable feature store / model registry backend.
+# connect() returns a project with the Hopsworks surface the pipelines use
+# (get_feature_store, get_feature_group, get_or_create_feature_group,
+# get_feature_view, create_feature_view, fg.read/insert/select/filter,
+# get_model_registry, mr.python.create_model, get_model, get_models,
+# get_best_model, model.save/download/delete). STORE_BACKEND=hopsworks (default) logs in to Hopsworks;
+# STORE_BACKEND=local keeps everything under LOCAL_STORE_DIR:
+#   feature_groups/<name>_<version>/month=YYYY-MM/data.parquet
+#       one Parquet file per calendar month of event time; an insert rewrites
+#       only the months it touches, upserting on the primary key
+#   feature_views/<name>_<version>.json
+#   model_registry/<name>/<version>/   the saved artifact + model.json (metrics)
+# Reads prune months outside the event-time filter before opening any file and
+# read only the selected columns:
+#   fg.select(['datetime', 'aqi']).filter(fg.datetime >= t0).read()
+# The same query runs unchanged against Hopsworks.
+# pyarrow (like hopsworks) is imported only by the backend that uses it, so the
+# hourly ingest doesn't pay for either one it isn't running.
+
+BACKEND = 'hopsworks'
+LOCAL_STORE_DIR = os.path.join('data', 'local_store')
+MAX_PUBLISH_ATTEMPTS = 100   # Lost races for the next version number before save() gives up
+
+
+def connect(backend=None, root=None):
+    """The project for STORE_BACKEND (read when called, after load_dotenv)."""
+    backend = backend or os.getenv('STORE_BACKEND', BACKEND)
+    if backend == 'local':
+        return LocalProject(root or os.getenv('LOCAL_STORE_DIR', LOCAL_STORE_DIR))
+    if backend != 'hopsworks':
+        raise ValueError(f"Unknown STORE_BACKEND '{backend}' (expected 'hopsworks' or 'local')")
+    import hopsworks
+    return hopsworks.login(api_key_value=os.getenv('HOPSWORKS_TOKEN'))
+
+
+def missing_data_errors():
+    """Exception types a feature group read raises because the group is missing or has no data yet.
+
+    The local backend raises FileNotFoundError; Hopsworks raises its FeatureStoreException
+    (imported only if hopsworks is installed). Connection and REST errors are not included.
+    """
+    errors = [FileNotFoundError]
+    try:
+        from hsfs.client.exceptions import FeatureStoreException
+        errors.append(FeatureStoreException)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def _write_json_atomic(data, path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.meta-', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+# --- query expressions --------------------------------------------------------
+class Filter:
+    """``column op value``; combine with & (and) like Hopsworks filters."""
+
+    OPS = {'>=': 'ge', '>': 'gt', '<=': 'le', '<': 'lt', '==': 'eq', '!=': 'ne'}
+
+    def __init__(self, column, op, value):
+        self.column, self.op, self.value = column, op, value
+
+    def __and__(self, other):
+        return And([self, other])
+
+    def terms(self):
+        return [self]
+
+    def mask(self, df):
+        return getattr(df[self.column], self.OPS[self.op])(self.value)
+
+
+class And:
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __and__(self, other):
+        return And(self.parts + [other])
+
+    def terms(self):
+        return [t for p in self.parts for t in p.terms()]
+
+    def mask(self, df):
+        mask = self.parts[0].mask(df)
+        for part in self.parts[1:]:
+            mask &= part.mask(df)
+        return mask
+
+
+class Feature:
+    """A feature group column; comparisons build Filters."""
+
+    __hash__ = None
+
+    def __init__(self, name, label=False, event_time=False):
+        self.name = name
+        self.label = label
+        self.event_time = event_time
+
+    def _filter(self, op, value):
+        # Only event times are compared as timestamps; 'karachi' stays a string
+        if self.event_time or isinstance(value, datetime):
+            value = pd.Timestamp(value)
+        return Filter(self.name, op, value)
+
+    def __ge__(self, value):
+        return self._filter('>=', value)
+
+    def __gt__(self, value):
+        return self._filter('>', value)
+
+    def __le__(self, value):
+        return self._filter('<=', value)
+
+    def __lt__(self, value):
+        return self._filter('<', value)
+
+    def __eq__(self, value):
+        return self._filter('==', value)
+
+    def __ne__(self, value):
+        return self._filter('!=', value)
+
+
+class Query:
+    def __init__(self, feature_group, columns=None, condition=None):
+        self.feature_group = feature_group
+        self.columns = columns
+        self.condition = condition
+
+    @property
+    def features(self):
+        names = self.columns or self.feature_group.columns()
+        return [Feature(name) for name in names]
+
+    def filter(self, condition):
+        combined = condition if self.condition is None else self.condition & condition
+        return Query(self.feature_group, self.columns, combined)
+
+    def read(self):
+        return self.feature_group._scan(self.columns, self.condition)
+
+
+# --- feature groups -------------------------------------------------------------
+class LocalFeatureGroup:
+    def __init__(self, root, meta):
+        self.root = root
+        self.name = meta['name']
+        self.version = meta['version']
+        self.primary_key = meta['primary_key']
+        self.event_time = meta['event_time']
+        self.description = meta.get('description', '')
+
+    def __getattr__(self, name):
+        # fg.datetime, fg.aqi, ... as in Hopsworks
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name):
+        return Feature(name, event_time=name == self.event_time)
+
+    def columns(self):
+        import pyarrow.parquet as pq
+        files = self._partitions()
+        return pq.read_schema(files[0]).names if files else []
+
+    def _partitions(self, start=None, end=None):
+        """Partition files whose month can hold event times in [start, end]."""
+        files = sorted(glob.glob(os.path.join(self.root, 'month=*', 'data.parquet')))
+        lo = start.strftime('%Y-%m') if start is not None else None
+        hi = end.strftime('%Y-%m') if end is not None else None
+        months = [os.path.basename(os.path.dirname(f))[len('month='):] for f in files]
+        return [f for f, m in zip(files, months) if (lo is None or m >= lo) and (hi is None or m <= hi)]
+
+    def _bounds(self, condition):
+        """Event-time bounds implied by the condition's terms on the event-time column (AND-ed)."""
+        start = end = None
+        for term in (condition.terms() if condition is not None else []):
+            if term.column != self.event_time:
+                continue
+            if term.op in ('>=', '>', '=='):
+                start = term.value if start is None else max(start, term.value)
+            if term.op in ('<=', '<', '=='):
+                end = term.value if end is None else min(end, term.value)
+        return start, end
+
+    def _scan(self, columns=None, condition=None):
+        start, end = self._bounds(condition)
+        files = self._partitions(start, end)
+        if not files:
+            return pd.DataFrame(columns=columns or [])
+        needed = None
+        if columns is not None:
+            filter_cols = [t.column for t in condition.terms()] if condition is not None else []
+            needed = list(dict.fromkeys(list(columns) + filter_cols))
+        import pyarrow.dataset as ds
+        df = ds.dataset(files, format='parquet').to_table(columns=needed).to_pandas()
+        if condition is not None:
+            df = df[condition.mask(df)]
+        if columns is not None:
+            df = df[list(columns)]
+        return df.reset_index(drop=True)
+
+    # Hopsworks API -------------------------------------------------------------
+    def read(self, **kwargs):
+        return self._scan()
+
+    def select_all(self):
+        return Query(self)
+
+    def select(self, features):
+        return Query(self, [f.name if isinstance(f, Feature) else f for f in features])
+
+    def filter(self, condition):
+        return Query(self, None, condition)
+
+    def insert(self, df, **kwargs):
+        """Upserts rows on the primary key; rewrites only the months the rows fall in."""
+        if df.empty:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        df = df.copy()
+        df[self.event_time] = pd.to_datetime(df[self.event_time])
+        for month, rows in df.groupby(df[self.event_time].dt.strftime('%Y-%m')):
+            path = os.path.join(self.root, f"month={month}", 'data.parquet')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+            rows = rows.drop_duplicates(self.primary_key, keep='last').sort_values(self.event_time, kind='stable')
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.part-', suffix='.tmp')
+            os.close(fd)
+            try:
+                pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), tmp_path)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+
+class LocalFeatureView:
+    def __init__(self, store, meta):
+        self.store = store
+        self.name = meta['name']
+        self.version = meta['version']
+        self.labels = meta.get('labels', [])
+        self.feature_group = store.get_feature_group(*meta['feature_group'])
+        self.query = Query(self.feature_group, meta.get('columns'))
+        self.features = [Feature(f.name, f.name in self.labels) for f in self.query.features]
+
+    def get_feature_vector(self, entry):
+        """Non-label feature values of the row matching the primary-key ``entry``, or None."""
+        condition = None
+        for col, value in entry.items():
+            term = self.feature_group[col] == value
+            condition = term if condition is None else condition & term
+        rows = self.query.filter(condition).read()
+        if rows.empty:
+            return None
+        row = rows.iloc[-1]
+        return [row[f.name] for f in self.features if not f.label]
+
+
+class LocalFeatureStore:
+    def __init__(self, root):
+        self.root = root
+
+    def _fg_dir(self, name, version):
+        return os.path.join(self.root, 'feature_groups', f"{name}_{version}")
+
+    def get_feature_group(self, name, version=1):
+        meta_path = os.path.join(self._fg_dir(name, version), 'metadata.json')
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Feature group {name} v{version} doesn't exist in {self.root}")
+        with open(meta_path, 'r') as f:
+            return LocalFeatureGroup(self._fg_dir(name, version), json.load(f))
+
+    def get_or_create_feature_group(self, name, version=1, primary_key=None, event_time=None, description='',
+                                    **kwargs):
+        meta_path = os.path.join(self._fg_dir(name, version), 'metadata.json')
+        if not os.path.exists(meta_path):
+            _write_json_atomic({'name': name, 'version': version, 'primary_key': list(primary_key or [event_time]),
+                                'event_time': event_time, 'description': description}, meta_path)
+        return self.get_feature_group(name, version)
+
+    def get_feature_view(self, name, version=1):
+        path = os.path.join(self.root, 'feature_views', f"{name}_{version}.json")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Feature view {name} v{version} doesn't exist in {self.root}")
+        with open(path, 'r') as f:
+            return LocalFeatureView(self, json.load(f))
+
+    def create_feature_view(self, name, query, labels=None, version=1, **kwargs):
+        fg = query.feature_group
+        _write_json_atomic({'name': name, 'version': version, 'feature_group': [fg.name, fg.version],
+                            'columns': query.columns, 'labels': list(labels or [])},
+                           os.path.join(self.root, 'feature_views', f"{name}_{version}.json"))
+        return self.get_feature_view(name, version)
+
+
+# --- model registry ---------------------------------------------------------------
+class LocalModel:
+    def __init__(self, registry, name, version=None, training_metrics=None, description=''):
+        self.registry = registry
+        self.name = name
+        self.version = version
+        self.training_metrics = dict(training_metrics or {})
+        self.description = description
+
+    def save(self, path):
+        """Registers ``path`` (a file or directory) as the next version of the model."""
+        model_dir = os.path.join(self.registry.root, self.name)
+        os.makedirs(model_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=model_dir, prefix='.staging-')
+        try:
+            if os.path.isdir(path):
+                shutil.copytree(path, staging, dirs_exist_ok=True)
+            else:
+                shutil.copy2(path, staging)
+            for _ in range(MAX_PUBLISH_ATTEMPTS):
+                version = max(self.registry._versions(self.name), default=0) + 1
+                _write_json_atomic({'name': self.name, 'version': version, 'training_metrics': self.training_metrics,
+                                    'description': self.description, 'created': datetime.now().isoformat()},
+                                   os.path.join(staging, 'model.json'))
+                try:
+                    # Renaming the staged directory is what publishes the version
+                    os.rename(staging, os.path.join(model_dir, str(version)))
+                    break
+                except OSError as e:
+                    if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                        raise
+                    # Another writer took this version number
+            else:
+                raise RuntimeError(f"Couldn't publish {self.name}: lost the race for a version number "
+                                   f"{MAX_PUBLISH_ATTEMPTS} times")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.version = version
+        return self
+
+    def download(self):
+        return os.path.join(self.registry.root, self.name, str(self.version))
+
+    def delete(self):
+        shutil.rmtree(self.download())
+
+
+class _ModelApi:
+    def __init__(self, registry):
+        self.registry = registry
+
+    def create_model(self, name, metrics=None, description='', **kwargs):
+        return LocalModel(self.registry, name, training_metrics=metrics, description=description)
+
+
+class LocalModelRegistry:
+    def __init__(self, root):
+        self.root = root
+        self.python = self.sklearn = self.tensorflow = _ModelApi(self)
+
+    def _versions(self, name):
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        return [int(v) for v in os.listdir(model_dir) if v.isdigit()]
+
+    def get_model(self, name, version=None):
+        version = version or max(self._versions(name), default=None)
+        if version is None:
+            raise FileNotFoundError(f"No versions of model {name} in {self.root}")
+        with open(os.path.join(self.root, name, str(version), 'model.json'), 'r') as f:
+            meta = json.load(f)
+        return LocalModel(self, name, meta['version'], meta['training_metrics'], meta.get('description', ''))
+
+    def get_models(self, name):
+        return [self.get_model(name, v) for v in sorted(self._versions(name))]
+
+    def get_best_model(self, name, metric, direction):
+        models = [m for m in self.get_models(name) if metric in m.training_metrics]
+        if not models:
+            return None
+        pick = max if direction == 'max' else min
+        return pick(models, key=lambda m: m.training_metrics[metric])
+
+
+class LocalProject:
+    def __init__(self, root=LOCAL_STORE_DIR):
+        self.root = root
+
+    def get_feature_store(self):
+        return LocalFeatureStore(self.root)
+
+    def get_model_registry(self):
+        return LocalModelRegistry(os.path.join(self.root, 'model_registry'))
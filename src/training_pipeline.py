@@ -1,143 +1,222 @@
-import hopsworks
 import pandas as pd
-import joblib
 import os
 import json
-import numpy as np
 from dotenv import load_dotenv
-from sklearn.linear_model import Ridge
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, r2_score
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
+from store_backend import connect
 from datetime import datetime
+from parallel_training import train_candidates, save_model, CANDIDATES, DEFAULT_PARAMS
+from backtest import (
+    walk_forward_backtest, select_candidate, INITIAL_TRAIN_ROWS, TEST_ROWS, STEP_ROWS, MAX_FOLDS, RISK_WEIGHT,
+)
+from training_snapshots import SnapshotStore, run_key, find_run, record_run
+from incremental_training import IncrementalState, FULL_RETRAIN_EVERY
+from hyperparameter_search import search_hyperparameters, search_config
+from model_index import record_version, MODEL_NAME
 
 load_dotenv()
-project = hopsworks.login(api_key_value=os.getenv('HOPSWORKS_TOKEN'))
-fs = project.get_feature_store()
-
-# 1. Get Feature Group
-fg = fs.get_feature_group(name="karachi_aqi_fg", version=1)
-
-# 2. Feature View Setup
-print("🔍 Checking Feature View...")
-try:
-    feature_view = fs.get_feature_view(name="karachi_aqi_view", version=1)
-except:
-    feature_view = fs.create_feature_view(
-        name="karachi_aqi_view",
-        query=fg.select_all(),
-        labels=["aqi"],
-        version=1
-    )
 
-# 3. TIME-SERIES SPLIT (Professional Approach)
-# We avoid random splitting to prevent "Data Leakage"
-print("🧪 Applying Time-Series Split (Chronological Order)...")
-df = fg.read().sort_values(by="datetime")
+TRAIN_FRACTION = 0.8
+
+
+def training_config(candidates=CANDIDATES):
+    """Everything besides the data that decides which model a run registers."""
+    return {
+        'candidates': list(candidates),
+        'params': {name: DEFAULT_PARAMS[name] for name in candidates},
+        'train_fraction': TRAIN_FRACTION,
+        'backtest': [INITIAL_TRAIN_ROWS, TEST_ROWS, STEP_ROWS, MAX_FOLDS, RISK_WEIGHT],
+        'search': search_config(candidates),
+    }
+
+
+def _registered(mr, name, version):
+    try:
+        return mr.get_model(name, version=version) is not None
+    except Exception:
+        return False
 
-# Drop datetime but keep the order
-if 'datetime' in df.columns:
+
+def _full_retrain(df, candidates, state, config):
+    """Searches hyperparameters, fits every candidate from scratch, backtests them and reseeds the incremental state."""
+    # TIME-SERIES SPLIT (Professional Approach)
+    # We avoid random splitting to prevent "Data Leakage"
+    print("🧪 Applying Time-Series Split (Chronological Order)...")
+    times = df['datetime']
+
+    # Drop datetime but keep the order
     df = df.drop(columns=['datetime'])
 
-# Manual 80/20 split based on time
-split_idx = int(len(df) * 0.8)
-train_df = df.iloc[:split_idx]
-test_df = df.iloc[split_idx:]
-
-X_train = train_df.drop(columns=['aqi'])
-y_train = train_df['aqi']
-X_test = test_df.drop(columns=['aqi'])
-y_test = test_df['aqi']
-
-# 4. Model Training with AGGRESSIVE REGULARIZATION
-print("🏃 Training Ridge (Alpha=50.0)...")
-m1 = Ridge(alpha=50.0).fit(X_train, y_train)
-p1 = m1.predict(X_test)
-
-print("🌲 Training Highly Regularized Random Forest...")
-# Fewer trees and shallower depth force the model to learn general patterns
-m2 = RandomForestRegressor(
-    n_estimators=50, 
-    max_depth=5, 
-    min_samples_leaf=20, 
-    max_features='sqrt',
-    random_state=42
-).fit(X_train, np.ravel(y_train))
-p2 = m2.predict(X_test)
-
-print("🧠 Training Neural Network (Simple Architecture)...")
-input_dim = X_train.shape[1]
-m3 = Sequential([
-    Dense(16, activation='relu', input_shape=(input_dim,)), 
-    Dropout(0.4), # High dropout to prevent memorization
-    Dense(8, activation='relu'), 
-    Dense(1)
-])
-m3.compile(optimizer='adam', loss='mse')
-
-early_stop = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
-
-m3.fit(
-    X_train, y_train, 
-    validation_data=(X_test, y_test),
-    epochs=50, 
-    batch_size=32,
-    callbacks=[early_stop],
-    verbose=0
-)
-p3 = m3.predict(X_test).flatten()
-
-# 5. Results & Selection
-results = [
-    {"Name": "Ridge", "MAE": mean_absolute_error(y_test, p1), "R2": r2_score(y_test, p1), "Model": m1, "Ext": ".joblib"},
-    {"Name": "RandomForest", "MAE": mean_absolute_error(y_test, p2), "R2": r2_score(y_test, p2), "Model": m2, "Ext": ".joblib"},
-    {"Name": "NeuralNetwork", "MAE": mean_absolute_error(y_test, p3), "R2": r2_score(y_test, p3), "Model": m3, "Ext": ".h5"}
-]
-
-best = min(results, key=lambda x: x['MAE'])
-best_p = best['Model'].predict(X_test).flatten()
-best_r2 = r2_score(y_test, best_p)
-
-print(f"\n🏆 Winner: {best['Name']}")
-print(f"📊 Realistic MAE: {best['MAE']:.4f}")
-print(f"📈 Realistic R2 Score: {best_r2:.4f}")
-
-# 5b. Save Model Comparison Metrics for Dashboard
-os.makedirs('data', exist_ok=True)
-model_info = {
-    "trained_at": datetime.now().isoformat(),
-    "selected_model": best['Name'],
-    "selection_criteria": "Lowest MAE on 80/20 time-series split",
-    "models": [
-        {
-            "name": r["Name"],
-            "mae": round(r["MAE"], 4),
-            "r2": round(r["R2"], 4),
-            "selected": r["Name"] == best["Name"]
-        }
-        for r in results
-    ]
-}
-with open('data/model_info.json', 'w') as f:
-    json.dump(model_info, f, indent=2)
-print("📊 Model comparison metrics saved to data/model_info.json")
-
-# 6. Save & Register
-os.makedirs('models', exist_ok=True)
-path = f"models/best_model{best['Ext']}"
-
-if best['Name'] == "NeuralNetwork":
-    best['Model'].save(path)
-else:
-    joblib.dump(best['Model'], path)
-
-mr = project.get_model_registry()
-model = mr.python.create_model(
-    name="karachi_aqi_model", 
-    metrics={"mae": best['MAE'], "r2": best_r2}
-)
-model.save(path)
-print(f"✅ Defensible model registered as Version {model.version}!")
\ No newline at end of file
+    # Manual 80/20 split based on time
+    split_idx = int(len(df) * TRAIN_FRACTION)
+    train_df = df.iloc[:split_idx]
+    test_df = df.iloc[split_idx:]
+
+    X_train = train_df.drop(columns=['aqi'])
+    y_train = train_df['aqi']
+    X_test = test_df.drop(columns=['aqi'])
+    y_test = test_df['aqi']
+
+    # Hyperparameter Search
+    # Successive halving on the training split, cheap budgets first; evaluations are
+    # cached in data/search_cache.json. DEFAULT_PARAMS stand in for candidates it didn't finish
+    print("🔎 Searching hyperparameters (successive halving)...")
+    search = search_hyperparameters(X_train, y_train, candidates=candidates)
+    for name, s in search['summary'].items():
+        print(f"   {name}: {s['params']} (validation MAE {s['mae']:.4f}, {s['evaluated']} fitted, {s['cached']} cached)")
+    if search['deadline_hit']:
+        print(f"   ⏱️ Stopped at the {search['budget_seconds']}s budget")
+    params = {name: search['best'].get(name, DEFAULT_PARAMS[name]) for name in candidates}
+
+    # Model Training
+    # Ridge, Random Forest and the Neural Network are fitted concurrently in a process pool
+    # on one shared copy of the train/test matrices
+    print("🏁 Training all candidates in parallel...")
+    results = train_candidates(X_train, y_train, X_test, y_test, candidates=candidates, params=params)
+    for r in results:
+        print(f"   {r['Name']}: {r['FitSeconds']:.1f}s")
+
+    # Walk-Forward Backtest & Selection
+    # Each candidate is scored across many rolling-origin folds instead of one noisy test window;
+    # folds unchanged since the last run are read from data/backtest_cache.json
+    print("🔁 Running walk-forward backtest...")
+    backtest = walk_forward_backtest(df.drop(columns=['aqi']), df['aqi'], candidates=candidates, params=params)
+    for name, b in backtest.items():
+        print(f"   {name}: MAE {b['mean_mae']:.4f} ± {b['std_mae']:.4f} over {b['folds']} folds "
+              f"({b['evaluated']} fitted, {b['cached']} cached)")
+    winner = select_candidate(backtest)
+
+    # The fitted models have seen the training split; the next update starts from there
+    state.seed(results, X_train, y_train, times.iloc[split_idx - 1], winner, backtest, config, search)
+    return results, backtest, winner, search
+
+
+def run_training(candidates=CANDIDATES, full_sync=False, full_retrain=False):
+    project = connect()
+    fs = project.get_feature_store()
+
+    # 1. Get Feature Group
+    fg = fs.get_feature_group(name="karachi_aqi_fg", version=1)
+
+    # 2. Feature View Setup
+    print("🔍 Checking Feature View...")
+    try:
+        feature_view = fs.get_feature_view(name="karachi_aqi_view", version=1)
+    except:
+        feature_view = fs.create_feature_view(
+            name="karachi_aqi_view",
+            query=fg.select_all(),
+            labels=["aqi"],
+            version=1
+        )
+
+    # 3. Sync the training snapshot: only rows newer than the last snapshot are read
+    print("🧊 Syncing training snapshot...")
+    snapshots = SnapshotStore()
+    snapshot = snapshots.sync(fg, full=full_sync)
+    if snapshot is None:
+        print("❌ The feature group is empty. Nothing to train on.")
+        return None
+    print(f"   Snapshot v{snapshot['version']}: {snapshot['rows']} rows up to {snapshot['last_datetime']} "
+          f"({snapshot['hash'][:12]})")
+
+    # Same snapshot and config as an earlier run: the model it registered is still the answer
+    config = training_config(candidates)
+    key = run_key(snapshot['hash'], config)
+    run = find_run(key)
+    mr = project.get_model_registry()
+    if run is not None and _registered(mr, run['model_name'], run['model_version']):
+        print(f"⏭️ Data and config unchanged since {run['trained_at']}. "
+              f"Reusing {run['model_name']} version {run['model_version']}, nothing registered.")
+        os.makedirs('data', exist_ok=True)
+        with open('data/model_info.json', 'w') as f:
+            json.dump(run['model_info'], f, indent=2)
+        return run
+
+    df = snapshots.load(snapshot)
+    feature_names = [c for c in df.columns if c not in ('datetime', 'aqi')]
+
+    # 3b. Between full retrains every candidate only learns the rows it hasn't seen yet
+    state = IncrementalState()
+    reason = "requested" if full_retrain else state.full_retrain_reason(config, feature_names)
+    results = None
+    if reason is None:
+        updates = state.meta['updates'] + 1
+        print(f"➕ Incremental update {updates}/{FULL_RETRAIN_EVERY} since the full retrain of "
+              f"{state.meta['full_retrain_at']}...")
+        results = state.update(df)
+        reason = "no rows newer than the incremental state"
+    if results is not None:
+        for r in results:
+            print(f"   {r['Name']}: {r['NewRows']} new rows in {r['FitSeconds']:.2f}s")
+        winner, backtest, search = state.meta['winner'], state.meta['backtest'], state.meta['search']
+        criteria = (f"Lowest mean + std of MAE across {backtest[winner]['folds']} walk-forward folds at the last "
+                    f"full retrain; incremental update {updates}/{FULL_RETRAIN_EVERY}, scored on rows before "
+                    f"learning them")
+    else:
+        print(f"🔁 Full retrain ({reason})")
+        results, backtest, winner, search = _full_retrain(df, candidates, state, config)
+        criteria = f"Lowest mean + std of MAE across {backtest[winner]['folds']} walk-forward folds"
+
+    best = next(r for r in results if r['Name'] == winner)
+    best_r2 = best['R2']
+
+    print(f"\n🏆 Winner: {best['Name']}")
+    print(f"📊 Realistic MAE: {best['MAE']:.4f}")
+    print(f"📈 Realistic R2 Score: {best_r2:.4f}")
+
+    # 4. Save Model Comparison Metrics for Dashboard
+    os.makedirs('data', exist_ok=True)
+    model_info = {
+        "trained_at": datetime.now().isoformat(),
+        "selected_model": best['Name'],
+        "selection_criteria": criteria,
+        "models": [
+            {
+                "name": r["Name"],
+                "mae": round(r["MAE"], 4),
+                "r2": round(r["R2"], 4),
+                "cv_mae_mean": round(backtest[r["Name"]]["mean_mae"], 4),
+                "cv_mae_var": round(backtest[r["Name"]]["var_mae"], 6),
+                "cv_folds": backtest[r["Name"]]["folds"],
+                "selected": r["Name"] == best["Name"]
+            }
+            for r in results
+        ],
+        # Successive-halving trace of the last full retrain, for the dashboard
+        "search": search,
+    }
+    with open('data/model_info.json', 'w') as f:
+        json.dump(model_info, f, indent=2)
+    print("📊 Model comparison metrics saved to data/model_info.json")
+
+    # 5. Save & Register
+    os.makedirs('models', exist_ok=True)
+    path = f"models/best_model{best['Ext']}"
+    save_model(best, path)
+
+    metrics = {"mae": best['MAE'], "r2": best_r2, "cv_mae": backtest[winner]['mean_mae']}
+    model = mr.python.create_model(
+        name=MODEL_NAME,
+        metrics=metrics
+    )
+    model.save(path)
+    print(f"✅ Defensible model registered as Version {model.version}!")
+
+    # Keep the materialized index and its champion pointer current; inference reads only those
+    index = record_version(mr, model.version, metrics)
+    print(f"🏅 Champion: Version {index.champion['version']} ({index.champion['reason']}, {len(index)} versions indexed)")
+
+    # 6. Remember what this run registered, so a rerun on the same snapshot reuses it
+    run = {
+        'snapshot_version': snapshot['version'],
+        'snapshot_hash': snapshot['hash'],
+        'model_name': MODEL_NAME,
+        'model_version': model.version,
+        'trained_at': model_info['trained_at'],
+        'model_info': model_info,
+    }
+    record_run(key, run)
+    return run
+
+if __name__ == "__main__":
+    run_training()
@@ -0,0 +1,174 @@
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+import pandas as pd
+
+# Versioned, incrementally synced snapshots of the training data.
+# A snapshot is the feature group as of one sync: an ordered list of Parquet
+# parts, each holding the rows that were newer than the previous snapshot, so a
+# daily sync only pulls fg.filter(fg.datetime > last).read() and writes one
+# small part. Snapshots are identified by a content hash of their rows
+# (column names, dtypes and values, in time order), independent of how the rows
+# were split into parts: a full resync of the same data gets the same hash.
+#   <root>/parts/<sha256 of the part>.parquet
+#   <root>/manifest.json   {"snapshots": [{version, hash, rows, last_datetime, parts, created}, ...]}
+# Parts are compacted into one once a snapshot has MAX_PARTS of them; parts no
+# kept snapshot refers to are deleted.
+# The hourly ingest only ever appends hours after its watermark, so rows older
+# than the last snapshot don't change; sync(fg, full=True) re-reads everything.
+#
+# Training runs are recorded in RUNS_PATH under a key made of the snapshot hash
+# and the training config, with the model version they registered, so a rerun
+# on the same data and config can reuse that model instead of registering a copy.
+
+SNAPSHOT_DIR = os.path.join('.cache', 'training_snapshots')
+RUNS_PATH = os.path.join('data', 'training_runs.json')
+EVENT_TIME = 'datetime'
+MAX_SNAPSHOTS = 30
+MAX_PARTS = 32
+MAX_RUNS = 50
+
+
+def content_hash(df):
+    """SHA-256 of the rows in time order: column names, dtypes and values (columns in name order)."""
+    df = df.sort_values(EVENT_TIME, kind='stable').reset_index(drop=True)
+    columns = sorted(df.columns)
+    hasher = hashlib.sha256(json.dumps([[c, str(df[c].dtype)] for c in columns]).encode())
+    hasher.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _write_json_atomic(data, path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshots-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR, max_snapshots=MAX_SNAPSHOTS, max_parts=MAX_PARTS):
+        self.root = root
+        self.max_snapshots = max_snapshots
+        self.max_parts = max_parts
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self.snapshots = _read_json(self.manifest_path, {}).get('snapshots', [])
+
+    def latest(self):
+        return self.snapshots[-1] if self.snapshots else None
+
+    def _part_path(self, part):
+        return os.path.join(self.root, 'parts', f"{part}.parquet")
+
+    def load(self, snapshot=None):
+        """The snapshot's rows sorted by time (the latest snapshot by default)."""
+        snapshot = snapshot or self.latest()
+        if snapshot is None:
+            return None
+        frames = [pd.read_parquet(self._part_path(part)) for part in snapshot['parts']]
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _write_part(self, rows, part):
+        path = self._part_path(part)
+        if os.path.exists(path):
+            return part
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.part-', suffix='.tmp')
+        os.close(fd)
+        try:
+            rows.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return part
+
+    def sync(self, fg, full=False):
+        """Pulls rows newer than the latest snapshot and returns the snapshot (a new one only if the data changed)."""
+        # 1. Only the rows after the last snapshot's newest hour (everything on the first or a full sync)
+        previous = None if full else self.latest()
+        if previous is not None and not all(os.path.exists(self._part_path(p)) for p in previous['parts']):
+            # A part went missing (e.g. a partially restored cache): rebuild from the feature group
+            previous = None
+        if previous is None:
+            new_rows, base = fg.read(), None
+            if new_rows.empty:
+                return self.latest()
+        else:
+            last = pd.Timestamp(previous['last_datetime'])
+            new_rows = fg.filter(fg[EVENT_TIME] > last).read()
+            new_rows = new_rows[pd.to_datetime(new_rows[EVENT_TIME]) > last]
+            if new_rows.empty:
+                return previous
+            base = self.load(previous)
+            if set(new_rows.columns) != set(base.columns):
+                # The feature group's schema changed: the snapshot can't be extended, rebuild it
+                return self.sync(fg, full=True)
+            new_rows = new_rows[list(base.columns)]
+
+        # 2. Hash the whole snapshot; a full resync of unchanged data is the latest snapshot again
+        new_rows = new_rows.sort_values(EVENT_TIME, kind='stable').reset_index(drop=True)
+        rows = new_rows if base is None else pd.concat([base, new_rows], ignore_index=True)
+        digest = content_hash(rows)
+        latest = self.latest()
+        if latest is not None and digest == latest['hash']:
+            return latest
+        if base is None or len(previous['parts']) + 1 > self.max_parts:
+            parts = [self._write_part(rows, digest)]
+        else:
+            parts = previous['parts'] + [self._write_part(new_rows, content_hash(new_rows))]
+
+        # 3. Publish it in the manifest, drop the oldest snapshots and parts nothing refers to any more
+        snapshot = {
+            'version': (latest['version'] if latest is not None else 0) + 1,
+            'hash': digest,
+            'rows': len(rows),
+            'last_datetime': pd.Timestamp(rows[EVENT_TIME].max()).isoformat(),
+            'parts': parts,
+            'created': datetime.now().isoformat(),
+        }
+        self.snapshots = (self.snapshots + [snapshot])[-self.max_snapshots:]
+        _write_json_atomic({'snapshots': self.snapshots}, self.manifest_path)
+        self._collect_garbage()
+        return snapshot
+
+    def _collect_garbage(self):
+        keep = {part for s in self.snapshots for part in s['parts']}
+        parts_dir = os.path.join(self.root, 'parts')
+        for name in os.listdir(parts_dir):
+            if name.endswith('.parquet') and name[:-len('.parquet')] not in keep:
+                os.remove(os.path.join(parts_dir, name))
+
+
+def run_key(snapshot_hash, config):
+    """Identity of a training run: the data it saw and everything else that decides its model."""
+    return hashlib.sha256(f"{snapshot_hash}|{json.dumps(config, sort_keys=True)}".encode()).hexdigest()
+
+
+def find_run(key, path=RUNS_PATH):
+    return _read_json(path, {}).get(key)
+
+
+def record_run(key, run, path=RUNS_PATH, max_runs=MAX_RUNS):
+    runs = _read_json(path, {})
+    runs[key] = run
+    # Only the most recent runs can still match; older ones describe long-gone snapshots
+    newest = sorted(runs, key=lambda k: runs[k]['trained_at'])[-max_runs:]
+    _write_json_atomic({k: runs[k] for k in newest}, path)
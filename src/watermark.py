@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import pandas as pd
+from features import LAG_SOURCE_COLUMNS
+
+# Persisted "last committed row" for karachi_aqi_fg.
+# Holds the event time plus the columns the hourly lag features are built from,
+# so the duplicate check never has to scan the feature group. Newer watermarks
+# also carry the streaming FeatureState ('state') the next hour's lags come from.
+WATERMARK_PATH = os.path.join('data', 'watermark.json')
+# Multi-city ingest keeps one watermark per city, all in one file
+CITY_WATERMARKS_PATH = os.path.join('data', 'city_watermarks.json')
+
+
+def load_watermark(path=WATERMARK_PATH):
+    """Returns the last committed row as a dict, or None if no watermark exists."""
+    try:
+        with open(path, 'r') as f:
+            return _from_record(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+        return None
+
+
+def _to_record(row, state=None):
+    data = {'datetime': pd.Timestamp(row['datetime']).isoformat()}
+    for col in LAG_SOURCE_COLUMNS:
+        data[col] = float(row[col])
+    if state is not None:
+        data['state'] = state.to_dict()
+    elif isinstance(row, dict) and 'state' in row:
+        data['state'] = row['state']
+    return data
+
+
+def _from_record(data):
+    data = dict(data)
+    data['datetime'] = pd.Timestamp(data['datetime'])
+    return data
+
+
+def _write_json_atomic(data, path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.watermark-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_watermark(row, path=WATERMARK_PATH, state=None):
+    """Atomically replaces the watermark with the given row and feature state (temp file + rename)."""
+    _write_json_atomic(_to_record(row, state), path)
+    return load_watermark(path)
+
+
+def watermark_from_frame(df):
+    """Builds a watermark from the newest row of a feature frame (one-off bootstrap)."""
+    if df is None or df.empty:
+        return None
+    latest = df.loc[pd.to_datetime(df['datetime']).idxmax()]
+    row = {'datetime': pd.Timestamp(latest['datetime'])}
+    for col in LAG_SOURCE_COLUMNS:
+        row[col] = float(latest[col])
+    return row
+
+
+def insert_with_watermark(fg, new_df, path=WATERMARK_PATH, state=None):
+    """Inserts new rows and advances the watermark only once the insert succeeded."""
+    fg.insert(new_df)
+    return save_watermark(new_df.loc[pd.to_datetime(new_df['datetime']).idxmax()], path, state)
+
+
+# --- per-city watermarks ----------------------------------------------------
+def load_city_watermarks(path=CITY_WATERMARKS_PATH):
+    """Returns {city: last committed row}; empty if no watermark file exists."""
+    try:
+        with open(path, 'r') as f:
+            return {city: _from_record(data) for city, data in json.load(f).items()}
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+        return {}
+
+
+def save_city_watermarks(watermarks, path=CITY_WATERMARKS_PATH):
+    """Atomically replaces every city's watermark in one write."""
+    _write_json_atomic({city: _to_record(row) for city, row in sorted(watermarks.items())}, path)
+    return load_city_watermarks(path)
+
+
+def city_watermarks_from_frame(df):
+    """Builds {city: newest row} from a multi-city feature frame (one-off bootstrap)."""
+    if df is None or df.empty:
+        return {}
+    df = df.assign(datetime=pd.to_datetime(df['datetime']))
+    latest = df.loc[df.groupby('city')['datetime'].idxmax()]
+    return {row['city']: {'datetime': row['datetime'], **{col: float(row[col]) for col in LAG_SOURCE_COLUMNS}}
+            for _, row in latest.iterrows()}
+
+
+def insert_with_city_watermarks(fg, new_df, watermarks, path=CITY_WATERMARKS_PATH, states=None):
+    """Bulk-inserts rows for many cities, then advances each city's watermark in one atomic write.
+
+    ``states`` optionally maps city -> FeatureState after the new rows, stored with each watermark.
+    """
+    fg.insert(new_df)
+    latest = city_watermarks_from_frame(new_df)
+    for city, state in (states or {}).items():
+        if city in latest:
+            latest[city]['state'] = state.to_dict()
+    return save_city_watermarks({**watermarks, **latest}, path)
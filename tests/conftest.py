@@ -0,0 +1,24 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+# The pipelines import each other as top-level modules from src/, as they do
+# when run with python src/<module>.py.
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+HISTORY_PATH = os.path.join(ROOT, 'data', 'karachi_aqi_history.csv')
+
+
+@pytest.fixture(scope='session')
+def raw_history():
+    """The committed hourly history CSV (datetime, aqi and the seven pollutants)."""
+    return pd.read_csv(HISTORY_PATH)
+
+
+@pytest.fixture(scope='session')
+def history(raw_history):
+    """The history with the default engineered features, rows without lags dropped."""
+    from features import compute_features
+    return compute_features(raw_history).dropna().reset_index(drop=True)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import pytest
+from cli import build_parser, import_profile, main, _target, HEAVY_PACKAGES
+
+CLI = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'cli.py'))
+COMMANDS = ['ingest', 'ingest --cities', 'backfill', 'upload', 'train', 'infer', 'predict', 'serve', 'prune']
+
+
+def target(argv):
+    args, rest = build_parser().parse_known_args(argv)
+    return _target(args, rest)
+
+
+@pytest.mark.parametrize('command', ['ingest', 'ingest --cities'])
+def test_ingest_loads_no_heavy_backend(command):
+    _, packages = import_profile(command.split())
+    assert [p for p in HEAVY_PACKAGES if p in packages] == []
+
+
+@pytest.mark.parametrize('command', COMMANDS)
+def test_every_command_imports(command):
+    proc = subprocess.run([sys.executable, CLI, '--import-only'] + command.split(), capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_importing_cli_loads_no_pipeline():
+    code = ("import sys; sys.path.insert(0, {src!r}); import cli; "
+            "print(','.join(m for m in ('pandas', 'numpy', 'feature_pipeline', *cli.HEAVY_PACKAGES) "
+            "if m in sys.modules))").format(src=os.path.dirname(CLI))
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ''
+
+
+def test_targets():
+    assert target(['ingest']) == ('feature_pipeline', 'run_hourly', {})
+    assert target(['ingest', '--cities']) == ('multi_city_pipeline', 'run_hourly_cities', {})
+    assert target(['train', '--full-retrain']) == ('training_pipeline', 'run_training',
+                                                   {'full_sync': False, 'full_retrain': True})
+    assert target(['infer', '--paths', '50']) == ('inference_pipeline', 'run_inference', {'n_paths': 50})
+    assert target(['prune', '--keep', '5', '--dry-run']) == ('model_index', 'prune_registry',
+                                                             {'keep_latest': 5, 'dry_run': True})
+    assert target(['prune']) == ('model_index', 'prune_registry', {'dry_run': False})
+    # backfill and serve hand their own options through
+    assert target(['backfill', '--start', '2025-08-01', '--workers', '2']) == (
+        'backfill_data', 'main', {'argv': ['--start', '2025-08-01', '--workers', '2'], 'prog': 'cli.py backfill'})
+    assert target(['serve', '--port', '9000'])[2] == {'argv': ['--port', '9000'], 'prog': 'cli.py serve'}
+
+
+def test_unknown_options_are_rejected():
+    with pytest.raises(SystemExit):
+        main(['--import-only', 'ingest', '--bogus'])
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from features import (
+    compute_features, FeatureState, feature_columns, history_rows, DEFAULT_CONFIG, EXTENDED_CONFIG,
+)
+
+# Rolling std: pandas' running-window kernel vs the streaming state's direct reduction
+ROLLING_TOLERANCE = 1e-8
+
+
+def legacy_features(df):
+    """The hopsworks_backfill.py feature block the engine replaced."""
+    df = df.copy()
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    df['hour'] = df['datetime'].dt.hour
+    df['day_of_week'] = df['datetime'].dt.dayofweek
+    df['month'] = df['datetime'].dt.month
+    df['aqi_lag_1h'] = df['aqi'].shift(1)
+    df['pm2_5_lag_1h'] = df['pm2_5'].shift(1)
+    df['co_lag_1h'] = df['co'].shift(1)
+    df['no2_lag_1h'] = df['no2'].shift(1)
+    df['aqi_change_rate'] = df['aqi'].shift(1) - df['aqi'].shift(2)
+    return df
+
+
+def pandas_reference(df, config):
+    """The same feature family written with pandas shift / rolling / ewm."""
+    df = legacy_features(df)
+    for col, hours in config['lags'].items():
+        for h in hours:
+            df[f'{col}_lag_{h}h'] = df[col].shift(h)
+    for col, windows in config['windows'].items():
+        previous = df[col].astype('float64').shift(1)
+        for w in windows:
+            rolling = previous.rolling(w)
+            for stat in config['window_stats']:
+                df[f'{col}_roll_{stat}_{w}h'] = rolling.std(ddof=0) if stat == 'std' else getattr(rolling, stat)()
+    for col, spans in config['ewm_spans'].items():
+        for span in spans:
+            df[f'{col}_ewm_{span}h'] = df[col].astype('float64').ewm(span=span, adjust=False).mean().shift(1)
+    return df
+
+
+def stream_features(df, config, split=None):
+    """Replays df through a FeatureState; round-trips the state through to_dict() at row ``split``."""
+    state = FeatureState(config=config)
+    rows = []
+    for i, row in enumerate(df.to_dict('records')):
+        if i == split:
+            state = FeatureState.from_dict(state.to_dict(), config)
+        rows.append(state.update(row))
+    return pd.DataFrame(rows)
+
+
+def assert_columns_equal(actual, expected, columns, atol=0.0):
+    for col in columns:
+        np.testing.assert_allclose(actual[col].to_numpy(dtype=np.float64), expected[col].to_numpy(dtype=np.float64),
+                                   rtol=0, atol=atol, err_msg=col)
+
+
+def test_default_batch_matches_legacy_code(raw_history):
+    assert_columns_equal(compute_features(raw_history), legacy_features(raw_history), feature_columns(DEFAULT_CONFIG))
+
+
+def test_default_batch_matches_streaming(raw_history):
+    assert_columns_equal(compute_features(raw_history), stream_features(raw_history, DEFAULT_CONFIG),
+                         feature_columns(DEFAULT_CONFIG))
+
+
+def test_extended_batch_matches_pandas(raw_history):
+    assert_columns_equal(compute_features(raw_history, EXTENDED_CONFIG), pandas_reference(raw_history, EXTENDED_CONFIG),
+                         feature_columns(EXTENDED_CONFIG))
+
+
+def test_extended_batch_matches_streaming_across_a_saved_state(raw_history):
+    assert_columns_equal(compute_features(raw_history, EXTENDED_CONFIG),
+                         stream_features(raw_history, EXTENDED_CONFIG, split=2000),
+                         feature_columns(EXTENDED_CONFIG), atol=ROLLING_TOLERANCE)
+
+
+@pytest.mark.parametrize('config', [DEFAULT_CONFIG, EXTENDED_CONFIG], ids=['default', 'extended'])
+def test_state_from_frame_continues_the_batch(raw_history, config):
+    # The state built from all rows but the last gives the last row's features
+    batch = compute_features(raw_history, config)
+    state = FeatureState.from_frame(raw_history.iloc[:-1], config)
+    assert state.size == history_rows(config)
+    expected = batch.iloc[-1]
+    for col, value in state.next_lags().items():
+        assert value == pytest.approx(expected[col], abs=ROLLING_TOLERANCE, nan_ok=True), col
+
+
+def test_unsorted_input_is_sorted(raw_history):
+    shuffled = raw_history.sample(frac=1.0, random_state=0)
+    pd.testing.assert_frame_equal(compute_features(shuffled), compute_features(raw_history))
+
+
+def test_short_history_has_no_lookahead():
+    df = pd.DataFrame({'datetime': pd.date_range('2025-01-01', periods=3, freq='h'), 'aqi': [1, 2, 3],
+                       **{col: [1.0, 2.0, 3.0] for col in ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3']}})
+    features = compute_features(df, EXTENDED_CONFIG)
+    assert features['aqi_lag_1h'].tolist()[1:] == [1.0, 2.0]
+    assert np.isnan(features['aqi_change_rate'].iloc[1]) and features['aqi_change_rate'].iloc[2] == 1.0
+    assert features['aqi_roll_mean_3h'].isna().all()
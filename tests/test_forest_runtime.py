@@ -0,0 +1,79 @@
+import os
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+import forest_runtime
+from forest_runtime import export_forest, compile_model, FlatForest, PARALLEL_MIN_ROWS
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FEATURES = ['co', 'no2', 'o3', 'so2', 'pm2_5', 'pm10', 'nh3', 'hour', 'day_of_week', 'month',
+            'aqi_lag_1h', 'pm2_5_lag_1h', 'co_lag_1h', 'no2_lag_1h', 'aqi_change_rate']
+
+
+@pytest.fixture(scope='module')
+def forests(history):
+    X, y = history[FEATURES], history['aqi']
+    return {
+        'shallow': RandomForestRegressor(n_estimators=20, max_depth=5, min_samples_leaf=20, max_features='sqrt',
+                                         random_state=42).fit(X, y),
+        'full depth': RandomForestRegressor(n_estimators=20, random_state=42).fit(X, y),
+    }
+
+
+def perturbed(X):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(X.to_numpy() * rng.uniform(0.5, 1.5, X.shape), columns=X.columns)
+
+
+@pytest.mark.parametrize('name', ['shallow', 'full depth'])
+def test_flat_forest_matches_sklearn(forests, history, name):
+    model = forests[name]
+    flat = export_forest(model)
+    X = history[FEATURES]
+    assert len(X) >= PARALLEL_MIN_ROWS   # Parallel kernel on the full frame, serial one on the slices
+    for rows in [X, X.iloc[:1], X.iloc[:100], perturbed(X)]:
+        np.testing.assert_array_equal(flat.predict(rows), model.predict(rows))
+
+
+def test_numpy_fallback_matches_sklearn(forests, history, monkeypatch):
+    monkeypatch.setattr(forest_runtime, 'NUMBA_AVAILABLE', False)
+    model = forests['full depth']
+    X = history[FEATURES]
+    np.testing.assert_array_equal(export_forest(model).predict(X), model.predict(X))
+
+
+def test_npz_round_trip(forests, history, tmp_path):
+    model = forests['shallow']
+    path = str(tmp_path / 'forest.npz')
+    export_forest(model).save(path)
+    loaded = FlatForest.load(path)
+    assert loaded.feature_names == FEATURES
+    # Columns are picked by name, so a reordered frame predicts the same
+    X = history[FEATURES[::-1]]
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(history[FEATURES]))
+
+
+def test_compile_model_leaves_other_models_alone(history):
+    ridge = Ridge().fit(history[FEATURES], history['aqi'])
+    assert compile_model(ridge) is ridge
+
+
+def test_committed_model_parity(history):
+    path = os.path.join(ROOT, 'models', 'best_model.joblib')
+    if not os.path.exists(path):
+        pytest.skip("no committed model")
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = joblib.load(path)
+    compiled = compile_model(model)
+    if compiled is model:
+        pytest.skip(f"committed model is a {type(model).__name__}, not a forest")
+    X = history[list(model.feature_names_in_)]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = model.predict(X)
+    np.testing.assert_array_equal(compiled.predict(X), expected)
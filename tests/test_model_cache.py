@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import joblib
+import numpy as np
+import pytest
+from model_cache import ModelCache
+
+
+class RegistryEntry:
+    """A registry model stand-in: name, version and download() into a fresh directory."""
+
+    def __init__(self, version, artifact, download_root, name='karachi_aqi_model'):
+        self.name = name
+        self.version = version
+        self.artifact = artifact
+        self.download_root = download_root
+        self.downloads = 0
+
+    def download(self):
+        self.downloads += 1
+        target = tempfile.mkdtemp(dir=self.download_root)
+        shutil.copy(self.artifact, os.path.join(target, 'best_model.joblib'))
+        return target
+
+
+@pytest.fixture
+def versions(tmp_path):
+    """Five versions with distinct artifacts of about 1 MB each."""
+    entries = []
+    for v in range(1, 6):
+        path = str(tmp_path / f'artifact_{v}.joblib')
+        joblib.dump({'version': v, 'weights': np.random.default_rng(v).random(128 * 1024)}, path)
+        entries.append(RegistryEntry(v, path, str(tmp_path)))
+    return entries
+
+
+def blobs(cache):
+    return sorted(os.listdir(cache.blob_dir))
+
+
+def test_downloads_once_then_memo_then_disk(versions, tmp_path):
+    root = str(tmp_path / 'cache')
+    entry = versions[0]
+    cache = ModelCache(root=root)
+    model = cache.load(entry)
+    assert model['version'] == 1
+    assert cache.load(entry) is model
+    assert entry.downloads == 1
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0, 'memo_hits': 1}
+
+    # A new process: nothing memoized, the artifact is read from disk
+    restarted = ModelCache(root=root)
+    assert restarted.load(entry)['version'] == 1
+    assert entry.downloads == 1
+    assert restarted.stats['hits'] == 1 and restarted.stats['misses'] == 0
+
+
+def test_same_artifact_stored_once(versions, tmp_path):
+    cache = ModelCache(root=str(tmp_path / 'cache'))
+    same = RegistryEntry(9, versions[0].artifact, str(tmp_path))
+    first = cache.load(versions[0])
+    assert cache.load(same) is first
+    assert len(blobs(cache)) == 1
+    assert cache.size_bytes() == os.path.getsize(versions[0].artifact)
+
+
+def test_lru_eviction(versions, tmp_path):
+    size = os.path.getsize(versions[0].artifact)
+    cache = ModelCache(root=str(tmp_path / 'cache'), max_bytes=int(size * 2.5))
+    for entry in versions:
+        cache.load(entry)
+    assert cache.stats['evictions'] == 3
+    assert cache.size_bytes() <= cache.max_bytes
+    # The two most recently used versions are the ones left, on disk and in the index
+    assert [cache.artifact_path(e) is not None for e in versions] == [False, False, False, True, True]
+    assert len(blobs(cache)) == 2
+
+    # Touch v4 so v5 is the least recently used, then bring back v1
+    cache.load(versions[3])
+    assert cache.load(versions[0])['version'] == 1
+    assert versions[0].downloads == 2
+    assert cache.artifact_path(versions[4]) is None
+    assert cache.artifact_path(versions[3]) is not None
+
+
+def test_entry_served_is_never_evicted(versions, tmp_path):
+    cache = ModelCache(root=str(tmp_path / 'cache'), max_bytes=1)
+    assert cache.load(versions[0])['version'] == 1
+    assert cache.artifact_path(versions[0]) is not None
+
+
+def test_corrupted_blob_is_fetched_again(versions, tmp_path):
+    root = str(tmp_path / 'cache')
+    entry = versions[0]
+    ModelCache(root=root).load(entry)
+    cache = ModelCache(root=root)
+    with open(cache.artifact_path(entry), 'r+b') as f:
+        f.write(b'garbage')
+    assert cache.load(entry)['version'] == 1
+    assert entry.downloads == 2
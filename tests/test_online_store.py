@@ -0,0 +1,160 @@
+import os
+import warnings
+import pandas as pd
+import pytest
+from online_store import OnlineFeatureStore, FeatureViewSource, OfflineSource, LocalOnlineStore, KARACHI
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CITIES = ['karachi', 'lahore', 'quetta']
+
+
+class FrameGroup:
+    """Offline feature group stand-in: read() returns the frame and counts the scans."""
+
+    def __init__(self, df):
+        self.df = df
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return self.df
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cities(history):
+    """The last two days of features for a few cities, keyed by (city, datetime)."""
+    tail = history.tail(48)
+    return pd.concat([tail.assign(city=city, pm2_5=tail['pm2_5'] * (i + 1)) for i, city in enumerate(CITIES)],
+                     ignore_index=True)
+
+
+def latest_rows(df):
+    return {city: group.iloc[-1] for city, group in df.sort_values('datetime').groupby('city')}
+
+
+def online_view(df, labels=()):
+    view = LocalOnlineStore(list(df.columns), primary_key=('city', 'datetime'), labels=labels)
+    view.insert(df)
+    return view
+
+
+def test_online_row_has_every_served_column(cities):
+    truth = latest_rows(cities)
+    hours = {city: row['datetime'] for city, row in truth.items()}
+    source = FeatureViewSource(online_view(cities), entity_col='city', latest=lambda: hours, required=('aqi',))
+    for city, expected in truth.items():
+        row = source.get(city)
+        assert set(row) == set(cities.columns)
+        assert row['aqi'] == expected['aqi'] and row['pm2_5'] == expected['pm2_5'] and row['city'] == city
+
+
+def test_labelled_view_defers_to_the_fallback(cities, capsys):
+    truth = latest_rows(cities)
+    hours = {city: row['datetime'] for city, row in truth.items()}
+    view = online_view(cities, labels=('aqi',))
+    assert len(view.get_feature_vector({'city': 'lahore', 'datetime': hours['lahore']})) == len(cities.columns) - 1
+    source = FeatureViewSource(view, entity_col='city', latest=lambda: hours, required=('aqi',))
+    assert "doesn't serve aqi" in capsys.readouterr().out
+    assert source.get('lahore') is None
+    store = OnlineFeatureStore(source, OfflineSource(FrameGroup(cities)))
+    for city, expected in truth.items():
+        assert store.get(city)['aqi'] == expected['aqi']
+    assert store.stats['fallbacks'] == len(CITIES)
+
+
+def test_ttl_expiry_reads_through_again(cities):
+    clock = Clock()
+    older, newer = cities[cities['datetime'] < cities['datetime'].max()], cities
+    hours = {city: row['datetime'] for city, row in latest_rows(older).items()}
+    view = online_view(older)
+    store = OnlineFeatureStore(FeatureViewSource(view, entity_col='city', latest=lambda: hours), ttl=60, clock=clock)
+    assert store.get('lahore')['datetime'] == hours['lahore']
+
+    # The next hour is ingested: served from memory until the entry expires, then read through
+    view.insert(newer)
+    hours.update({city: row['datetime'] for city, row in latest_rows(newer).items()})
+    clock.now = 59
+    assert store.get('lahore')['datetime'] < hours['lahore']
+    clock.now = 60
+    assert store.get('lahore')['datetime'] == hours['lahore']
+    assert store.stats['expired'] == 1 and store.stats['hits'] == 1
+
+
+def test_lru_bound(cities):
+    hours = {city: row['datetime'] for city, row in latest_rows(cities).items()}
+    store = OnlineFeatureStore(FeatureViewSource(online_view(cities), entity_col='city', latest=lambda: hours),
+                               max_entries=2)
+    for city in CITIES:
+        store.get(city)
+    assert len(store) == 2 and store.stats['evictions'] == 1
+    store.get(CITIES[1])                 # Still held
+    store.get(CITIES[0])                 # Evicted first, read through again
+    assert store.stats['hits'] == 1 and store.stats['misses'] == 4
+
+
+def test_offline_source_scans_once_per_max_age(cities):
+    clock = Clock()
+    group = FrameGroup(cities)
+    source = OfflineSource(group, max_age=60, clock=clock)
+    truth = latest_rows(cities)
+    for city in CITIES:
+        assert source.get(city)['pm2_5'] == truth[city]['pm2_5']
+    assert source.get('lahore', hour=truth['lahore']['datetime'] - pd.Timedelta(hours=1)) is not None
+    assert source.get('nowhere') is None
+    assert group.reads == 1
+    clock.now = 61
+    source.get('lahore')
+    assert group.reads == 2
+
+
+def test_single_entity_group_is_karachi(history):
+    source = OfflineSource(FrameGroup(history))
+    assert source.get(KARACHI)['datetime'] == history['datetime'].max()
+
+
+def test_prediction_service_reads_the_observed_aqi_online(history, tmp_path, monkeypatch):
+    """The --registry path end to end on the local backend, with karachi_aqi_view created as training does."""
+    from store_backend import connect
+    from watermark import save_watermark, watermark_from_frame
+    import prediction_service
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('STORE_BACKEND', 'local')
+    monkeypatch.setenv('LOCAL_STORE_DIR', str(tmp_path / 'store'))
+    project = connect()
+    fs = project.get_feature_store()
+    fg = fs.get_or_create_feature_group(name='karachi_aqi_fg', version=1, primary_key=['datetime'],
+                                        event_time='datetime')
+    fg.insert(history)
+    fs.create_feature_view(name='karachi_aqi_view', query=fg.select_all(), labels=['aqi'], version=1)
+    os.makedirs('data')
+    save_watermark(watermark_from_frame(history))
+    project.get_model_registry().python.create_model(name='karachi_aqi_model', metrics={'mae': 0.2, 'r2': 0.9}) \
+        .save(os.path.join(ROOT, 'models', 'best_model.joblib'))
+
+    source = prediction_service.RegistryModelSource()
+    features = source.online_store()
+    row = features.get(KARACHI)
+    last = history.iloc[-1]
+    assert row['datetime'] == last['datetime'] and row['aqi'] == last['aqi']
+    assert row['aqi_lag_1h'] == last['aqi_lag_1h']
+    assert features.stats['fallbacks'] == 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        service = prediction_service.PredictionService(source, model_poll=3600, features=features)
+    try:
+        result = service.predict(timeout=30)
+    finally:
+        service.close()
+    assert result['observed_aqi'] == int(last['aqi'])
+    assert result['observed_at'] == last['datetime'].isoformat()
+    assert result['model_version'] == 'karachi_aqi_model@1'
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from store_backend import connect
+
+CITIES = ['karachi', 'lahore']
+
+
+@pytest.fixture
+def fs(tmp_path):
+    return connect('local', str(tmp_path / 'store')).get_feature_store()
+
+
+@pytest.fixture
+def fg(fs, history):
+    group = fs.get_or_create_feature_group(name='karachi_aqi_fg', version=1, primary_key=['datetime'],
+                                           event_time='datetime')
+    group.insert(history)
+    return group
+
+
+@pytest.fixture
+def city_fg(fs, history):
+    group = fs.get_or_create_feature_group(name='city_aqi_fg', version=1, primary_key=['city', 'datetime'],
+                                           event_time='datetime')
+    group.insert(pd.concat([history.tail(48).assign(city=city) for city in CITIES], ignore_index=True))
+    return group
+
+
+def test_upsert_replaces_on_primary_key(fg, history):
+    end = history['datetime'].iloc[-1]
+    next_hour = history.tail(1).assign(datetime=end + pd.Timedelta(hours=1))
+    fg.insert(next_hour)
+    fg.insert(history.iloc[[100]].assign(pm2_5=-1.0))
+    expected = pd.concat([history, next_hour], ignore_index=True)
+    expected.loc[100, 'pm2_5'] = -1.0
+    read_back = fg.read()
+    pd.testing.assert_frame_equal(read_back, expected[read_back.columns].astype(read_back.dtypes))
+
+
+def test_event_time_filter_and_projection(fg, history):
+    end = history['datetime'].iloc[-1]
+    since = end - pd.Timedelta(days=7)
+    week = fg.select(['datetime', 'aqi']).filter(fg.datetime > str(since)).read()
+    assert list(week.columns) == ['datetime', 'aqi']
+    assert week['datetime'].tolist() == history.loc[history['datetime'] > since, 'datetime'].tolist()
+
+
+def test_string_column_filter_compares_strings(city_fg, history):
+    end = history['datetime'].iloc[-1]
+    since = str(end - pd.Timedelta(hours=23))
+    lahore = city_fg.filter((city_fg.city == 'lahore') & (city_fg.datetime >= since)).read()
+    assert len(lahore) == 24 and set(lahore['city']) == {'lahore'}
+
+
+def test_key_lookup_by_city(fs, city_fg, history):
+    end = history['datetime'].iloc[-1]
+    view = fs.create_feature_view(name='city_aqi_view', query=city_fg.select_all(), version=1)
+    row = dict(zip([f.name for f in view.features], view.get_feature_vector({'city': 'lahore', 'datetime': end})))
+    assert row['city'] == 'lahore' and row['datetime'] == end
+    assert view.get_feature_vector({'city': 'quetta', 'datetime': end}) is None